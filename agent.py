@@ -29,23 +29,42 @@ import abc
 import random
 import pickle
 import csv
+from copy import deepcopy
 from game import *
+from qtable import COMPACT_EXTENSION, FLAG_STATE_VALUES, save_compact, load_compact, load_compact_visits, \
+    save_compact_state_values, load_compact_state_values
 
 
 class Agent(object):
     """This class is an abstract base class for agents playing tic tac toe.
 
     Every concrete agent extending this class should implement a take_action method.
+    All random decisions of an agent are drawn from its own random number generator (rng),
+    so games are reproducible when the agents are seeded.
     """
     __metaclass__ = abc.ABCMeta
 
-    def __init__(self):
+    def __init__(self, rng=None):
+        """
+            :param rng: random.Random instance or integer seed, a new generator by default
+        """
         self.side = None
+        self.rng = make_rng(rng)
         self.logger = logging.getLogger(self.__class__.__name__)
 
     def __repr__(self):
         return self.__class__.__name__
 
+    def __getstate__(self):
+        # loggers cannot be pickled, agents sent to other processes get a new one
+        state = self.__dict__.copy()
+        del state['logger']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.logger = logging.getLogger(self.__class__.__name__)
+
     @abc.abstractmethod
     def take_action(self, state):
         """ The agent takes action in a state.
@@ -55,8 +74,7 @@ class Agent(object):
         :return: action: i, j which cell to choose
         """
 
-    @staticmethod
-    def random_next_action(state):
+    def random_next_action(self, state):
         """ A basic random action generation method."""
 
         possible_moves = []
@@ -64,7 +82,22 @@ class Agent(object):
             for j in range(3):
                 if state[i][j] == VALUES.EMPTY:
                     possible_moves.append((i, j))
-        return random.choice(possible_moves)
+        return self.rng.choice(possible_moves)
+
+    def action_distribution(self, state):
+        """ The probabilities of the actions the agent takes in a state (see exact.py).
+
+        Only agents with a stationary policy implement it.
+        :param state: [[], [], []] a board state
+        :return: list of (action, probability) pairs, an action may appear more than once
+        """
+        raise NotImplementedError('{0} has no stationary action distribution'.format(self))
+
+    @staticmethod
+    def uniform_distribution(state):
+        """ The uniform distribution over the empty cells of a state. """
+        moves = [(i, j) for i in range(3) for j in range(3) if state[i][j] == VALUES.EMPTY]
+        return [(move, 1.0 / len(moves)) for move in moves]
 
     @staticmethod
     def represent_state(state):
@@ -87,8 +120,8 @@ class RandomAgent(Agent):
      otherwise it chooses randomly one of the already seen actions.
     """
 
-    def __init__(self, ):
-        super(RandomAgent, self).__init__()
+    def __init__(self, rng=None):
+        super(RandomAgent, self).__init__(rng=rng)
         self.winner = None
         self.visited_state_actions = {}
 
@@ -102,11 +135,15 @@ class RandomAgent(Agent):
                     possible_moves.append((i, j))
                     if not (hashable_state, (i, j)) in self.visited_state_actions:
                         possible_not_visited_moves.append((i, j))
-        random_move = random.choice(possible_not_visited_moves) if len(
-            possible_not_visited_moves) > 0 else random.choice(possible_moves)
+        random_move = self.rng.choice(possible_not_visited_moves) if len(
+            possible_not_visited_moves) > 0 else self.rng.choice(possible_moves)
         self.visited_state_actions[hashable_state, random_move] = 0
         return random_move
 
+    def action_distribution(self, state):
+        """ Uniform over the empty cells, the memory of played moves is ignored. """
+        return self.uniform_distribution(state)
+
     def end_game(self, winner):
         self.winner = winner
 
@@ -117,8 +154,8 @@ class WinBlockingRandomAgent(RandomAgent):
     It first looks for a winning action,
     then for blocking opponent's win and then a random move.
     """
-    def __init__(self):
-        super(WinBlockingRandomAgent, self).__init__()
+    def __init__(self, rng=None):
+        super(WinBlockingRandomAgent, self).__init__(rng=rng)
 
     def take_action(self, state):
         win_block_move = self._win_block_move(state)
@@ -154,6 +191,16 @@ class WinBlockingRandomAgent(RandomAgent):
         else:
             return None, -1
 
+    def action_distribution(self, state):
+        """ The winning move, else uniform over the blocking moves (a move blocking twice counts twice),
+        else uniform over the empty cells. """
+        win_move, block_moves = self._win_block_moves(state)
+        if win_move is not None:
+            return [(win_move, 1.0)]
+        if len(block_moves) > 0:
+            return [(move, 1.0 / len(block_moves)) for move in block_moves]
+        return self.uniform_distribution(state)
+
     def _win_block_move(self, state):
         """ This is a private helper method.
 
@@ -163,37 +210,49 @@ class WinBlockingRandomAgent(RandomAgent):
         :param state:
         :return: win_block move
         """
+        win_move, block_moves = self._win_block_moves(state)
+        if win_move is not None:
+            return win_move
+        if len(block_moves) > 0:
+            return self.rng.choice(block_moves)
+        else:
+            return None
+
+    def _win_block_moves(self, state):
+        """ This is a private helper method.
+
+        It looks for a winning move, collecting the moves blocking the opponent's win on the way.
+        :param state:
+        :return: the first winning move or None, list of blocking moves
+        """
         block_moves = []
         for i in range(3):
             side, index = self._check_triple(state[i])
             if index != -1:
                 if side == self.side:
-                    return i, index
+                    return (i, index), block_moves
                 else:
                     block_moves.append((i, index))
             side, index = self._check_triple([state[0][i], state[1][i], state[2][i]])
             if index != -1:
                 if side == self.side:
-                    return index, i
+                    return (index, i), block_moves
                 else:
                     block_moves.append((index, i))
 
         side, index = self._check_triple([state[0][0], state[1][1], state[2][2]])
         if index != -1:
             if side == self.side:
-                return index, index
+                return (index, index), block_moves
             else:
                 block_moves.append((index, index))
         side, index = self._check_triple([state[0][2], state[1][1], state[2][0]])
         if index != -1:
             if side == self.side:
-                return index, 2 - index
+                return (index, 2 - index), block_moves
             else:
                 block_moves.append((index, 2 - index))
-        if len(block_moves) > 0:
-            return random.choice(block_moves)
-        else:
-            return None
+        return None, block_moves
 
 
 class DummyAgent(Agent):
@@ -203,8 +262,8 @@ class DummyAgent(Agent):
     in a row of smallest index and a column of smallest index.
     """
 
-    def __init__(self):
-        super(DummyAgent, self).__init__()
+    def __init__(self, rng=None):
+        super(DummyAgent, self).__init__(rng=rng)
         self.winner = None
 
     def take_action(self, state):
@@ -215,6 +274,9 @@ class DummyAgent(Agent):
                     return i, j
         return move
 
+    def action_distribution(self, state):
+        return [(self.take_action(state), 1.0)]
+
     def end_game(self, winner):
         self.winner = winner
 
@@ -226,8 +288,8 @@ class HumanAgent(Agent):
     She plays by typing moves in the format i, j on the console.
     """
 
-    def __init__(self):
-        super(HumanAgent, self).__init__()
+    def __init__(self, rng=None):
+        super(HumanAgent, self).__init__(rng=rng)
         self.winner = None
 
     def take_action(self, state):
@@ -256,6 +318,23 @@ class HumanAgent(Agent):
             self.logger.info('The opponent won the game.')
 
 
+# step size schedules of the Q-value updates (see BaseQAgent.visit)
+STEP_SIZES = ['constant', 'inverse', 'polynomial']
+
+
+def epsilon_greedy_distribution(state, greedy_actions, epsilon):
+    """ The action distribution of epsilon greedy play.
+    :param state: a board state
+    :param greedy_actions: the tie set of greedy actions
+    :param epsilon: the exploration probability
+    :return: list of (action, probability) pairs
+    """
+    distribution = [(action, (1.0 - epsilon) / len(greedy_actions)) for action in greedy_actions]
+    if epsilon > 0.0:
+        distribution.extend((action, epsilon * p) for action, p in Agent.uniform_distribution(state))
+    return distribution
+
+
 class BaseQAgent(Agent):
     """ This is a base class for TD learning agents.
 
@@ -274,7 +353,11 @@ class BaseQAgent(Agent):
                  win=1.0,
                  draw=0.0,
                  lose=-1.0,
-                 not_finished=0.0):
+                 not_finished=0.0,
+                 step_size='constant',
+                 step_size_power=0.6,
+                 count_visits=False,
+                 rng=None):
         """
             :param q_values: a dictionary holding Q(s,a) values
             :param alpha: step size parameter in the TD update formula
@@ -287,9 +370,15 @@ class BaseQAgent(Agent):
             :param draw: draw reward
             :param lose: lose reward
             :param not_finished: not_finished reward
+            :param step_size: step size schedule, 'constant' (alpha), 'inverse' (1/n) or 'polynomial' (alpha/n^power)
+                of the n-th update of a state, action pair (see STEP_SIZES)
+            :param step_size_power: the power of the 'polynomial' schedule
+            :param count_visits: if True the updates of every state, action pair are counted in visits
+                (always counted by the 'inverse' and 'polynomial' schedules)
+            :param rng: random.Random instance or integer seed for exploration and tie breaking
             :rtype: BaseQAgent
             """
-        super(BaseQAgent, self).__init__()
+        super(BaseQAgent, self).__init__(rng=rng)
         self.q_values = {} if q_values is None else q_values
         self.verbose = verbose
         self.learning = learning
@@ -307,6 +396,15 @@ class BaseQAgent(Agent):
         self.count = 0
         self.side = None
         self.winner = VALUES.NOT_FINISHED
+        self.max_delta = 0.0
+        self.updates = 0
+        self.abs_delta_sum = 0.0
+        if step_size not in STEP_SIZES:
+            raise ValueError('step size should be one of {0}'.format(', '.join(STEP_SIZES)))
+        self.step_size = step_size
+        self.step_size_power = step_size_power
+        self.visits = {} if count_visits or step_size != 'constant' else None
+        self.state_visits = None
 
     def take_action(self, state):
         """ An epsilon greedy action selection method.
@@ -318,12 +416,16 @@ class BaseQAgent(Agent):
         """
         if self.epsilon_decay is not None:
             self.epsilon *= self.epsilon_decay
-        if random.random() < self.epsilon:
-            action = super(BaseQAgent, self).random_next_action(state)
-            self.log('exploration move: {0}'.format(str(action)))
+        if self.rng.random() < self.epsilon:
+            action = self.random_next_action(state)
+            if __debug__:
+                if self.verbose:
+                    self.log('exploration move: {0}', action)
         else:
             action = self.greedy_next_action(state)
-            self.log('exploitation move: {0}'.format(str(action)))
+            if __debug__:
+                if self.verbose:
+                    self.log('exploitation move: {0}', action)
         return action
 
     def q_value(self, (state, action)):
@@ -349,14 +451,19 @@ class BaseQAgent(Agent):
         The agent keeps track of prev_state, prev_action and prev_q_value,
         and when next state (s') comes, it computes the reward for that
         and updates the Q-value of prev_state, prev_action according to the formula above.
+        The largest absolute change is kept in max_delta (see reset_max_delta),
+        the number of updates and the sum of absolute changes in updates and abs_delta_sum.
         :param state: s' (the next state)
         :param value: value used in the update formula of the temporal difference learning
         :return:
         """
         if self.prev_state is not None and self.learning:
             reward = self.reward(Game.game_state(state))
-            self.q_values[self.represent_state(self.prev_state), self.prev_action] += self.alpha * (
-                reward + self.gamma * value - self.prev_q_val)
+            key = self.represent_state(self.prev_state), self.prev_action
+            alpha = self.alpha if self.visits is None else self.visit(key)
+            delta = alpha * (reward + self.gamma * value - self.prev_q_val)
+            self.q_values[key] += delta
+            self.count_update(abs(delta))
 
     def end_game(self, winner):
         """Clean up method for game end.
@@ -367,9 +474,14 @@ class BaseQAgent(Agent):
         """
         reward = self.reward(winner)
         if self.learning:
-            self.q_values[self.represent_state(self.prev_state), self.prev_action] += self.alpha * (
-                reward - self.prev_q_val)
-        self.log("the winner is {0}".format(winner))
+            key = self.represent_state(self.prev_state), self.prev_action
+            alpha = self.alpha if self.visits is None else self.visit(key)
+            delta = alpha * (reward - self.prev_q_val)
+            self.q_values[key] += delta
+            self.count_update(abs(delta))
+        if __debug__:
+            if self.verbose:
+                self.log('the winner is {0}', VALUES[winner])
         self.prev_state = None
         self.prev_action = None
         self.prev_q_val = 0
@@ -383,7 +495,8 @@ class BaseQAgent(Agent):
         by choosing an action a' that has a maximum Q(s',a') from state (s') (randomly if there is more)
         """
         max_val = float('-inf')
-        if self.verbose:
+        verbose = __debug__ and self.verbose
+        if verbose:
             cells = []
         max_candidates = {}
         for i in range(3):
@@ -394,16 +507,87 @@ class BaseQAgent(Agent):
                         max_val = val
                         max_move = (i, j)
                         max_candidates[max_move] = val
-                    if self.verbose:
+                    if verbose:
                         cells.append('{0:.3f}'.format(val).center(6))
-                elif self.verbose:
-                    cells.append(state[i][j].center(6))
-        if self.verbose:
+                elif verbose:
+                    cells.append(NAMES[state[i][j]].center(6))
+        if verbose:
             self.logger.info(BOARD.format(*cells))
         possible_actions = [k for k, v in max_candidates.items() if v == max_val]
-        action = random.choice(possible_actions) if len(possible_actions) > 0 else None
+        action = self.rng.choice(possible_actions) if len(possible_actions) > 0 else None
         return action
 
+    def visit(self, key):
+        """ Counts an update of a state, action pair in visits (and of the state in state_visits, if it is kept).
+        :param key: (hashable state, action)
+        :return: the step size of the update
+        """
+        n = self.visits.get(key, 0) + 1
+        self.visits[key] = n
+        if self.state_visits is not None:
+            state = key[0]
+            self.state_visits[state] = self.state_visits.get(state, 0) + 1
+        if self.step_size == 'inverse':
+            return 1.0 / n
+        elif self.step_size == 'polynomial':
+            return self.alpha / n ** self.step_size_power
+        return self.alpha
+
+    def visit_counts(self):
+        """ The number of updates of every state, action pair (empty if visits are not counted). """
+        return {} if self.visits is None else self.visits
+
+    def count_update(self, abs_delta):
+        """ Records the absolute change of an update in max_delta, updates and abs_delta_sum. """
+        self.updates += 1
+        self.abs_delta_sum += abs_delta
+        if abs_delta > self.max_delta:
+            self.max_delta = abs_delta
+
+    def reset_max_delta(self):
+        """ The largest absolute Q-value change since the last reset (e.g. in the last episode), then resets it. """
+        max_delta = self.max_delta
+        self.max_delta = 0.0
+        return max_delta
+
+    def action_values(self, state):
+        """ The Q-values of all possible actions of a state, without creating missing Q-values.
+        :param state: a board state
+        :return: list of (action, Q-value) pairs
+        """
+        hashable_state = self.represent_state(state)
+        default = self.reward(Game.game_state(state))
+        q_values = self.q_values
+        return [((i, j), q_values.get((hashable_state, (i, j)), default))
+                for i in range(3) for j in range(3) if state[i][j] == VALUES.EMPTY]
+
+    def best_actions(self, state):
+        """ The tie set of greedy actions of a state (all actions with the maximal Q-value). """
+        values = self.action_values(state)
+        if len(values) == 0:
+            return ()
+        max_val = max(v for _, v in values)
+        return tuple(action for action, v in values if v == max_val)
+
+    def action_distribution(self, state):
+        """ The epsilon greedy distribution with the current epsilon, ties of the greedy actions are uniform. """
+        return epsilon_greedy_distribution(state, self.best_actions(state), self.epsilon)
+
+    def freeze(self, epsilon=0.0, rng=None):
+        """ Compiles the greedy policy into a FrozenAgent.
+
+        The tie sets of best actions are computed for every reachable state, the Q-values are not kept.
+        :param epsilon: exploration probability of the frozen agent
+        :param rng: random.Random instance or integer seed of the frozen agent (default: the rng of this agent)
+        :return: FrozenAgent
+        """
+        tie_sets = {}
+        policy = {}
+        for state in Game.reachable_states():
+            actions = self.best_actions(state)
+            policy[state] = tie_sets.setdefault(actions, actions)
+        return FrozenAgent(policy, epsilon=epsilon, rng=self.rng if rng is None else rng)
+
     def reward(self, winner):
         """ A reward scheme for states.
         :param winner: the current winner of the game (NOT_FINISHED during game ... X, O or DRAW at game end
@@ -445,9 +629,13 @@ class BaseQAgent(Agent):
                         cells.append(NAMES[state[i][j]].center(3))
             self.logger.info(BOARD.format(*cells))
 
-    def log(self, s):
-        if self.verbose:
-            self.logger.debug(s)
+    def log(self, msg, *args):
+        """ Lazy debug logging.
+
+        The message is formatted with args only if verbose is set and the logger is enabled for debug.
+        """
+        if self.verbose and self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug(msg.format(*args) if args else msg)
 
     def set_side(self, side):
         self.side = side
@@ -458,15 +646,7 @@ class BaseQAgent(Agent):
     def save_q_values_to(self, path):
         rows = []
         for (state, action), v in self.q_values.items():
-            row = []
-            for i in range(3):
-                for j in range(3):
-                    if state[i][j] == VALUES.EMPTY:
-                        row.append(0)
-                    elif state[i][j] == VALUES.X:
-                        row.append(1)
-                    else:
-                        row.append(2)
+            row = list(state[0] + state[1] + state[2])
             row.append(3 * action[0] + action[1])
             row.append(v)
             rows.append(row)
@@ -476,17 +656,36 @@ class BaseQAgent(Agent):
                 wr.writerow(row)
 
     def serialize_q_values(self, path):
+        """ Saves the Q-values as a pickle, or as a compact Q-table if path ends with .qtable
+
+        Compact Q-tables keep the visit counts too (if they are counted), pickles only the Q-values.
+        """
+        if path.endswith(COMPACT_EXTENSION):
+            save_compact(path, self.q_values, self.visits)
+            return
         with open(path, 'wb') as f:
             pickle.dump(self.q_values, f)
 
     def deserialize_q_values(self, path):
+        """ Loads Q-values from a pickle, or from a compact Q-table if path ends with .qtable
+
+        The visit counts of a compact Q-table are loaded if this agent counts visits.
+        """
+        if path.endswith(COMPACT_EXTENSION):
+            self.load_q_values(load_compact(path))
+            self.load_visits(load_compact_visits(path))
+            return
         with open(path, 'rb') as f:
             q_vals = pickle.load(f)
             self.load_q_values(q_vals)
 
     def load_q_values(self, q_vals):
         if q_vals is not None:
-            self.q_values = q_vals
+            self.q_values = convert_legacy_q_values(q_vals)
+
+    def load_visits(self, visits):
+        if visits is not None and self.visits is not None:
+            self.visits = visits
 
 
 class SarsaAgent(BaseQAgent):
@@ -512,7 +711,11 @@ class SarsaAgent(BaseQAgent):
                  win=1.0,
                  draw=0.0,
                  lose=-1.0,
-                 not_finished=0.0):
+                 not_finished=0.0,
+                 step_size='constant',
+                 step_size_power=0.6,
+                 count_visits=False,
+                 rng=None):
         """
             :param q_values: a dictionary holding Q(s,a) values
             :param alpha: step size parameter in the TD update formula
@@ -525,6 +728,12 @@ class SarsaAgent(BaseQAgent):
             :param draw: draw reward
             :param lose: lose reward
             :param not_finished: not_finished reward
+            :param step_size: step size schedule, 'constant' (alpha), 'inverse' (1/n) or 'polynomial' (alpha/n^power)
+                of the n-th update of a state, action pair (see STEP_SIZES)
+            :param step_size_power: the power of the 'polynomial' schedule
+            :param count_visits: if True the updates of every state, action pair are counted in visits
+                (always counted by the 'inverse' and 'polynomial' schedules)
+            :param rng: random.Random instance or integer seed for exploration and tie breaking
             :rtype: SarsaAgent
         """
         super(SarsaAgent, self).__init__(q_values=q_values,
@@ -537,7 +746,11 @@ class SarsaAgent(BaseQAgent):
                                          win=win,
                                          draw=draw,
                                          lose=lose,
-                                         not_finished=not_finished)
+                                         not_finished=not_finished,
+                                         step_size=step_size,
+                                         step_size_power=step_size_power,
+                                         count_visits=count_visits,
+                                         rng=rng)
 
     def take_action(self, state):
         """Override method for SARSA agent for taking action in a given state.
@@ -558,8 +771,10 @@ class SarsaAgent(BaseQAgent):
             self.prev_state = state
             self.prev_action = action
             self.prev_q_val = self.q_values[self.represent_state(self.prev_state), self.prev_action]
-            self.log("size of q_values {0}\nprev state {1}\nprev action {2}\nprev q-val {3}"
-                     .format(len(self.q_values), self.prev_state, self.prev_action, self.prev_q_val))
+            if __debug__:
+                if self.verbose:
+                    self.log('size of q_values {0}\nprev state {1}\nprev action {2}\nprev q-val {3}',
+                             len(self.q_values), self.prev_state, self.prev_action, self.prev_q_val)
         return action
 
 
@@ -586,7 +801,11 @@ class QLearningAgent(BaseQAgent):
                  win=1.0,
                  draw=0.0,
                  lose=-1.0,
-                 not_finished=0.0):
+                 not_finished=0.0,
+                 step_size='constant',
+                 step_size_power=0.6,
+                 count_visits=False,
+                 rng=None):
         """
             :param q_values: a dictionary holding Q(s,a) values
             :param alpha: step size parameter in the TD update formula
@@ -599,6 +818,12 @@ class QLearningAgent(BaseQAgent):
             :param draw: draw reward
             :param lose: lose reward
             :param not_finished: not_finished reward
+            :param step_size: step size schedule, 'constant' (alpha), 'inverse' (1/n) or 'polynomial' (alpha/n^power)
+                of the n-th update of a state, action pair (see STEP_SIZES)
+            :param step_size_power: the power of the 'polynomial' schedule
+            :param count_visits: if True the updates of every state, action pair are counted in visits
+                (always counted by the 'inverse' and 'polynomial' schedules)
+            :param rng: random.Random instance or integer seed for exploration and tie breaking
             :rtype: QLearningAgent
         """
         super(QLearningAgent, self).__init__(q_values=q_values,
@@ -611,7 +836,11 @@ class QLearningAgent(BaseQAgent):
                                              win=win,
                                              draw=draw,
                                              lose=lose,
-                                             not_finished=not_finished)
+                                             not_finished=not_finished,
+                                             step_size=step_size,
+                                             step_size_power=step_size_power,
+                                             count_visits=count_visits,
+                                             rng=rng)
         self.max_action_values = {}
 
     def take_action(self, state):
@@ -638,12 +867,334 @@ class QLearningAgent(BaseQAgent):
             self.prev_state = state
             self.prev_action = action
             self.prev_q_val = self.q_value((state, action))
-            self.log("size of q_values {0}\nprev state {1}\nprev action {2}\nprev q-val {3}"
-                     .format(len(self.q_values), self.prev_state, self.prev_action, self.prev_q_val))
+            if __debug__:
+                if self.verbose:
+                    self.log('size of q_values {0}\nprev state {1}\nprev action {2}\nprev q-val {3}',
+                             len(self.q_values), self.prev_state, self.prev_action, self.prev_q_val)
         q_val = self.q_value((state, action))
         if hashable_state in self.max_action_values:
             if q_val > self.max_action_values[hashable_state]:
                 self.max_action_values[hashable_state] = q_val
         else:
             self.max_action_values[hashable_state] = q_val
-        return action
\ No newline at end of file
+        return action
+
+
+class MonteCarloAgent(BaseQAgent):
+    """ This agent implements every-visit Monte Carlo control.
+
+    The state, action pairs of a game are kept in a preallocated buffer, taking an action is
+    pure epsilon greedy action selection. At the end of the game the Q-values of the buffered pairs
+    are updated towards their returns
+
+        Q(s_t,a_t) = Q(s_t,a_t) + alpha * [G_t - Q(s_t,a_t)]
+
+    where G_t = reward(s_t+1) + gamma * G_t+1 and the return of the last move is the reward of the game end.
+    With the 'inverse' step size schedule the Q-values are the sample averages of the returns.
+    The returns are unbiased (no bootstrapping), which makes it a baseline to compare the TD agents with.
+    """
+
+    # a player makes at most 5 moves in a game
+    BUFFER_SIZE = 5
+
+    def __init__(self,
+                 q_values=None,
+                 alpha=0.1,
+                 epsilon=0.1,
+                 epsilon_decay=None,
+                 gamma=0.9,
+                 verbose=False,
+                 learning=True,
+                 win=1.0,
+                 draw=0.0,
+                 lose=-1.0,
+                 not_finished=0.0,
+                 step_size='constant',
+                 step_size_power=0.6,
+                 count_visits=False,
+                 rng=None):
+        """
+            :param q_values: a dictionary holding Q(s,a) values
+            :param alpha: step size parameter in the update formula
+            :param epsilon: the exploration probability of epsilon-greedy(ness)
+            :param epsilon_decay: decay factor for epsilon
+            :param gamma: discount coefficient for future rewards
+            :param verbose: logging or not logging
+            :param learning: if True Q-values are updated at the end of each game
+            :param win: win reward
+            :param draw: draw reward
+            :param lose: lose reward
+            :param not_finished: not_finished reward
+            :param step_size: step size schedule, 'constant' (alpha), 'inverse' (1/n) or 'polynomial' (alpha/n^power)
+                of the n-th update of a state, action pair (see STEP_SIZES)
+            :param step_size_power: the power of the 'polynomial' schedule
+            :param count_visits: if True the updates of every state, action pair are counted in visits
+                (always counted by the 'inverse' and 'polynomial' schedules)
+            :param rng: random.Random instance or integer seed for exploration and tie breaking
+            :rtype: MonteCarloAgent
+        """
+        super(MonteCarloAgent, self).__init__(q_values=q_values,
+                                              alpha=alpha,
+                                              epsilon=epsilon,
+                                              epsilon_decay=epsilon_decay,
+                                              gamma=gamma,
+                                              verbose=verbose,
+                                              learning=learning,
+                                              win=win,
+                                              draw=draw,
+                                              lose=lose,
+                                              not_finished=not_finished,
+                                              step_size=step_size,
+                                              step_size_power=step_size_power,
+                                              count_visits=count_visits,
+                                              rng=rng)
+        self.episode_states = [None] * self.BUFFER_SIZE
+        self.episode_actions = [None] * self.BUFFER_SIZE
+        self.episode_length = 0
+
+    def take_action(self, state):
+        """ Epsilon greedy action selection, the state and the action are buffered for the update at game end.
+        :param state: the current state (a copy passed by the game, it is kept until the end of the game)
+        :return: epsilon-greedy action
+        """
+        action = super(MonteCarloAgent, self).take_action(state)
+        if self.learning:
+            length = self.episode_length
+            self.episode_states[length] = state
+            self.episode_actions[length] = action
+            self.episode_length = length + 1
+        return action
+
+    def end_game(self, winner):
+        """ Updates the Q-values of the buffered state, action pairs towards their returns and clears the buffer. """
+        if self.learning:
+            q_values = self.q_values
+            alpha = self.alpha
+            visits = self.visits
+            gamma = self.gamma
+            not_finished = self.not_finished
+            ret = self.reward(winner)
+            for t in range(self.episode_length - 1, -1, -1):
+                state = self.episode_states[t]
+                key = self.represent_state(state), self.episode_actions[t]
+                # exploration moves do not look up Q-values, their pairs may be new
+                q_val = q_values.get(key)
+                if q_val is None:
+                    q_val = self.reward(Game.game_state(state))
+                delta = (alpha if visits is None else self.visit(key)) * (ret - q_val)
+                q_values[key] = q_val + delta
+                self.count_update(abs(delta))
+                ret = not_finished + gamma * ret
+                self.episode_states[t] = None
+        if __debug__:
+            if self.verbose:
+                self.log('the winner is {0}, {1} Q-values updated', VALUES[winner], self.episode_length)
+        self.episode_length = 0
+        self.winner = VALUES.NOT_FINISHED
+
+
+class AfterstateAgent(BaseQAgent):
+    """ This agent learns the values of afterstates, the boards right after its moves.
+
+    Different state, action pairs leading to the same board share a single value V(s_a),
+    the table is several times smaller than a Q-value table and learning generalizes across transpositions.
+    The update formula is the SARSA formula on afterstates
+
+        V(s_a) = V(s_a) + alpha * [reward(s') + gamma * V(s'_a') - V(s_a)]
+
+    where s_a is the afterstate of the previous move and s'_a' the afterstate of the next move.
+    The values are kept in q_values with keys (afterstate, None), so the epsilon greedy policy,
+    the updates and the storage of BaseQAgent apply unchanged.
+    """
+    def __init__(self,
+                 q_values=None,
+                 alpha=0.1,
+                 epsilon=0.1,
+                 epsilon_decay=None,
+                 gamma=0.9,
+                 verbose=False,
+                 learning=True,
+                 win=1.0,
+                 draw=0.0,
+                 lose=-1.0,
+                 not_finished=0.0,
+                 step_size='constant',
+                 step_size_power=0.6,
+                 count_visits=False,
+                 rng=None):
+        """
+            :param q_values: a dictionary holding V(s_a) values with keys (afterstate, None)
+            :param alpha: step size parameter in the TD update formula
+            :param epsilon: the exploration probability of epsilon-greedy(ness)
+            :param epsilon_decay: decay factor for epsilon
+            :param gamma: discount coefficient for future rewards
+            :param verbose: logging or not logging
+            :param learning: if True values are updated after each step
+            :param win: win reward
+            :param draw: draw reward
+            :param lose: lose reward
+            :param not_finished: not_finished reward
+            :param step_size: step size schedule, 'constant' (alpha), 'inverse' (1/n) or 'polynomial' (alpha/n^power)
+                of the n-th update of a state, action pair (see STEP_SIZES)
+            :param step_size_power: the power of the 'polynomial' schedule
+            :param count_visits: if True the updates of every state, action pair are counted in visits
+                (always counted by the 'inverse' and 'polynomial' schedules)
+            :param rng: random.Random instance or integer seed for exploration and tie breaking
+            :rtype: AfterstateAgent
+        """
+        super(AfterstateAgent, self).__init__(q_values=q_values,
+                                              alpha=alpha,
+                                              epsilon=epsilon,
+                                              epsilon_decay=epsilon_decay,
+                                              gamma=gamma,
+                                              verbose=verbose,
+                                              learning=learning,
+                                              win=win,
+                                              draw=draw,
+                                              lose=lose,
+                                              not_finished=not_finished,
+                                              step_size=step_size,
+                                              step_size_power=step_size_power,
+                                              count_visits=count_visits,
+                                              rng=rng)
+
+    @staticmethod
+    def afterstate(state, (i, j), side):
+        """ The hashable board after side's move i, j in state. """
+        rows = [tuple(state[0]), tuple(state[1]), tuple(state[2])]
+        row = list(state[i])
+        row[j] = side
+        rows[i] = tuple(row)
+        return tuple(rows)
+
+    def initial_value(self, afterstate, side):
+        """ The value of a new afterstate, the reward of side's move. """
+        winner = Game.game_state(afterstate)
+        if winner == VALUES.NOT_FINISHED:
+            return self.not_finished
+        elif winner == VALUES.DRAW:
+            return self.draw
+        return self.win if winner == side else self.lose
+
+    def q_value(self, (state, action)):
+        """ The value V(s_a) of the afterstate of a state, action pair, created if it does not exist. """
+        key = self.afterstate(state, action, self.side), None
+        if key not in self.q_values:
+            self.q_values[key] = self.initial_value(key[0], self.side)
+        return self.q_values[key]
+
+    def action_values(self, state):
+        """ The values of the afterstates of all possible actions, without creating missing values.
+
+        The side to move is derived from the state, so it works for states of both sides (e.g. in freeze).
+        """
+        count_x = sum(row.count(VALUES.X) for row in state)
+        count_o = sum(row.count(VALUES.O) for row in state)
+        side = VALUES.X if count_x == count_o else VALUES.O
+        values = []
+        for i in range(3):
+            for j in range(3):
+                if state[i][j] == VALUES.EMPTY:
+                    afterstate = self.afterstate(state, (i, j), side)
+                    value = self.q_values.get((afterstate, None))
+                    values.append(((i, j), self.initial_value(afterstate, side) if value is None else value))
+        return values
+
+    def take_action(self, state):
+        """ Epsilon greedy action selection over the afterstate values.
+
+        If learning is enabled it updates the value of the previous afterstate
+        with the value of the afterstate of the chosen action.
+        :param state: the next state s'
+        :return: epsilon-greedy action a' from state s'
+        """
+        action = super(AfterstateAgent, self).take_action(state)
+        if self.learning:
+            self.update_q_values(state, self.q_value((state, action)))
+            self.prev_state = self.afterstate(state, action, self.side)
+            self.prev_action = None
+            self.prev_q_val = self.q_values[self.prev_state, None]
+            if __debug__:
+                if self.verbose:
+                    self.log('size of values {0}\nprev afterstate {1}\nprev value {2}',
+                             len(self.q_values), self.prev_state, self.prev_q_val)
+        return action
+
+    def save_q_values_to(self, path):
+        """ Saves the values to a csv file with rows of the 9 cells of the afterstate and its value. """
+        with open(path, 'wb') as out:
+            wr = csv.writer(out, quoting=csv.QUOTE_NONE)
+            for (state, _), v in self.q_values.items():
+                wr.writerow(list(state[0] + state[1] + state[2]) + [v])
+
+    def serialize_q_values(self, path):
+        """ Saves the values as a pickle, or as a compact file of state values if path ends with .qtable """
+        if path.endswith(COMPACT_EXTENSION):
+            save_compact_state_values(path, self.q_values, self.visits)
+            return
+        super(AfterstateAgent, self).serialize_q_values(path)
+
+    def deserialize_q_values(self, path):
+        """ Loads values from a pickle, or from a compact file of state values if path ends with .qtable """
+        if path.endswith(COMPACT_EXTENSION):
+            self.load_q_values(load_compact_state_values(path))
+            self.load_visits(load_compact_visits(path, FLAG_STATE_VALUES))
+            return
+        super(AfterstateAgent, self).deserialize_q_values(path)
+
+
+class FrozenAgent(Agent):
+    """ An inference only agent playing a precomputed greedy policy (see BaseQAgent.freeze).
+
+    The policy maps every reachable state to its tie set of best actions,
+    an action is a single dictionary lookup and a random choice among ties.
+    """
+
+    def __init__(self, policy, epsilon=0.0, rng=None):
+        """
+            :param policy: dictionary of hashable state: tuple of best actions
+            :param epsilon: the exploration probability
+            :param rng: random.Random instance or integer seed for exploration and tie breaking
+        """
+        super(FrozenAgent, self).__init__(rng=rng)
+        self.policy = policy
+        self.epsilon = epsilon
+
+    def take_action(self, state):
+        actions = self.policy.get(self.represent_state(state))
+        if not actions or (self.epsilon > 0.0 and self.rng.random() < self.epsilon):
+            return self.random_next_action(state)
+        if len(actions) == 1:
+            return actions[0]
+        return self.rng.choice(actions)
+
+    def action_distribution(self, state):
+        actions = self.policy.get(self.represent_state(state))
+        if not actions:
+            return self.uniform_distribution(state)
+        return epsilon_greedy_distribution(state, actions, self.epsilon)
+
+
+AGENT_CLASSES = {'RandomAgent': RandomAgent,
+                 'WinBlockingRandomAgent': WinBlockingRandomAgent,
+                 'DummyAgent': DummyAgent,
+                 'SarsaAgent': SarsaAgent,
+                 'QLearningAgent': QLearningAgent,
+                 'AfterstateAgent': AfterstateAgent,
+                 'MonteCarloAgent': MonteCarloAgent}
+
+
+def make_agent(kind, q_values_path=None, **params):
+    """ Creates an agent from its class name.
+
+    :param kind: name of the agent class, a key of AGENT_CLASSES
+    :param q_values_path: optional path of serialized Q-values to load into a BaseQAgent
+    :param params: keyword arguments passed to the agent's constructor
+    :return: agent
+    """
+    if kind not in AGENT_CLASSES:
+        raise ValueError('unknown agent type {0}'.format(kind))
+    agent = AGENT_CLASSES[kind](**params)
+    if q_values_path is not None:
+        agent.deserialize_q_values(q_values_path)
+    return agent
@@ -0,0 +1,232 @@
+#!/usr/bin/env python
+# ----------------------------------------------------------------------
+# The MIT License (MIT)
+#
+# Copyright (c) 2015 eidonfiloi
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ----------------------------------------------------------------------
+
+""" This file contains the benchmark suite of the game and the agents.
+
+It measures
+    - games/sec and moves/sec for every pairing of RandomAgent, WinBlockingRandomAgent, SarsaAgent and QLearningAgent
+    - microbenchmarks of the hot methods (game_state, greedy_next_action, q_value, update_q_values, ...)
+    - load time of the Q-values in trained_agents, as pickles and as compact Q-tables
+    - peak memory (maximum resident set size) of the process
+
+and writes the results as json. Results can be compared against a stored baseline, e.g.:
+
+        python bench.py --output bench_results.json --baseline bench_baseline.json
+
+exits with status 1 if any result is worse than the baseline by more than the tolerance.
+"""
+
+import os
+import sys
+import glob
+import json
+import shutil
+import time
+import timeit
+import argparse
+import resource
+import tempfile
+from agent import *
+from qtable import COMPACT_EXTENSION
+
+
+_LOGGER = logging.getLogger(__name__)
+
+PAIRING_AGENTS = ['RandomAgent', 'WinBlockingRandomAgent', 'SarsaAgent', 'QLearningAgent']
+
+BOARD_PLAYING = [[VALUES.X, VALUES.O, VALUES.EMPTY],
+                 [VALUES.EMPTY, VALUES.X, VALUES.EMPTY],
+                 [VALUES.EMPTY, VALUES.O, VALUES.EMPTY]]
+
+BOARD_DRAW = [[VALUES.X, VALUES.O, VALUES.X],
+              [VALUES.X, VALUES.O, VALUES.X],
+              [VALUES.O, VALUES.X, VALUES.O]]
+
+
+def result(value, unit, higher_is_better):
+    """ A benchmark result, higher_is_better None for informational values never compared to the baseline. """
+    return {'value': value, 'unit': unit, 'higher_is_better': higher_is_better}
+
+
+def time_per_call(func, min_time=0.2, repeat=3):
+    """ Microseconds per call of func, the best of repeat measurements of at least min_time seconds."""
+    timer = timeit.Timer(func)
+    number = 1
+    while timer.timeit(number) < min_time / 10.0:
+        number *= 10
+    return 1e6 * min(timer.repeat(repeat, number)) / number
+
+
+def bench_pairings(num_games):
+    """ games/sec and moves/sec of every (X, O) pairing of learning agents. """
+    results = {}
+    for kind_x in PAIRING_AGENTS:
+        for kind_o in PAIRING_AGENTS:
+            player_x = make_agent(kind_x, rng=1)
+            player_o = make_agent(kind_o, rng=2)
+            moves = 0
+            start = time.time()
+            game = Game(player_x, player_o)
+            for _ in range(num_games):
+                game.reset()
+                game.play()
+                moves += game.step
+            elapsed = time.time() - start
+            name = '{0}_vs_{1}'.format(kind_x, kind_o)
+            results['games_per_sec.' + name] = result(num_games / elapsed, 'games/s', True)
+            results['moves_per_sec.' + name] = result(moves / elapsed, 'moves/s', True)
+    return results
+
+
+def bench_hot_methods(min_time):
+    """ Microbenchmarks of the methods called in every move. """
+    sarsa = SarsaAgent(rng=1)
+    sarsa.set_side(VALUES.X)
+    q_agent = QLearningAgent(rng=1)
+    q_agent.set_side(VALUES.X)
+    win_block = WinBlockingRandomAgent(rng=1)
+    win_block.set_side(VALUES.X)
+    sarsa.greedy_next_action(BOARD_PLAYING)
+    sarsa.prev_state = BOARD_PLAYING
+    sarsa.prev_action = (1, 0)
+    sarsa.prev_q_val = sarsa.q_value((BOARD_PLAYING, (1, 0)))
+    player_x = DummyAgent()
+    player_o = DummyAgent()
+    reused_game = Game(player_x, player_o)
+
+    benchmarks = {'game_state_not_finished': lambda: Game.game_state(BOARD_PLAYING),
+                  'game_state_draw': lambda: Game.game_state(BOARD_DRAW),
+                  'represent_state': lambda: sarsa.represent_state(BOARD_PLAYING),
+                  'q_value': lambda: sarsa.q_value((BOARD_PLAYING, (1, 0))),
+                  'greedy_next_action': lambda: sarsa.greedy_next_action(BOARD_PLAYING),
+                  'update_q_values': lambda: sarsa.update_q_values(BOARD_PLAYING, 0.5),
+                  'sarsa_take_action': lambda: sarsa.take_action(BOARD_PLAYING),
+                  'q_learning_take_action': lambda: q_agent.take_action(BOARD_PLAYING),
+                  'win_block_take_action': lambda: win_block.take_action(BOARD_PLAYING),
+                  'game_setup': lambda: Game(player_x, player_o),
+                  'game_reset': lambda: reused_game.reset(),
+                  'dummy_game': lambda: Game(player_x, player_o).play()}
+    return dict(('us_per_call.' + name, result(time_per_call(func, min_time), 'us', False))
+                for name, func in benchmarks.items())
+
+
+def bench_load(directory='trained_agents'):
+    """ Load time of every pickled Q-value file of a directory, and of its conversion to a compact Q-table. """
+    results = {}
+    compact_directory = tempfile.mkdtemp()
+    try:
+        for path in sorted(glob.glob(os.path.join(directory, '*.pickle'))):
+            agent = SarsaAgent()
+            start = time.time()
+            agent.deserialize_q_values(path)
+            elapsed = time.time() - start
+            name = os.path.splitext(os.path.basename(path))[0]
+            results['load_sec.' + name] = result(elapsed, 's', False)
+            results['q_values.' + name] = result(len(agent.q_values), 'entries', None)
+            compact_path = os.path.join(compact_directory, name + COMPACT_EXTENSION)
+            agent.serialize_q_values(compact_path)
+            agent = SarsaAgent()
+            start = time.time()
+            agent.deserialize_q_values(compact_path)
+            results['load_sec_compact.' + name] = result(time.time() - start, 's', False)
+    finally:
+        shutil.rmtree(compact_directory)
+    return results
+
+
+def run(quick=False):
+    results = {}
+    results.update(bench_pairings(200 if quick else 2000))
+    results.update(bench_hot_methods(0.05 if quick else 0.2))
+    results.update(bench_load())
+    results['peak_rss_kb'] = result(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, 'kB', False)
+    return results
+
+
+def compare(results, baseline, tolerance=0.1):
+    """ Compares results to a baseline.
+    :param results: benchmark results, the informational ones are skipped
+    :param baseline: baseline results
+    :param tolerance: allowed relative change to the worse
+    :return: list of (name, baseline value, value, relative change) tuples of regressions,
+        the relative change is positive if the result got worse
+    """
+    regressions = []
+    for name in sorted(results):
+        if results[name]['higher_is_better'] is None or name not in baseline or baseline[name]['value'] == 0:
+            continue
+        value = results[name]['value']
+        base = baseline[name]['value']
+        change = (value - base) / float(base)
+        if results[name]['higher_is_better']:
+            change = -change
+        if change > tolerance:
+            regressions.append((name, base, value, change))
+    return regressions
+
+
+def write(results, path):
+    with open(path, 'w') as out:
+        json.dump({'python': sys.version.split()[0], 'results': results}, out, indent=2, sort_keys=True)
+
+
+def read(path):
+    with open(path) as f:
+        return json.load(f)['results']
+
+
+def main(output='bench_results.json', baseline='bench_baseline.json', save_baseline=False, tolerance=0.1,
+         quick=False):
+    """ Runs the suite, writes the results and compares them against the baseline.
+    :return: list of regressions (see compare)
+    """
+    bench_results = run(quick)
+    write(bench_results, output)
+    for key in sorted(bench_results):
+        _LOGGER.info('{0}: {1:.3f} {2}'.format(key, bench_results[key]['value'], bench_results[key]['unit']))
+
+    if save_baseline:
+        write(bench_results, baseline)
+        return []
+    found = compare(bench_results, read(baseline), tolerance) if os.path.exists(baseline) else []
+    for key, base_value, new_value, relative in found:
+        _LOGGER.warning('regression {0}: {1:.3f} -> {2:.3f} ({3:+.1%})'.format(key, base_value, new_value, relative))
+    return found
+
+
+if __name__ == '__main__':
+
+    logging.basicConfig(level=logging.INFO)
+
+    parser = argparse.ArgumentParser(description='tic tac toe benchmark suite')
+    parser.add_argument('--output', default='bench_results.json', help='json file of the results')
+    parser.add_argument('--baseline', default='bench_baseline.json', help='json file of the baseline results')
+    parser.add_argument('--save-baseline', action='store_true', help='store the results as the new baseline')
+    parser.add_argument('--tolerance', type=float, default=0.1, help='allowed relative regression')
+    parser.add_argument('--quick', action='store_true', help='fewer games and shorter timings')
+    args = parser.parse_args()
+
+    if len(main(args.output, args.baseline, args.save_baseline, args.tolerance, args.quick)) > 0:
+        sys.exit(1)
@@ -0,0 +1,224 @@
+#!/usr/bin/env python
+# ----------------------------------------------------------------------
+# The MIT License (MIT)
+#
+# Copyright (c) 2015 eidonfiloi
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ----------------------------------------------------------------------
+
+""" This file contains the command line entry point of training, evaluation, play, conversion, merging and benchmarks.
+
+        python cli.py train --agent SarsaAgent --opponent WinBlockingRandomAgent --episodes 100 --games 100 \
+            --output trained_agents/SarsaAgent_in_SarsaAgent_vs_WinBlockingRandomAgent_ep_100_g_100.qtable
+        python cli.py train --spec specs/q_vs_sarsa_against_pre_trained_3.json --spec specs/<other>.json
+        python cli.py evaluate --agent SarsaAgent:trained_agents/<file>.qtable --opponent WinBlockingRandomAgent
+        python cli.py play --agent SarsaAgent:trained_agents/<file>.qtable
+        python cli.py convert trained_agents/*.pickle
+        python cli.py merge shards/*.qtable --output trained_agents/<file>.qtable
+        python cli.py bench --quick
+
+Agents are given as kind[:path], the class name of the agent and an optional file of Q-values.
+The modules of a command are imported only when the command runs and matplotlib is never imported,
+so short jobs (e.g. many evaluations) start quickly.
+"""
+
+import sys
+import json
+import logging
+import argparse
+
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def parse_agent(spec, rng=None, **q_params):
+    """ Creates an agent from a kind[:path] specification.
+    :param spec: class name of the agent, optionally followed by a colon and the path of its Q-values
+    :param rng: random.Random instance or integer seed of the agent
+    :param q_params: keyword arguments passed to the constructor of Q-learning agents only
+    :return: agent
+    """
+    from agent import AGENT_CLASSES, BaseQAgent, make_agent
+    kind, _, path = spec.partition(':')
+    params = q_params if kind in AGENT_CLASSES and issubclass(AGENT_CLASSES[kind], BaseQAgent) else {}
+    return make_agent(kind, path or None, rng=rng, **params)
+
+
+def _seeds(seed):
+    return (None, None) if seed is None else (seed, seed + 1)
+
+
+def train(args):
+    if args.spec:
+        from specs import run_specs
+        run_specs(args.spec, args.processes)
+        return 0
+    from specs import complete_spec, run_spec
+    agents = []
+    for spec, agent_epsilon in [(args.agent, args.epsilon), (args.opponent, args.opponent_epsilon)]:
+        kind, _, path = spec.partition(':')
+        agents.append({'kind': kind, 'q_values': path or None, 'epsilon': agent_epsilon})
+    spec = complete_spec({'episodes': args.episodes,
+                          'games_per_episode': args.games,
+                          'seed': args.seed,
+                          'agent1': agents[0],
+                          'agent2': agents[1],
+                          'early_stopping': {} if args.early_stop else None,
+                          'instrumentation': {} if args.instrument else None,
+                          'evaluation': None if args.evaluate_every is None else {'every': args.evaluate_every},
+                          'outputs': {'metrics': args.metrics, 'agent1_q_values': args.output}})
+    for k, v in sorted(run_spec(spec).items()):
+        _LOGGER.info('{0}: rolling mean {1:.3f}, mean {2:.3f}'.format(k, v['rolling'], v['overall']))
+    if args.output is not None:
+        _LOGGER.info('Q-values saved to {0}'.format(args.output))
+    return 0
+
+
+def evaluate(args):
+    from experiments import calculate_winner_frequency_dict
+    seed_agent, seed_opponent = _seeds(args.seed)
+    agent = parse_agent(args.agent, rng=seed_agent, learning=False, epsilon=0.0)
+    opponent = parse_agent(args.opponent, rng=seed_opponent, learning=False, epsilon=0.0)
+    if args.freeze:
+        agent = agent.freeze() if hasattr(agent, 'freeze') else agent
+        opponent = opponent.freeze() if hasattr(opponent, 'freeze') else opponent
+    if args.sequential is not None:
+        import experiments
+        test = {'better': experiments.sequential_better,
+                'never-loses': experiments.sequential_never_loses,
+                'rates': experiments.sequential_rates}[args.sequential]
+        result = test(agent, opponent, max_games=2 * args.games)
+        print json.dumps(dict(result, agent=args.agent, opponent=args.opponent, test=args.sequential), sort_keys=True)
+        return 0
+    if args.exact:
+        from exact import exact_winner_frequency_dict
+        frequencies = exact_winner_frequency_dict(agent, opponent)
+    else:
+        frequencies = calculate_winner_frequency_dict(agent, opponent, args.games)
+    print json.dumps({'agent': args.agent, 'opponent': args.opponent, 'games': None if args.exact else args.games,
+                      'frequencies': frequencies}, sort_keys=True)
+    return 0
+
+
+def play(args):
+    from main import run_agent_against_human
+    agent = parse_agent(args.agent, rng=args.seed, learning=False, epsilon=0.0)
+    run_agent_against_human(agent.freeze() if args.freeze and hasattr(agent, 'freeze') else agent)
+    return 0
+
+
+def convert(args):
+    import glob
+    from qtable import convert_all
+    convert_all(args.paths or sorted(glob.glob('trained_agents/*.pickle') + glob.glob('trained_agents/*.csv')),
+                args.output_dir)
+    return 0
+
+
+def merge(args):
+    from merge import merge as merge_files
+    merge_files(args.paths, args.output, args.mode)
+    return 0
+
+
+def bench(args):
+    import bench as suite
+    regressions = suite.main(args.output, args.baseline, args.save_baseline, args.tolerance, args.quick)
+    return 1 if len(regressions) > 0 else 0
+
+
+def make_parser():
+    parser = argparse.ArgumentParser(description='tic tac toe reinforcement learning')
+    parser.add_argument('--log-level', default='INFO', help='logging level')
+    commands = parser.add_subparsers(title='commands')
+
+    command = commands.add_parser('train', help='train an agent against an opponent')
+    command.add_argument('--agent', default='SarsaAgent', help='kind[:path] of the trained agent')
+    command.add_argument('--opponent', default='WinBlockingRandomAgent', help='kind[:path] of the opponent')
+    command.add_argument('--episodes', type=int, default=100)
+    command.add_argument('--games', type=int, default=100, help='games per side in an episode')
+    command.add_argument('--epsilon', type=float, default=0.1, help='exploration rate of the agent')
+    command.add_argument('--opponent-epsilon', type=float, default=0.1, help='exploration rate of the opponent')
+    command.add_argument('--metrics', help='metrics file (default: in the metrics directory)')
+    command.add_argument('--output', help='file to save the Q-values to (.pickle or .qtable)')
+    command.add_argument('--seed', type=int)
+    command.add_argument('--early-stop', action='store_true',
+                         help='stop when the Q-values and outcome rates converged (see convergence.py)')
+    command.add_argument('--instrument', action='store_true',
+                         help='add Q-table size, growth, updates and coverage to the metrics (see instrumentation.py)')
+    command.add_argument('--evaluate-every', type=int, metavar='EPISODES',
+                         help='evaluate snapshots of the agent in the background (see snapshots.py)')
+    command.add_argument('--spec', action='append',
+                         help='run the experiments of json spec files instead (see specs.py), skipping finished ones')
+    command.add_argument('--processes', type=int, help='number of worker processes of specs')
+    command.set_defaults(func=train)
+
+    command = commands.add_parser('evaluate', help='win-draw-lose frequencies of greedy agents, printed as json')
+    command.add_argument('--agent', required=True, help='kind[:path] of the evaluated agent')
+    command.add_argument('--opponent', default='WinBlockingRandomAgent', help='kind[:path] of the opponent')
+    command.add_argument('--games', type=int, default=100, help='games per side')
+    command.add_argument('--freeze', action='store_true', help='play frozen greedy policies')
+    command.add_argument('--exact', action='store_true',
+                         help='exact probabilities by walking the game tree instead of sampling games (see exact.py)')
+    command.add_argument('--sequential', choices=['better', 'never-loses', 'rates'],
+                         help='play batches of games until a sequential test decides if the agent is better, '
+                              'never loses, or its rates are known to +-2.5%%, at most --games per side')
+    command.add_argument('--seed', type=int)
+    command.set_defaults(func=evaluate)
+
+    command = commands.add_parser('play', help='play against an agent on the console')
+    command.add_argument('--agent', required=True, help='kind[:path] of the opponent agent')
+    command.add_argument('--freeze', action='store_true', help='play a frozen greedy policy')
+    command.add_argument('--seed', type=int)
+    command.set_defaults(func=play)
+
+    command = commands.add_parser('convert', help='convert legacy Q-values to compact Q-table files')
+    command.add_argument('paths', nargs='*', help='legacy pickle or csv files (default: everything in trained_agents)')
+    command.add_argument('--output-dir', help='directory of the compact files (default: next to the legacy files)')
+    command.set_defaults(func=convert)
+
+    command = commands.add_parser('merge', help='merge independently trained Q-tables (see merge.py)')
+    command.add_argument('paths', nargs='+', help='compact Q-table, pickle or csv files')
+    command.add_argument('--output', required=True, help='the merged compact Q-table file')
+    command.add_argument('--mode', choices=['visits', 'max_confidence'], default='visits')
+    command.set_defaults(func=merge)
+
+    command = commands.add_parser('bench', help='run the benchmark suite')
+    command.add_argument('--output', default='bench_results.json', help='json file of the results')
+    command.add_argument('--baseline', default='bench_baseline.json', help='json file of the baseline results')
+    command.add_argument('--save-baseline', action='store_true', help='store the results as the new baseline')
+    command.add_argument('--tolerance', type=float, default=0.1, help='allowed relative regression')
+    command.add_argument('--quick', action='store_true', help='fewer games and shorter timings')
+    command.set_defaults(func=bench)
+    return parser
+
+
+def main(argv=None):
+    """ Runs a command.
+    :param argv: command line arguments (default: sys.argv[1:])
+    :return: exit status
+    """
+    args = make_parser().parse_args(argv)
+    logging.basicConfig(level=getattr(logging, args.log_level.upper()))
+    return args.func(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
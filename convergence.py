@@ -0,0 +1,170 @@
+#!/usr/bin/env python
+# ----------------------------------------------------------------------
+# The MIT License (MIT)
+#
+# Copyright (c) 2015 eidonfiloi
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ----------------------------------------------------------------------
+
+""" This file contains the convergence detection of training runs.
+
+A ConvergenceMonitor is updated after every episode with the largest absolute Q-value change
+of the episode (see BaseQAgent.reset_max_delta) and the win, draw, loss counts of the trained agent
+(counted by OutcomeCounter hooks). Training has converged when
+
+    - the mean of the largest Q-value changes of the last window episodes differs by at most delta_tolerance
+      (relative) from the mean of the window before and
+    - the win, draw and loss rates of the last window episodes lie within the Wilson confidence intervals
+      of the rates of the window before,
+
+for patience consecutive episodes. With a constant step size and exploration the largest change
+of an episode does not go to zero, it levels off, so the Q-values are stable when it stopped decreasing.
+"""
+
+from collections import deque
+from math import sqrt
+from game import GameHooks
+from globals import VALUES
+
+
+OUTCOMES = ['win', 'draw', 'loss']
+
+
+def wilson_interval(successes, trials, z=1.96):
+    """ The Wilson score confidence interval of a binomial proportion.
+    :param successes: number of successes
+    :param trials: number of trials
+    :param z: standard normal quantile of the confidence level (1.96 for 95%)
+    :return: lower, upper bound
+    """
+    if trials == 0:
+        return 0.0, 1.0
+    p = float(successes) / trials
+    denominator = 1.0 + z * z / trials
+    center = (p + z * z / (2.0 * trials)) / denominator
+    half_width = z * sqrt(p * (1.0 - p) / trials + z * z / (4.0 * trials * trials)) / denominator
+    return max(0.0, center - half_width), min(1.0, center + half_width)
+
+
+class OutcomeCounter(GameHooks):
+    """ Game hooks counting the wins, draws and losses of an agent on both sides. """
+
+    def __init__(self, agent):
+        self.agent = agent
+        self.counts = dict((outcome, 0) for outcome in OUTCOMES)
+
+    def end_game(self, game, winner):
+        if winner == VALUES.DRAW:
+            self.counts['draw'] += 1
+        elif (winner == VALUES.X) == (game.player_x is self.agent):
+            self.counts['win'] += 1
+        else:
+            self.counts['loss'] += 1
+
+    def reset(self):
+        """ The counts since the last reset, then resets them. """
+        counts = self.counts
+        self.counts = dict((outcome, 0) for outcome in OUTCOMES)
+        return counts
+
+
+class ConvergenceMonitor(object):
+    """ Decides when a training run has converged (see the module documentation). """
+
+    def __init__(self, delta_tolerance=0.1, window=20, patience=10, min_episodes=50, z=1.96):
+        """
+            :param delta_tolerance: allowed relative change of the windowed mean of the largest Q-value changes,
+                None to ignore Q-value changes
+            :param window: number of episodes in the windows of the outcome rates
+            :param patience: number of consecutive stable episodes needed
+            :param min_episodes: never stop before this number of episodes
+            :param z: standard normal quantile of the confidence intervals (1.96 for 95%)
+        """
+        self.delta_tolerance = delta_tolerance
+        self.window = window
+        self.patience = patience
+        self.min_episodes = min_episodes
+        self.z = z
+        self.episodes = 0
+        self.outcomes = deque(maxlen=2 * window)
+        self.deltas = deque(maxlen=2 * window)
+        self.stable_deltas = 0
+        self.stable_rates = 0
+        self.last = {}
+
+    @staticmethod
+    def _totals(episodes):
+        totals = dict((outcome, 0) for outcome in OUTCOMES)
+        for counts in episodes:
+            for outcome in OUTCOMES:
+                totals[outcome] += counts[outcome]
+        return totals, sum(totals.values())
+
+    def rates(self):
+        """ The outcome rates of the last window episodes with their confidence intervals.
+        :return: dictionary of outcome: (rate, lower, upper)
+        """
+        totals, trials = self._totals(list(self.outcomes)[-self.window:])
+        return dict((outcome, (float(totals[outcome]) / trials if trials > 0 else None,)
+                     + wilson_interval(totals[outcome], trials, self.z)) for outcome in OUTCOMES)
+
+    def _deltas_stable(self):
+        if self.delta_tolerance is None:
+            return True
+        if len(self.deltas) < 2 * self.window:
+            return False
+        deltas = list(self.deltas)
+        previous = sum(deltas[:self.window]) / self.window
+        current = sum(deltas[self.window:]) / self.window
+        return abs(current - previous) <= self.delta_tolerance * previous
+
+    def _rates_stable(self):
+        if len(self.outcomes) < 2 * self.window:
+            return False
+        episodes = list(self.outcomes)
+        previous, previous_trials = self._totals(episodes[:self.window])
+        current, current_trials = self._totals(episodes[self.window:])
+        if previous_trials == 0 or current_trials == 0:
+            return False
+        for outcome in OUTCOMES:
+            lower, upper = wilson_interval(previous[outcome], previous_trials, self.z)
+            if not lower <= float(current[outcome]) / current_trials <= upper:
+                return False
+        return True
+
+    def update(self, max_delta, counts):
+        """ Records an episode.
+        :param max_delta: the largest absolute Q-value change of the episode
+        :param counts: dictionary of win, draw and loss counts of the episode
+        :return: True if training has converged
+        """
+        self.episodes += 1
+        self.outcomes.append(counts)
+        self.deltas.append(max_delta)
+        self.stable_deltas = self.stable_deltas + 1 if self._deltas_stable() else 0
+        self.stable_rates = self.stable_rates + 1 if self._rates_stable() else 0
+        self.last = {'max_delta': max_delta, 'stable_deltas': self.stable_deltas, 'stable_rates': self.stable_rates}
+        return self.converged
+
+    @property
+    def converged(self):
+        return (self.episodes >= self.min_episodes and
+                self.stable_deltas >= self.patience and
+                self.stable_rates >= self.patience)
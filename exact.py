@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+# ----------------------------------------------------------------------
+# The MIT License (MIT)
+#
+# Copyright (c) 2015 eidonfiloi
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ----------------------------------------------------------------------
+
+""" This file contains the exact outcome probabilities of games between agents with stationary policies.
+
+Instead of sampling games, the game tree is walked from the empty board, every agent gives
+the probabilities of its actions in a state (Agent.action_distribution) and the outcome
+probabilities of every reached state are memoized. There are only 5478 legal states,
+so exact probabilities take a few milliseconds instead of millions of sampled games.
+
+Agents must not learn or change their policy while evaluated (e.g. BaseQAgent with learning=False
+and without epsilon_decay), RandomAgent is treated as uniformly random (its memory of played moves is ignored).
+"""
+
+from agent import *
+
+
+def outcome_probabilities(player_x, player_o, board=None):
+    """ The exact probabilities of the outcomes of a game.
+    :param player_x: agent playing X
+    :param player_o: agent playing O
+    :param board: the board to start from (default: the empty board)
+    :return: dictionary of VALUES.X, VALUES.O, VALUES.DRAW: probability
+    """
+    memo = {}
+
+    def walk(state):
+        hashable_state = Agent.represent_state(state)
+        if hashable_state in memo:
+            return memo[hashable_state]
+        winner = Game.game_state(state)
+        if winner != VALUES.NOT_FINISHED:
+            probabilities = {VALUES.X: 0.0, VALUES.O: 0.0, VALUES.DRAW: 0.0}
+            probabilities[winner] = 1.0
+        else:
+            count_x = sum(row.count(VALUES.X) for row in state)
+            count_o = sum(row.count(VALUES.O) for row in state)
+            side = VALUES.X if count_x == count_o else VALUES.O
+            player = player_x if side == VALUES.X else player_o
+            # the same agent may play both sides
+            player.set_side(side)
+            probabilities = {VALUES.X: 0.0, VALUES.O: 0.0, VALUES.DRAW: 0.0}
+            for (i, j), p in player.action_distribution(state):
+                if p == 0.0:
+                    continue
+                state[i][j] = side
+                for outcome, q in walk(state).items():
+                    probabilities[outcome] += p * q
+                state[i][j] = VALUES.EMPTY
+        memo[hashable_state] = probabilities
+        return probabilities
+
+    start = Game.setup_board() if board is None else [list(row) for row in board]
+    return dict(walk(start))
+
+
+def exact_winner_frequency_dict(agent1, agent2):
+    """ The exact counterpart of experiments.calculate_winner_frequency_dict.
+    :param agent1: player1
+    :param agent2: player2
+    :return: dictionary of win-draw-lose probabilities for both players in both side
+    """
+    first = outcome_probabilities(agent1, agent2)
+    second = outcome_probabilities(agent2, agent1)
+    return {'agent1_x_win': first[VALUES.X],
+            'agent2_o_win': first[VALUES.O],
+            'agent1_x_agent2_o_draw': first[VALUES.DRAW],
+            'agent2_x_win': second[VALUES.X],
+            'agent1_o_win': second[VALUES.O],
+            'agent2_x_agent1_o_draw': second[VALUES.DRAW]}
@@ -23,14 +23,15 @@
 # SOFTWARE.
 # ----------------------------------------------------------------------
 
-"""This file contains methods for running experiments between agents and plotting their performance."""
+"""This file contains methods for running experiments between agents and recording their performance."""
 
+from math import log
 from agent import *
-import matplotlib.pyplot as plt
-from math import sqrt
+from convergence import OutcomeCounter, wilson_interval
 
 
-def calculate_average_reward(agent1, agent2, num_games, epsilon1=0.1, epsilon2=0.1, win=1.0, draw=0.0, lose=-1.0):
+def calculate_average_reward(agent1, agent2, num_games, epsilon1=0.1, epsilon2=0.1, win=1.0, draw=0.0, lose=-1.0,
+                             hooks=None):
     """ A helper method for experiments.
 
     This method runs games between two agents, both agents playing both sides
@@ -43,6 +44,7 @@ def calculate_average_reward(agent1, agent2, num_games, epsilon1=0.1, epsilon2=0
     :param win: win reward
     :param draw: draw reward
     :param lose: loss reward
+    :param hooks: optional GameHooks of the games
     :return: dictionary containing average rewards for both players
     """
     agent1.epsilon = epsilon1
@@ -51,8 +53,9 @@ def calculate_average_reward(agent1, agent2, num_games, epsilon1=0.1, epsilon2=0
                   'agent2_o': 0,
                   'agent1_o': 0,
                   'agent2_x': 0}
+    game1 = Game(player_x=agent1, player_o=agent2, hooks=hooks)
     for _ in range(num_games):
-        game1 = Game(player_x=agent1, player_o=agent2)
+        game1.reset()
         winner1 = game1.play()
         if winner1 == VALUES.X:
             reward_map['agent1_x'] += win / num_games
@@ -63,8 +66,9 @@ def calculate_average_reward(agent1, agent2, num_games, epsilon1=0.1, epsilon2=0
         else:
             reward_map['agent1_x'] += draw / num_games
             reward_map['agent2_o'] += draw / num_games
+    game2 = Game(player_x=agent2, player_o=agent1, hooks=hooks)
     for _ in range(num_games):
-        game2 = Game(player_x=agent2, player_o=agent1)
+        game2.reset()
         winner2 = game2.play()
         if winner2 == VALUES.X:
             reward_map['agent2_x'] += win / num_games
@@ -94,8 +98,9 @@ def calculate_winner_frequency_dict(agent1, agent2, num_games):
                      'agent2_x_win': 0,
                      'agent1_o_win': 0,
                      'agent2_x_agent1_o_draw': 0}
+    game1 = Game(player_x=agent1, player_o=agent2)
     for _ in range(num_games):
-        game1 = Game(player_x=agent1, player_o=agent2)
+        game1.reset()
         winner1 = game1.play()
         if winner1 == VALUES.X:
             winner_counts['agent1_x_win'] += 1.0 / num_games
@@ -103,8 +108,9 @@ def calculate_winner_frequency_dict(agent1, agent2, num_games):
             winner_counts['agent2_o_win'] += 1.0 / num_games
         else:
             winner_counts['agent1_x_agent2_o_draw'] += 1.0 / num_games
+    game2 = Game(player_x=agent2, player_o=agent1)
     for _ in range(num_games):
-        game2 = Game(player_x=agent2, player_o=agent1)
+        game2.reset()
         winner2 = game2.play()
         if winner2 == VALUES.X:
             winner_counts['agent2_x_win'] += 1.0 / num_games
@@ -114,124 +120,115 @@ def calculate_winner_frequency_dict(agent1, agent2, num_games):
             winner_counts['agent2_x_agent1_o_draw'] += 1.0 / num_games
     return winner_counts
 
-if __name__ == '__main__':
-
-    logging.basicConfig(level=logging.DEBUG)
-
-    # set reward scheme
-    WIN = 1.0
-    DRAW = 0.0
-    LOSE = -1.0
-    NOT_FINISHED = 0.0
-
-    # initialize different players
-    player_random = RandomAgent()
-    player_winblock_random = WinBlockingRandomAgent()
-    player_sarsa = SarsaAgent(verbose=True,
-                              epsilon=0.1,
-                              win=WIN,
-                              draw=DRAW,
-                              lose=LOSE,
-                              not_finished=NOT_FINISHED)
-    player_q = QLearningAgent(verbose=True,
-                              epsilon=0.1,
-                              win=WIN,
-                              draw=DRAW,
-                              lose=LOSE,
-                              not_finished=NOT_FINISHED)
-
-    # load serialized Q values if necessary
-    player_sarsa.deserialize_q_values(
-        'trained_agents/SarsaAgent_in_SarsaAgent_vs_SarsaAgent_ep_500_g_500_itself_pre_trained_3.pickle')
-
-    player_q.deserialize_q_values(
-        'trained_agents/QLearningAgent_in_QLearningAgent_vs_QLearningAgent_ep_500_g_500_itself_pre_trained_3.pickle')
-
-    # set player_x and player_o
-    player_x = player_q
-    player_o = player_sarsa
 
+class SPRT(object):
+    """ Wald's sequential probability ratio test of a Bernoulli probability p, H0: p = p0 against H1: p = p1. """
+
+    def __init__(self, p0, p1, alpha=0.05, beta=0.05):
+        """
+            :param p0: p under the null hypothesis
+            :param p1: p under the alternative hypothesis
+            :param alpha: probability of accepting H1 if H0 is true
+            :param beta: probability of accepting H0 if H1 is true
+        """
+        self.success_weight = log(p1 / p0)
+        self.failure_weight = log((1.0 - p1) / (1.0 - p0))
+        self.lower = log(beta / (1.0 - alpha))
+        self.upper = log((1.0 - beta) / alpha)
+
+    def decision(self, successes, trials):
+        """ True if H1 is accepted, False if H0 is accepted, None if more trials are needed. """
+        llr = successes * self.success_weight + (trials - successes) * self.failure_weight
+        if llr >= self.upper:
+            return True
+        elif llr <= self.lower:
+            return False
+        return None
+
+
+def play_sequential(agent1, agent2, stop, batch_size=20, max_games=10000):
+    """ Plays batches of games, both agents playing both sides, until stop decides.
+    :param agent1: player1
+    :param agent2: player2
+    :param stop: function of the win, draw, loss counts of agent1 returning a decision or None to continue
+    :param batch_size: games per side in a batch
+    :param max_games: maximal number of games (both sides)
+    :return: dictionary of the decision (None if max_games was reached first), the number of games and the counts
     """
-    set if q-values should be serialized after experiment
-    and/or performance plots should be saved
-    with unique name ending
+    counter = OutcomeCounter(agent1)
+    game1 = Game(player_x=agent1, player_o=agent2, hooks=counter)
+    game2 = Game(player_x=agent2, player_o=agent1, hooks=counter)
+    decision = None
+    games = 0
+    while decision is None and games < max_games:
+        for _ in range(batch_size):
+            game1.reset()
+            game1.play()
+            game2.reset()
+            game2.play()
+        games += 2 * batch_size
+        decision = stop(counter.counts)
+    result = {'decision': decision, 'games': games}
+    result.update(counter.counts)
+    return result
+
+
+def sequential_better(agent1, agent2, delta=0.1, alpha=0.05, beta=0.05, batch_size=20, max_games=10000):
+    """ Is agent1 better than agent2?
+
+    An SPRT on the decisive games, H0: agent1 wins half of them against H1: agent1 wins 0.5 + delta of them.
+    :return: see play_sequential, the decision is True if agent1 is better
     """
+    test = SPRT(0.5, 0.5 + delta, alpha, beta)
+    return play_sequential(agent1, agent2, lambda counts: test.decision(counts['win'], counts['win'] + counts['loss']),
+                           batch_size, max_games)
 
-    serialize_x = False
-    serialize_o = False
-    save_image = False
-    name_append = 'against_pre_trained_3'
-
-    # set plot colors and dict's holding data for plot
-    colors_reward = {'agent1_x': 'r',
-                     'agent2_o': 'b',
-                     'agent1_o': 'g',
-                     'agent2_x': 'c'}
-
-    colors_prob = {'agent1_x_win': 'r',
-                   'agent2_o_win': 'b',
-                   'agent1_x_agent2_o_draw': 'g',
-                   'agent2_x_win': 'c',
-                   'agent1_o_win': 'm',
-                   'agent2_x_agent1_o_draw': 'y'}
-
-
-    performance_reward = {'agent1_x': [],
-                          'agent2_o': [],
-                          'agent1_o': [],
-                          'agent2_x': []}
-
-    performance_prob = {'agent1_x_win': [],
-                        'agent2_o_win': [],
-                        'agent1_x_agent2_o_draw': [],
-                        'agent2_x_win': [],
-                        'agent1_o_win': [],
-                        'agent2_x_agent1_o_draw': []}
 
+def sequential_never_loses(agent1, agent2, p0=0.001, p1=0.01, alpha=0.05, beta=0.05, batch_size=20,
+                           max_games=10000):
+    """ Does agent1 (practically) never lose against agent2?
+
+    An SPRT on the loss rate, H0: agent1 loses with probability p0 against H1: it loses with probability p1.
+    :return: see play_sequential, the decision is True if agent1 never loses
     """
-    set number of episodes and number of games in each episode
-    run all episodes
-    plot results
-    save plot images and serialize q-values
+    test = SPRT(p0, p1, alpha, beta)
+
+    def stop(counts):
+        decision = test.decision(counts['loss'], sum(counts.values()))
+        return None if decision is None else not decision
+
+    return play_sequential(agent1, agent2, stop, batch_size, max_games)
+
+
+def sequential_rates(agent1, agent2, width=0.05, z=1.96, batch_size=20, max_games=10000):
+    """ Estimates the win, draw, loss rates of agent1 until their Wilson confidence intervals are narrow enough.
+    :param width: target width of the confidence intervals
+    :param z: standard normal quantile of the confidence level (1.96 for 95%)
+    :return: see play_sequential, the decision is True when all intervals are narrower than width
     """
-    num_episodes = 300
-    num_games_in_episodes = 200
-
-    episode_counts = range(num_episodes)
-    for i in range(num_episodes):
-            print 'Episode: {0}'.format(i)
-            epsilon_x = 0.1 if i < 350 else 0.1 / sqrt(i/100)
-            rewards = calculate_average_reward(agent1=player_x,
-                                               agent2=player_o,
-                                               num_games=num_games_in_episodes,
-                                               epsilon1=epsilon_x)
-            for k, v in rewards.items():
-                performance_reward[k].append(v)
-
-    for k, v in performance_reward.items():
-            plt.plot(episode_counts, performance_reward[k], label=k, color=colors_reward[k])
-
-    plt.xlabel('Episodes')
-    plt.ylabel('Reward')
-    plt.title('{0} vs. {1}'.format(str(player_x), str(player_o)))
-    plt.legend(loc=4)
-
-    if save_image:
-        plt.savefig('plots/RPE_{0}_vs_{1}_ep_{2}_g_{3}_{4}.png'
-                    .format(str(player_x), str(player_o), num_episodes, num_games_in_episodes, name_append))
-
-    if serialize_x:
-        if hasattr(player_x, 'serialize_q_values'):
-            player_x.serialize_q_values(
-                'trained_agents/{0}_in_{0}_vs_{1}_ep_{2}_g_{3}_{4}.pickle'
-                .format(str(player_x), str(player_o), num_episodes, num_games_in_episodes, name_append))
-    if serialize_o:
-        if hasattr(player_o, 'serialize_q_values'):
-            player_o.serialize_q_values(
-                'trained_agents/{1}_in_{0}_vs_{1}_ep_{2}_g_{3}_{4}.pickle'
-                .format(str(player_x), str(player_o), num_episodes, num_games_in_episodes, name_append))
-
-    plt.show()
+    def stop(counts):
+        trials = sum(counts.values())
+        for successes in counts.values():
+            lower, upper = wilson_interval(successes, trials, z)
+            if upper - lower > width:
+                return None
+        return True
+
+    return play_sequential(agent1, agent2, stop, batch_size, max_games)
+
+
+if __name__ == '__main__':
+
+    import argparse
+    from specs import run_specs
 
+    logging.basicConfig(level=logging.INFO)
 
+    # the experiments are described by spec files (see specs.py)
+    parser = argparse.ArgumentParser(description='run experiments described by spec files')
+    parser.add_argument('paths', nargs='*', default=['specs/q_vs_sarsa_against_pre_trained_3.json'],
+                        help='json spec files')
+    parser.add_argument('--processes', type=int, help='number of worker processes (default: number of cpus)')
+    args = parser.parse_args()
 
+    run_specs(args.paths, args.processes)
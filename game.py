@@ -26,7 +26,7 @@
 """ This file contains a classic (3x3) tic tac toe game implementation.
 
 The board is represented by a 3x3 matrix
-having values X, O or EMPTY, with coordinates:
+having integer values X, O or EMPTY (see VALUES in globals), with coordinates:
 
         -------------------------
         |  0,0  |  0,1  |  0,2  |
@@ -40,27 +40,75 @@ Actions are represented by coordinate tuples i, j.
 """
 
 import logging
-from copy import deepcopy
 from globals import *
 
 
+_REACHABLE_STATES = []
+
+
+class GameHooks(object):
+    """ Base class for instrumentation hooks called by Game.play.
+
+    Hooks are optional, a game without hooks does not call anything.
+    Extending classes override the methods they are interested in.
+    """
+
+    def before_action(self, game, player):
+        """ Called right before player.take_action. """
+
+    def after_action(self, game, player, move):
+        """ Called right after player.take_action returned move. """
+
+    def after_state(self, game, winner):
+        """ Called after the move is made on the board and the game state is computed. """
+
+    def end_game(self, game, winner):
+        """ Called when the game ended, before the players are notified. """
+
+
 class Game(object):
-    """ This class represents a single tic tac toe game """
+    """ This class represents a single tic tac toe game
+
+    A game can be replayed between the same players with reset, which keeps the board and
+    the resolved end_game callbacks of the players, e.g. for playing many games of a pairing:
+
+        game = Game(player_x, player_o)
+        for _ in range(num_games):
+            game.reset()
+            winner = game.play()
+    """
+
+    logger = logging.getLogger('Game')
 
-    def __init__(self, player_x, player_o, verbose=False):
+    def __init__(self, player_x, player_o, verbose=False, hooks=None):
         """ Initializes empty board with two players.
         :param player_x: agent playing X
         :param player_o: agent playing O
         :param verbose: if True, steps, moves and game states are logged in each iteration
+        :param hooks: optional GameHooks instance for instrumentation
         """
         self.player_x = player_x
         self.player_x.set_side(VALUES.X)
         self.player_o = player_o
         self.player_o.set_side(VALUES.O)
+        self.end_game_x = getattr(player_x, 'end_game', None)
+        self.end_game_o = getattr(player_o, 'end_game', None)
         self.verbose = verbose
+        self.hooks = hooks
         self.board = Game.setup_board()
         self.step = 0
-        self.logger = logging.getLogger(self.__class__.__name__)
+
+    def reset(self):
+        """ Clears the board in place for a new game between the same players.
+
+        The sides of the players are set again, they may have played other games in between.
+        """
+        empty = VALUES.EMPTY
+        for row in self.board:
+            row[0] = row[1] = row[2] = empty
+        self.step = 0
+        self.player_x.set_side(VALUES.X)
+        self.player_o.set_side(VALUES.O)
 
     @staticmethod
     def setup_board():
@@ -71,26 +119,49 @@ class Game(object):
         :return: winner, that is either NOT_FINISHED during game and X, O, or DRAW at game end
         """
         self.step = 0
+        hooks = self.hooks
         winner = Game.game_state(self.board)
         while winner == VALUES.NOT_FINISHED and self.step < 9:
             player = self.next_player()
-            move = player.take_action(deepcopy(self.board))
+            board = self.board
+            state = [board[0][:], board[1][:], board[2][:]]
+            if hooks is not None:
+                hooks.before_action(self, player)
+            move = player.take_action(state)
+            if hooks is not None:
+                hooks.after_action(self, player, move)
             if self.is_allowed(move):
                 self.board[move[0]][move[1]] = player.side
             else:
                 raise AgentActionError(player, move)
             winner = self.game_state(self.board)
+            if hooks is not None:
+                hooks.after_state(self, winner)
             self.step += 1
-            self.log(
-                'step {0} GAME LOG \n'
-                'player {1} takes move {2} \n'
-                'game state is {3} \n'
-                .format(self.step, player, move, winner))
-            if self.verbose:
-                Game.print_board(self.board)
+            if __debug__:
+                if self.verbose:
+                    self.log('step {0} GAME LOG \n'
+                             'player {1} takes move {2} \n'
+                             'game state is {3} \n', self.step, player, move, VALUES[winner])
+                    Game.print_board(self.board)
         self.end_game(winner)
         return winner
 
+    def make_move(self, move):
+        """ Makes a single move of the next player.
+
+        This is the step-wise alternative of play for games driven by incoming moves,
+        the caller is responsible for calling end_game when the game is over.
+        :param move: i, j of an empty cell
+        :return: the state of the game after the move
+        """
+        player = self.next_player()
+        if not self.is_allowed(move):
+            raise AgentActionError(player, move)
+        self.board[move[0]][move[1]] = player.side
+        self.step += 1
+        return self.game_state(self.board)
+
     def is_allowed(self, move):
         if move is None or not isinstance(move, tuple):
             return False
@@ -122,21 +193,46 @@ class Game(object):
         :param board:
         :return: X, O, DRAW, or NOT_FINISHED
         """
+        empty = VALUES.EMPTY
         for i in range(3):
-            if board[i][0] != VALUES.EMPTY and board[i][0] == board[i][1] == board[i][2]:
+            if board[i][0] != empty and board[i][0] == board[i][1] == board[i][2]:
                 return board[i][0]
-            if board[0][i] != VALUES.EMPTY and board[0][i] == board[1][i] == board[2][i]:
+            if board[0][i] != empty and board[0][i] == board[1][i] == board[2][i]:
                 return board[0][i]
-        if board[0][0] != VALUES.EMPTY and board[0][0] == board[1][1] == board[2][2]:
+        if board[0][0] != empty and board[0][0] == board[1][1] == board[2][2]:
             return board[0][0]
-        if board[0][2] != VALUES.EMPTY and board[0][2] == board[1][1] == board[2][0]:
+        if board[0][2] != empty and board[0][2] == board[1][1] == board[2][0]:
             return board[0][2]
-        for i in range(3):
-            for j in range(3):
-                if board[i][j] == VALUES.EMPTY:
-                    return VALUES.NOT_FINISHED
+        for row in board:
+            if empty in row:
+                return VALUES.NOT_FINISHED
         return VALUES.DRAW
 
+    @staticmethod
+    def reachable_states():
+        """ All not finished states reachable from the empty board by alternating X and O moves.
+
+        The states are computed once and cached.
+        :return: list of hashable (tuple of row tuples) states
+        """
+        if not _REACHABLE_STATES:
+            seen = set()
+            stack = [(Game.setup_board(), VALUES.X)]
+            while stack:
+                board, side = stack.pop()
+                state = tuple(board[0]), tuple(board[1]), tuple(board[2])
+                if state in seen or Game.game_state(board) != VALUES.NOT_FINISHED:
+                    continue
+                seen.add(state)
+                for i in range(3):
+                    for j in range(3):
+                        if board[i][j] == VALUES.EMPTY:
+                            next_board = [list(row) for row in board]
+                            next_board[i][j] = side
+                            stack.append((next_board, VALUES.O if side == VALUES.X else VALUES.X))
+            _REACHABLE_STATES.extend(sorted(seen))
+        return _REACHABLE_STATES
+
     def end_game(self, winner):
 
         """A method called by the end of a game.
@@ -144,22 +240,28 @@ class Game(object):
         This method broadcasts the end state of the game to the players.
         :param winner: X, O or DRAW
         """
-        if hasattr(self.player_x, 'end_game'):
-            self.player_x.end_game(winner)
-        if hasattr(self.player_o, 'end_game'):
-            self.player_o.end_game(winner)
+        if self.hooks is not None:
+            self.hooks.end_game(self, winner)
+        if self.end_game_x is not None:
+            self.end_game_x(winner)
+        if self.end_game_o is not None:
+            self.end_game_o(winner)
 
     @staticmethod
     def print_board(board):
         cells = []
         for i in range(3):
             for j in range(3):
-                cells.append(board[i][j].center(6))
+                cells.append(NAMES[board[i][j]].center(6))
         print BOARD.format(*cells)
 
-    def log(self, s):
-        if self.verbose:
-            self.logger.debug(s)
+    def log(self, msg, *args):
+        """ Lazy debug logging.
+
+        The message is formatted with args only if verbose is set and the logger is enabled for debug.
+        """
+        if self.verbose and self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug(msg.format(*args) if args else msg)
 
 
 
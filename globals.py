@@ -25,20 +25,24 @@
 
 """ This file contains global constructions/definitions needed for the game and for agents."""
 
+import random
+
 
 class Enum(object):
+    """ An enumeration of names with small integer values.
 
-    def __init__(self, list):
-        self.list = list
-        self.size = len(self.list)
+    The values are set as attributes at construction, the value of a name is its index
+    in the list (e.g. VALUES.X == 1) and indexing gives back the name (VALUES[1] == 'X').
+    """
 
-    def __getattr__(self, name):
-        if name in self.list:
-            return name
-        raise AttributeError
+    def __init__(self, names):
+        self.list = list(names)
+        self.size = len(self.list)
+        for index, name in enumerate(self.list):
+            setattr(self, name, index)
 
     def __getitem__(self, index):
-        if index in range(self.size):
+        if 0 <= index < self.size:
             return self.list[index]
         raise AttributeError
 
@@ -54,16 +58,51 @@ BOARD = "\n" \
         "| {6} | {7} | {8} |\n" \
         "----------------------------"
 
-NAMES = [VALUES.EMPTY, VALUES.X, VALUES.O]
+NAMES = [VALUES[VALUES.EMPTY], VALUES[VALUES.X], VALUES[VALUES.O]]
+
+# cell values of boards pickled before cell values became integers
+LEGACY_VALUES = {'EMPTY': VALUES.EMPTY, 'X': VALUES.X, 'O': VALUES.O}
+
+
+def convert_legacy_q_values(q_values):
+    """ Converts Q-values with string cell values (e.g. pickles in trained_agents) to integer cell values.
+
+    Q-values already having integer cell values are returned as they are.
+    :param q_values: dictionary of (state, action): value with states of 3 tuples of 3 cell values
+    :return: dictionary of Q-values with integer cell values
+    """
+    for state, _ in q_values:
+        if not isinstance(state[0][0], basestring):
+            return q_values
+        break
+    converted = {}
+    for (state, action), value in q_values.iteritems():
+        converted[tuple(tuple(LEGACY_VALUES[cell] for cell in row) for row in state), action] = value
+    return converted
+
+
+def make_rng(rng=None):
+    """ Returns a random number generator.
+
+    :param rng: a random.Random instance (returned as it is), an integer seed,
+        or None for a new generator seeded by the operating system
+    :return: random.Random
+    """
+    if rng is None or isinstance(rng, (int, long)):
+        return random.Random(rng)
+    return rng
 
 
 class AgentActionError(Exception):
 
-    def __init__(self, agent, move):
+    def __init__(self, agent, move, reason=None):
         self.agent = agent
         self.move = move
+        self.reason = reason
 
     def __repr__(self):
+        if self.reason is not None:
+            return repr('{0} (agent {1})'.format(self.reason, self.agent))
         return repr('not allowed move {0} from agent {1}'.format(self.move, self.agent))
 
 
@@ -0,0 +1,150 @@
+#!/usr/bin/env python
+# ----------------------------------------------------------------------
+# The MIT License (MIT)
+#
+# Copyright (c) 2015 eidonfiloi
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ----------------------------------------------------------------------
+
+""" This file contains Hogwild style parallel training of Q-value agents on a shared Q-table.
+
+The Q-values live in a SharedQTable (see qtable.py), a shared memory array inherited by the worker processes.
+Every worker plays games with its own agents on the shared table and updates it without locks.
+With ~16k Q-values in ~177k slots, two workers rarely update the same entry at the same time, and
+a lost update only costs a step of learning, so the games/sec should grow almost linearly with the cores.
+
+The X and O states of a board differ in their piece counts, so in self-play (opponent 'self')
+both players learn on the same table without mixing their Q-values. e.g.:
+
+        python hogwild.py --agent SarsaAgent --games 20000 --processes 4 --output trained_agents/hogwild.qtable
+"""
+
+import time
+import multiprocessing
+from agent import *
+from qtable import SharedQTable
+
+
+_LOGGER = logging.getLogger(__name__)
+
+# the shared table of a worker process, set by the pool initializer
+_SHARED_TABLE = None
+
+
+def _init_worker(table):
+    global _SHARED_TABLE
+    _SHARED_TABLE = table
+
+
+def _next_seed(seed, step=1):
+    return None if seed is None else seed + step
+
+
+def play_games((kind, opponent, num_games, epsilon, seed, params)):
+    """ Plays num_games games on both sides between a learning agent on the shared table and an opponent.
+
+    This is the unit of work sent to the worker processes.
+    :param kind: class name of the learning agent
+    :param opponent: class name of the opponent, or 'self' for a second learning agent on the shared table
+    :param num_games: number of games per side
+    :param epsilon: exploration rate of the learning agents
+    :param seed: seed of the agents (the opponent gets seed + 1) or None
+    :param params: constructor arguments of the learning agents
+    :return: dictionary of games, moves and the win, draw, loss counts of the learning agent
+    """
+    agent = make_agent(kind, q_values=_SHARED_TABLE, epsilon=epsilon, rng=seed, **params)
+    if opponent == 'self':
+        other = make_agent(kind, q_values=_SHARED_TABLE, epsilon=epsilon, rng=_next_seed(seed), **params)
+    else:
+        other = make_agent(opponent, rng=_next_seed(seed))
+    counts = {'games': 0, 'moves': 0, 'win': 0, 'draw': 0, 'loss': 0}
+    for game in [Game(agent, other), Game(other, agent)]:
+        for _ in range(num_games):
+            game.reset()
+            winner = game.play()
+            counts['games'] += 1
+            counts['moves'] += game.step
+            if winner == VALUES.DRAW:
+                counts['draw'] += 1
+            elif (winner == VALUES.X) == (game.player_x is agent):
+                counts['win'] += 1
+            else:
+                counts['loss'] += 1
+    return counts
+
+
+def train(kind='SarsaAgent', opponent='self', games=10000, processes=None, epsilon=0.1, seed=None, table=None,
+          chunk=500, **params):
+    """ Trains agents of a kind in worker processes sharing one Q-table.
+    :param kind: class name of the learning agent, a BaseQAgent with Q-values of state, action pairs
+    :param opponent: class name of the opponent, or 'self' for self-play
+    :param games: total number of games per side
+    :param processes: number of worker processes (default: number of cpus)
+    :param epsilon: exploration rate of the learning agents
+    :param seed: seed of the first unit of work, the units get consecutive pairs of seeds (default: unseeded)
+    :param table: SharedQTable to continue training (default: a new empty table)
+    :param chunk: number of games per side in a unit of work
+    :param params: constructor arguments of the learning agents
+    :return: the SharedQTable, dictionary of games, moves, win, draw, loss counts and games_per_sec
+    """
+    if kind not in AGENT_CLASSES or not issubclass(AGENT_CLASSES[kind], BaseQAgent) or kind == 'AfterstateAgent':
+        raise ValueError('{0} does not learn Q-values of state, action pairs'.format(kind))
+    if table is None:
+        table = SharedQTable()
+    units = [(kind, opponent, min(chunk, games - start), epsilon, _next_seed(seed, 2 * i), params)
+             for i, start in enumerate(range(0, games, chunk))]
+    start = time.time()
+    if processes == 1:
+        _init_worker(table)
+        results = [play_games(unit) for unit in units]
+    else:
+        workers = multiprocessing.Pool(processes, initializer=_init_worker, initargs=(table,))
+        try:
+            results = list(workers.imap_unordered(play_games, units))
+        finally:
+            workers.close()
+            workers.join()
+    elapsed = time.time() - start
+    report = dict((key, sum(result[key] for result in results)) for key in ['games', 'moves', 'win', 'draw', 'loss'])
+    report['games_per_sec'] = report['games'] / elapsed if elapsed > 0 else None
+    return table, report
+
+
+if __name__ == '__main__':
+
+    import argparse
+
+    logging.basicConfig(level=logging.INFO)
+
+    parser = argparse.ArgumentParser(description='train Q-value agents in parallel processes on a shared Q-table')
+    parser.add_argument('--agent', default='SarsaAgent', help='class name of the learning agent')
+    parser.add_argument('--opponent', default='self', help="class name of the opponent or 'self'")
+    parser.add_argument('--games', type=int, default=10000, help='games per side')
+    parser.add_argument('--processes', type=int, help='number of worker processes (default: number of cpus)')
+    parser.add_argument('--epsilon', type=float, default=0.1)
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--output', help='file to save the Q-values to (.pickle or .qtable)')
+    args = parser.parse_args()
+
+    shared, summary = train(args.agent, args.opponent, args.games, args.processes, args.epsilon, args.seed)
+    _LOGGER.info('{games} games, {games_per_sec:.0f} games/sec, win {win}, draw {draw}, loss {loss}'.format(**summary))
+    if args.output is not None:
+        make_agent(args.agent, q_values=shared.to_dict()).serialize_q_values(args.output)
+        _LOGGER.info('Q-values saved to {0}'.format(args.output))
@@ -0,0 +1,151 @@
+#!/usr/bin/env python
+# ----------------------------------------------------------------------
+# The MIT License (MIT)
+#
+# Copyright (c) 2015 eidonfiloi
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ----------------------------------------------------------------------
+
+""" This file contains the instrumentation of the state space coverage and the Q-table growth of agents.
+
+A QTableProbe is sampled once per episode and measures the Q-table of a BaseQAgent:
+
+    - q_table_size: number of entries and q_table_bytes, the estimated memory of the dictionary
+    - new_entries: entries created in the episode (e.g. by the lazy initialization of q_value)
+    - updates and mean_abs_delta: number of Q-value updates in the episode and their mean absolute change
+    - states and coverage: number of states with updated Q-values and their fraction of the legal positions
+
+A sample reads counters kept by the agent (its updates and its per state visit counts, which the probe
+switches on), it does not walk the Q-table. The visit histogram, the number of states by the number of
+updates of their Q-values in power of two buckets (bucket k counts states with [2^(k-1), 2^k) updates),
+walks the visited states and is computed on demand. e.g.:
+
+        probe = QTableProbe(agent, prefix='agent1_')
+        for episode in range(episodes):
+            ...
+            metrics.write(probe.sample(), extra={'agent1_visit_histogram': probe.visit_histogram()})
+
+When new_entries and the growth of states drop to zero, more training does not explore anything new.
+"""
+
+import sys
+
+
+# legal tic tac toe positions, from the empty board to the finished games
+NUM_POSITIONS = 5478
+
+
+def entry_bytes(key, value):
+    """ The memory of a Q-table entry (hashable state, action): value, not counting the dictionary slot. """
+    state, action = key
+    size = sys.getsizeof(key) + sys.getsizeof(state) + sum(sys.getsizeof(row) for row in state)
+    if action is not None:
+        size += sys.getsizeof(action)
+    return size + sys.getsizeof(value)
+
+
+def state_visit_counts(visits):
+    """ The visit counts of states, summed over their actions.
+    :param visits: dictionary of (hashable state, action): visit count (see BaseQAgent.visits)
+    :return: dictionary of hashable state: visit count
+    """
+    state_visits = {}
+    for (state, _), count in visits.iteritems():
+        state_visits[state] = state_visits.get(state, 0) + count
+    return state_visits
+
+
+def visit_histogram(state_visits):
+    """ The number of states by their number of updates.
+    :param state_visits: dictionary of hashable state: visit count
+    :return: dictionary of bucket: number of states, bucket k counts states with [2^(k-1), 2^k) updates
+    """
+    histogram = {}
+    for count in state_visits.itervalues():
+        bucket = count.bit_length()
+        histogram[bucket] = histogram.get(bucket, 0) + 1
+    return histogram
+
+
+def most_visited_states(state_visits, n=10):
+    """ The n states absorbing the most updates.
+    :param state_visits: dictionary of hashable state: visit count
+    :return: list of (hashable state, visit count) pairs, most visited first
+    """
+    return sorted(state_visits.items(), key=lambda item: -item[1])[:n]
+
+
+class QTableProbe(object):
+    """ Per episode measurements of the Q-table of an agent (see the module documentation). """
+
+    def __init__(self, agent, prefix=''):
+        """
+        Visit counting (visits and state_visits) is switched on for the agent if it is off,
+        which does not change its updates.
+            :param agent: a BaseQAgent
+            :param prefix: prefix of the metric names, e.g. 'agent1_'
+        """
+        self.agent = agent
+        self.prefix = prefix
+        if agent.visits is None:
+            agent.visits = {}
+        if agent.state_visits is None:
+            agent.state_visits = state_visit_counts(agent.visits)
+        self.entry_bytes = None
+        self.size = len(agent.q_values)
+        self.updates = agent.updates
+        self.abs_delta_sum = agent.abs_delta_sum
+
+    def table_bytes(self):
+        """ The estimated memory of the Q-table, the dictionary and its entries. """
+        q_values = self.agent.q_values
+        if self.entry_bytes is None and len(q_values) > 0:
+            # entries differ only in the size of the value, one of them is measured
+            key, value = next(q_values.iteritems())
+            self.entry_bytes = entry_bytes(key, value)
+        return sys.getsizeof(q_values) + len(q_values) * (self.entry_bytes or 0)
+
+    def sample(self):
+        """ The measurements since the previous sample.
+        :return: dictionary of prefixed metric name: number
+        """
+        agent = self.agent
+        size = len(agent.q_values)
+        updates = agent.updates - self.updates
+        abs_delta_sum = agent.abs_delta_sum - self.abs_delta_sum
+        states = len(agent.state_visits)
+        metrics = {'q_table_size': size,
+                   'q_table_bytes': self.table_bytes(),
+                   'new_entries': size - self.size,
+                   'updates': updates,
+                   'mean_abs_delta': abs_delta_sum / updates if updates > 0 else 0.0,
+                   'states': states,
+                   'coverage': float(states) / NUM_POSITIONS}
+        self.size = size
+        self.updates = agent.updates
+        self.abs_delta_sum = agent.abs_delta_sum
+        return dict((self.prefix + name, value) for name, value in metrics.items())
+
+    def visit_histogram(self):
+        """ The visit histogram of the states of the agent (see visit_histogram). """
+        return visit_histogram(self.agent.state_visits)
+
+    def most_visited_states(self, n=10):
+        return most_visited_states(self.agent.state_visits, n)
@@ -0,0 +1,294 @@
+#!/usr/bin/env python
+# ----------------------------------------------------------------------
+# The MIT License (MIT)
+#
+# Copyright (c) 2015 eidonfiloi
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ----------------------------------------------------------------------
+
+""" This file contains a self-play league for tic tac toe agents.
+
+A league keeps a pool of agents (simple opponents, the trained Q-values in trained_agents
+and snapshots of a learning agent), plays matches between them in a process pool
+and maintains Elo ratings which are updated incrementally after every match.
+Each generation the learner trains against the pool, a snapshot of it joins the pool
+and only the new snapshot plays rated matches, so there is no full round-robin per generation.
+
+Pool entries are light (name, agent class, path of pickled Q-values) tuples,
+worker processes load every Q-value file once and keep it cached.
+Every match gets its own seed, so results do not depend on which worker plays it.
+"""
+
+import os
+import sys
+import glob
+import multiprocessing
+from collections import namedtuple
+from agent import *
+
+
+_LOGGER = logging.getLogger(__name__)
+
+PoolEntry = namedtuple('PoolEntry', ['name', 'kind', 'path'])
+
+FIXED_OPPONENTS = [PoolEntry('RandomAgent', 'RandomAgent', None),
+                   PoolEntry('WinBlockingRandomAgent', 'WinBlockingRandomAgent', None)]
+
+_Q_VALUES_CACHE = {}
+
+
+def trained_pool(directory='trained_agents'):
+    """ Collects the serialized Q-values of a directory as pool entries.
+
+    File names are expected in the format <agent class>_in_<experiment name>.pickle (or .qtable),
+    if both exist, the faster loading compact Q-table is used.
+    :param directory: directory of serialized Q-values
+    :return: list of PoolEntry
+    """
+    paths = {}
+    for path in sorted(glob.glob(os.path.join(directory, '*.pickle')) +
+                       glob.glob(os.path.join(directory, '*' + COMPACT_EXTENSION))):
+        paths[os.path.splitext(os.path.basename(path))[0]] = path
+    entries = []
+    for name, path in sorted(paths.items()):
+        kind = name.split('_in_')[0]
+        if kind in AGENT_CLASSES:
+            entries.append(PoolEntry(name, kind, path))
+    return entries
+
+
+def load_agent(entry, epsilon=0.0, rng=None):
+    """ Creates a new non-learning agent of a pool entry.
+
+    Q-values are cached, so every file is loaded only once per process.
+    :param entry: PoolEntry
+    :param epsilon: exploration rate of Q-value based agents
+    :param rng: random.Random instance or integer seed of the agent
+    :return: agent
+    """
+    if entry.path is None:
+        return make_agent(entry.kind, rng=rng)
+    agent = make_agent(entry.kind, learning=False, epsilon=epsilon, rng=rng)
+    if entry.path not in _Q_VALUES_CACHE:
+        agent.deserialize_q_values(entry.path)
+        _Q_VALUES_CACHE[entry.path] = agent.q_values
+    agent.load_q_values(_Q_VALUES_CACHE[entry.path])
+    return agent
+
+
+def play_match(task):
+    """ Plays a match between two pool entries, both playing both sides.
+
+    This is the unit of work sent to the worker processes.
+    :param task: (entry_a, entry_b, num_games, epsilon, seed) where num_games is the number of games per side
+    :return: name_a, name_b, score of entry_a (win 1, draw 0.5, loss 0 averaged over all games)
+    """
+    entry_a, entry_b, num_games, epsilon, seed = task
+    agent_a = load_agent(entry_a, epsilon, rng=seed)
+    agent_b = load_agent(entry_b, epsilon, rng=seed + 1)
+    games = [Game(player_x=agent_a, player_o=agent_b), Game(player_x=agent_b, player_o=agent_a)]
+    score = 0.0
+    for i in range(2 * num_games):
+        side_a = VALUES.X if i % 2 == 0 else VALUES.O
+        game = games[i % 2]
+        game.reset()
+        winner = game.play()
+        if winner == side_a:
+            score += 1.0
+        elif winner == VALUES.DRAW:
+            score += 0.5
+    return entry_a.name, entry_b.name, score / (2 * num_games)
+
+
+class EloRatings(object):
+    """ Elo ratings of league members.
+
+    A match result is the average score of a player (win 1, draw 0.5, loss 0),
+    ratings are moved by k * (score - expected score) after each match.
+    """
+
+    def __init__(self, k=32.0, initial=1500.0):
+        """
+            :param k: the maximum rating change of a single match
+            :param initial: rating of not yet rated players
+        """
+        self.k = k
+        self.initial = initial
+        self.ratings = {}
+        self.matches = {}
+
+    def rating(self, name):
+        return self.ratings.get(name, self.initial)
+
+    def set_rating(self, name, rating):
+        self.ratings[name] = rating
+
+    def expected_score(self, name_a, name_b):
+        return 1.0 / (1.0 + 10.0 ** ((self.rating(name_b) - self.rating(name_a)) / 400.0))
+
+    def update(self, name_a, name_b, score_a):
+        """ Updates both ratings with the result of a match.
+        :param name_a: player a
+        :param name_b: player b
+        :param score_a: average score of player a in the match
+        """
+        delta = self.k * (score_a - self.expected_score(name_a, name_b))
+        self.ratings[name_a] = self.rating(name_a) + delta
+        self.ratings[name_b] = self.rating(name_b) - delta
+        self.matches[name_a] = self.matches.get(name_a, 0) + 1
+        self.matches[name_b] = self.matches.get(name_b, 0) + 1
+
+    def table(self):
+        """ Returns (name, rating, matches) rows ordered by decreasing rating."""
+        return sorted([(name, rating, self.matches.get(name, 0)) for name, rating in self.ratings.items()],
+                      key=lambda row: -row[1])
+
+
+class League(object):
+    """ A league of agents with a learning agent adding snapshots of itself to the pool."""
+
+    def __init__(self,
+                 learner,
+                 pool=None,
+                 ratings=None,
+                 snapshot_dir='league_snapshots',
+                 games_per_match=50,
+                 matches_per_snapshot=8,
+                 epsilon=0.05,
+                 processes=None,
+                 rng=None):
+        """
+            :param learner: a learning BaseQAgent
+            :param pool: list of PoolEntry, by default the fixed opponents and everything in trained_agents
+            :param ratings: EloRatings of the pool
+            :param snapshot_dir: directory where the learner's snapshots are serialized
+            :param games_per_match: number of games per side in a rated match
+            :param matches_per_snapshot: number of rated matches a new snapshot plays
+            :param epsilon: exploration rate of Q-value based pool members
+            :param processes: number of worker processes (default: number of cpus)
+            :param rng: random.Random instance or integer seed for scheduling and match seeds
+        """
+        self.learner = learner
+        self.rng = make_rng(rng)
+        self.pool = list(FIXED_OPPONENTS + trained_pool() if pool is None else pool)
+        self.ratings = EloRatings() if ratings is None else ratings
+        self.snapshot_dir = snapshot_dir
+        self.games_per_match = games_per_match
+        self.matches_per_snapshot = matches_per_snapshot
+        self.epsilon = epsilon
+        self.generation = 0
+        self.last_snapshot = None
+        self.workers = multiprocessing.Pool(processes)
+
+    def add(self, entry, rating=None):
+        self.pool.append(entry)
+        if rating is not None:
+            self.ratings.set_rating(entry.name, rating)
+
+    def calibrate(self):
+        """ Plays one round-robin between the current pool members to seed their ratings."""
+        tasks = []
+        for i, entry_a in enumerate(self.pool):
+            for entry_b in self.pool[i + 1:]:
+                tasks.append(self.match(entry_a, entry_b))
+        self.play_matches(tasks)
+
+    def match(self, entry_a, entry_b):
+        return entry_a, entry_b, self.games_per_match, self.epsilon, self.rng.randint(0, sys.maxint - 1)
+
+    def play_matches(self, tasks):
+        """ Plays matches in the worker pool, updating ratings as the results arrive."""
+        for name_a, name_b, score_a in self.workers.imap_unordered(play_match, tasks):
+            self.ratings.update(name_a, name_b, score_a)
+            _LOGGER.debug('{0} vs. {1}: {2:.3f}'.format(name_a, name_b, score_a))
+
+    def opponents_for(self, entry):
+        """ Chooses the opponents of a new pool member.
+
+        Half of them are the closest rated members, the other half are chosen randomly from the rest.
+        """
+        candidates = sorted([e for e in self.pool if e.name != entry.name],
+                            key=lambda e: abs(self.ratings.rating(e.name) - self.ratings.rating(entry.name)))
+        num_closest = self.matches_per_snapshot // 2
+        opponents = candidates[:num_closest]
+        rest = candidates[num_closest:]
+        opponents.extend(self.rng.sample(rest, min(len(rest), self.matches_per_snapshot - num_closest)))
+        return opponents
+
+    def train(self, num_games):
+        """ The learner plays games against randomly chosen pool members, on both sides."""
+        for i in range(num_games):
+            opponent = load_agent(self.rng.choice(self.pool), self.epsilon, rng=self.rng.randint(0, sys.maxint))
+            if i % 2 == 0:
+                Game(player_x=self.learner, player_o=opponent).play()
+            else:
+                Game(player_x=opponent, player_o=self.learner).play()
+
+    def snapshot(self):
+        """ Serializes the learner's Q-values and adds them to the pool.
+
+        A new snapshot starts with the rating of the previous one.
+        """
+        if not os.path.isdir(self.snapshot_dir):
+            os.makedirs(self.snapshot_dir)
+        name = '{0}_in_league_snapshot_{1}'.format(self.learner, self.generation)
+        path = os.path.join(self.snapshot_dir, name + '.pickle')
+        self.learner.serialize_q_values(path)
+        entry = PoolEntry(name, str(self.learner), path)
+        rating = None if self.last_snapshot is None else self.ratings.rating(self.last_snapshot.name)
+        self.add(entry, rating)
+        self.last_snapshot = entry
+        return entry
+
+    def run_generation(self, num_training_games):
+        """ Trains the learner, adds its snapshot to the pool and rates the snapshot.
+        :param num_training_games: number of games the learner plays before the snapshot
+        :return: the snapshot's PoolEntry
+        """
+        self.train(num_training_games)
+        self.generation += 1
+        entry = self.snapshot()
+        self.play_matches([self.match(entry, opponent) for opponent in self.opponents_for(entry)])
+        _LOGGER.info('generation {0}: {1} rated {2:.1f}'
+                     .format(self.generation, entry.name, self.ratings.rating(entry.name)))
+        return entry
+
+    def close(self):
+        self.workers.close()
+        self.workers.join()
+
+
+if __name__ == '__main__':
+
+    logging.basicConfig(level=logging.INFO)
+
+    learner = SarsaAgent(epsilon=0.1, rng=1)
+    learner.deserialize_q_values(
+        'trained_agents/SarsaAgent_in_SarsaAgent_vs_SarsaAgent_ep_500_g_500_itself_pre_trained_3.pickle')
+
+    league = League(learner, rng=2)
+    try:
+        league.calibrate()
+        for _ in range(10):
+            league.run_generation(1000)
+        for member, elo, matches in league.ratings.table():
+            _LOGGER.info('{0:7.1f} {1:4d} {2}'.format(elo, matches, member))
+    finally:
+        league.close()
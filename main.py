@@ -44,80 +44,64 @@ Indices for cells(actions) are:
         -------------------
 """
 
-import matplotlib.pyplot as plt
 from agent import *
 from experiments import calculate_winner_frequency_dict
+from exact import exact_winner_frequency_dict
+from sessions import SessionManager
+from metrics import MetricsWriter
 
 
 _LOGGER = logging.getLogger(__name__)
 
 
-def run_trained_agents(agent1, agent2, num_episodes=100):
+def run_trained_agents(agent1, agent2, num_episodes=100, metrics_path='metrics/trained_agents.jsonl'):
     """ Helper method for demo experiment.
 
     This runs games between
-    two agents and plots performance results
+    two agents and streams the win-draw-lose frequencies of every episode to a metrics file,
+    which can be plotted with plot_metrics.py
     :param agent1: player1
     :param agent2: player2
-    :param num_episodes: number of games in an episode
-    :return:
+    :param num_episodes: number of episodes of 100 games
+    :param metrics_path: path of the metrics file, overwritten by every run
+    :return: rolling and overall means of the frequencies
     """
-
-    colors = {'agent1_x_win': 'r',
-              'agent2_o_win': 'b',
-              'agent1_x_agent2_o_draw': 'g',
-              'agent2_x_win': 'c',
-              'agent1_o_win': 'm',
-              'agent2_x_agent1_o_draw': 'y'}
-
-    performance = {'agent1_x_win': [],
-                   'agent2_o_win': [],
-                   'agent1_x_agent2_o_draw': [],
-                   'agent2_x_win': [],
-                   'agent1_o_win': [],
-                   'agent2_x_agent1_o_draw': []}
-
-    game_counts = range(num_episodes)
-
-    for i in game_counts:
-        _LOGGER.info('Episode {0}'.format(i))
-        freq_dict = calculate_winner_frequency_dict(agent1, agent2, 100)
-        for k, v in freq_dict.items():
-            performance[k].append(v)
-
-    for k, v in performance.items():
-            plt.plot(game_counts, performance[k], label=k, color=colors[k])
-
-    plt.xlabel('Games')
-    plt.ylabel('Probability')
-    plt.title('{0} vs. {1}'.format(str(agent1), str(agent2)))
-    plt.legend(loc=4)
-    plt.show()
+    with MetricsWriter(metrics_path, append=False) as metrics:
+        for i in range(num_episodes):
+            _LOGGER.info('Episode {0}'.format(i))
+            metrics.write(calculate_winner_frequency_dict(agent1, agent2, 100), episode=i)
+        summary = metrics.summary()
+    for k, v in sorted(summary.items()):
+        _LOGGER.info('{0}: rolling mean {1:.3f}, mean {2:.3f}'.format(k, v['rolling'], v['overall']))
+    _LOGGER.info('plot with: python plot_metrics.py {0} --ylabel Probability'.format(metrics_path))
+    return summary
 
 
 def run_agent_against_human(agent):
     """ Helper method for demo experiment.
 
     This runs games between
-    an agent and a human player.
+    an agent and a human player typing moves in the format i, j on the console.
+    Games are played in sessions which advance with every typed move (see sessions.py).
     :param agent: non-human player
     :return:
     """
-    while True:
-        try:
-            human_player = HumanAgent()
-            if random.random() < 0.5:
-                player_x = agent
-                player_o = human_player
-            else:
-                player_x = human_player
-                player_o = agent
-            game = Game(player_x=player_x, player_o=player_o)
-            winner = game.play()
-            Game.print_board(game.board)
-            _LOGGER.info('winner is {0}'.format(winner))
-        except (KeyboardInterrupt, SystemExit):
-            _LOGGER.info('exit')
+    # the human at the console may think as long as they like
+    manager = SessionManager({'agent': agent}, rng=agent.rng, idle_timeout=None)
+    try:
+        while True:
+            state = manager.create()
+            while state['winner'] == VALUES.NOT_FINISHED:
+                Game.print_board(state['board'])
+                try:
+                    raw_action_input = raw_input('Your move? ').split(',')
+                    state = manager.move(state['session'], (int(raw_action_input[0]), int(raw_action_input[1])))
+                except (ValueError, IndexError, AgentActionError):
+                    _LOGGER.info('not allowed move. choose an empty cell')
+            Game.print_board(state['board'])
+            _LOGGER.info('winner is {0}'.format(VALUES[state['winner']]))
+    except (KeyboardInterrupt, SystemExit, EOFError):
+        _LOGGER.info('exit')
 
 
 if __name__ == '__main__':
@@ -141,6 +125,10 @@ if __name__ == '__main__':
     # uncomment if want to save q-values to csv
     #player_sarsa.save_q_values_to('q_values.csv')
 
+    # exact win-draw-lose probabilities, the sampled frequencies of the demo experiment fluctuate around them
+    for k, v in sorted(exact_winner_frequency_dict(player_sarsa, player_win_block_random).items()):
+        _LOGGER.info('exact {0}: {1:.4f}'.format(k, v))
+
     # run a demo experiment with 50 episodes each containing 100 games
     _LOGGER.info('running experiments between Sarsa and a win blocking Random agent...')
     run_trained_agents(player_sarsa, player_win_block_random, 50)
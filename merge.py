@@ -0,0 +1,158 @@
+#!/usr/bin/env python
+# ----------------------------------------------------------------------
+# The MIT License (MIT)
+#
+# Copyright (c) 2015 eidonfiloi
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ----------------------------------------------------------------------
+
+""" This file contains the merge of Q-tables trained independently, e.g. shards of a training run on several hosts.
+
+The inputs are read one by one (a streaming reduce), only the merged table is kept in memory.
+Entries are combined by their visit counts, the numbers of updates stored in compact Q-table files
+(see BaseQAgent.visits and qtable.py). Files without visit counts (pickles, csv files, compact files
+saved without counting) count as one visit per entry.
+
+    - 'visits': the visit weighted average of the values, the merged visit count is the sum of the counts.
+      Averaging is associative, merging merged tables gives the same result as merging all inputs at once.
+      Entries without updates in any input (visit count 0) get the plain mean.
+    - 'max_confidence': the value of the table with the most visits of the entry (the first one on ties),
+      with its visit count.
+
+Entries of only one table are taken as they are. Q-values and afterstate values (flag FLAG_STATE_VALUES)
+can not be mixed (pickles with keys (state, None) hold state values). The result is a compact Q-table file with visit counts, e.g.:
+
+        python merge.py shards/*.qtable --output trained_agents/SarsaAgent_in_merged.qtable
+"""
+
+import logging
+from qtable import *
+
+
+_LOGGER = logging.getLogger(__name__)
+
+MODES = ['visits', 'max_confidence']
+
+
+def read_entries(path):
+    """ The entries of a Q-value file as integer keys (see qtable.py).
+
+    Pickles with keys (state, None) hold state values (e.g. of AfterstateAgent), they are flagged FLAG_STATE_VALUES.
+    :param path: compact Q-table, pickle or csv file
+    :return: flags (0 or FLAG_STATE_VALUES), iterable of (key, value, visit count) tuples
+    """
+    if path.endswith(COMPACT_EXTENSION):
+        flags = compact_flags(path) & ~FLAG_VISITS
+        keys, values, visits = load_compact_arrays(path, flags)
+        return flags, zip(keys, values, visits or [1] * len(keys))
+    q_values = read_legacy(path)
+    state_values = [action is None for _, action in q_values]
+    if any(state_values):
+        if not all(state_values):
+            raise ValueError('{0} mixes state values and Q-values'.format(path))
+        return FLAG_STATE_VALUES, ((9 * encode_state(state), value, 1) for (state, _), value in q_values.iteritems())
+    return 0, ((encode_key(state, action), value, 1) for (state, action), value in q_values.iteritems())
+
+
+class QTableMerger(object):
+    """ Merges Q-value files one by one into a single table (see the module documentation). """
+
+    def __init__(self, mode='visits'):
+        """
+            :param mode: 'visits' or 'max_confidence'
+        """
+        if mode not in MODES:
+            raise ValueError('merge mode should be one of {0}'.format(', '.join(MODES)))
+        self.mode = mode
+        self.flags = None
+        self.inputs = 0
+        # visits: key: [visit count, visit weighted sum, number of tables, sum], max_confidence: key: [visits, value]
+        self.entries = {}
+
+    def add(self, path):
+        """ Merges a file into the table. """
+        flags, entries = read_entries(path)
+        if self.flags is None:
+            self.flags = flags
+        elif flags != self.flags:
+            raise ValueError('{0} has flags {1}, the merged tables {2}'.format(path, flags, self.flags))
+        merged = self.entries
+        if self.mode == 'visits':
+            for key, value, count in entries:
+                entry = merged.get(key)
+                if entry is None:
+                    merged[key] = [count, count * value, 1, value]
+                else:
+                    entry[0] += count
+                    entry[1] += count * value
+                    entry[2] += 1
+                    entry[3] += value
+        else:
+            for key, value, count in entries:
+                entry = merged.get(key)
+                if entry is None or count > entry[0]:
+                    merged[key] = [count, value]
+        self.inputs += 1
+
+    def result(self):
+        """ The merged table.
+        :return: increasing keys, values and visit counts (lists)
+        """
+        keys = sorted(self.entries)
+        if self.mode == 'visits':
+            values = [e[1] / e[0] if e[0] > 0 else e[3] / e[2] for e in (self.entries[key] for key in keys)]
+        else:
+            values = [self.entries[key][1] for key in keys]
+        return keys, values, [self.entries[key][0] for key in keys]
+
+    def save(self, path):
+        """ Writes the merged table to a compact Q-table file with visit counts. """
+        keys, values, visits = self.result()
+        save_compact_arrays(path, keys, values, visits, self.flags or 0)
+
+
+def merge(paths, output, mode='visits'):
+    """ Merges Q-value files into a compact Q-table file.
+    :param paths: compact Q-table, pickle or csv files
+    :param output: the merged compact Q-table file
+    :param mode: 'visits' or 'max_confidence'
+    :return: number of entries of the merged table
+    """
+    merger = QTableMerger(mode)
+    for path in paths:
+        merger.add(path)
+        _LOGGER.info('{0}: merged, {1} entries'.format(path, len(merger.entries)))
+    merger.save(output)
+    return len(merger.entries)
+
+
+if __name__ == '__main__':
+
+    import argparse
+
+    logging.basicConfig(level=logging.INFO)
+
+    parser = argparse.ArgumentParser(description='merge independently trained Q-tables')
+    parser.add_argument('paths', nargs='+', help='compact Q-table, pickle or csv files')
+    parser.add_argument('--output', required=True, help='the merged compact Q-table file')
+    parser.add_argument('--mode', choices=MODES, default='visits')
+    args = parser.parse_args()
+
+    merge(args.paths, args.output, args.mode)
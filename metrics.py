@@ -0,0 +1,167 @@
+#!/usr/bin/env python
+# ----------------------------------------------------------------------
+# The MIT License (MIT)
+#
+# Copyright (c) 2015 eidonfiloi
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ----------------------------------------------------------------------
+
+""" This file contains the streaming metrics of experiments.
+
+Episode metrics are appended to a JSON lines file as the episodes finish, one record per line, e.g.:
+
+        {"episode": 3, "time": 1444555666.7, "agent1_x": 0.61, "agent2_o": -0.61,
+         "rolling": {"agent1_x": 0.58, "agent2_o": -0.58}}
+
+where rolling holds the means of the last window episodes, computed incrementally.
+The file is flushed after every record, so it can be read (and plotted with plot_metrics.py)
+while the experiment is still running, an incomplete last line is skipped by the reader.
+"""
+
+import os
+import json
+import time
+from collections import deque
+
+
+class RollingAggregate(object):
+    """ Mean over the last window values and over all values, updated in constant time. """
+
+    def __init__(self, window=20):
+        """
+            :param window: number of recent values in the rolling mean
+        """
+        self.window = window
+        self.values = deque()
+        self.window_sum = 0.0
+        self.total = 0.0
+        self.count = 0
+
+    def add(self, value):
+        self.values.append(value)
+        self.window_sum += value
+        if len(self.values) > self.window:
+            self.window_sum -= self.values.popleft()
+        self.total += value
+        self.count += 1
+
+    @property
+    def mean(self):
+        return self.window_sum / len(self.values) if len(self.values) > 0 else None
+
+    @property
+    def overall_mean(self):
+        return self.total / self.count if self.count > 0 else None
+
+
+class MetricsWriter(object):
+    """ Appends episode metrics with their rolling means to a JSON lines file. """
+
+    def __init__(self, path, window=20, timer=time.time, append=True):
+        """
+            :param path: the metrics file, created with its directory if missing
+            :param window: number of episodes in the rolling means
+            :param timer: a function returning the current time in seconds
+            :param append: whether an existing file is appended to, it is truncated otherwise
+        """
+        directory = os.path.dirname(path)
+        if directory and not os.path.isdir(directory):
+            os.makedirs(directory)
+        self.path = path
+        self.window = window
+        self.timer = timer
+        self.aggregates = {}
+        self.episodes = 0
+        self.out = open(path, 'a' if append else 'w')
+
+    def write(self, metrics, episode=None, extra=None):
+        """ Appends the metrics of an episode.
+        :param metrics: dictionary of name: number
+        :param episode: the episode number (default: the number of records written so far)
+        :param extra: optional dictionary of name: json value written as is, without rolling means (e.g. histograms)
+        :return: the record written
+        """
+        if episode is None:
+            episode = self.episodes
+        record = {'episode': episode, 'time': self.timer()}
+        if extra is not None:
+            record.update(extra)
+        rolling = {}
+        for name, value in metrics.items():
+            if name not in self.aggregates:
+                self.aggregates[name] = RollingAggregate(self.window)
+            aggregate = self.aggregates[name]
+            aggregate.add(value)
+            record[name] = value
+            rolling[name] = aggregate.mean
+        record['rolling'] = rolling
+        # a single write of a whole line, flushed, so that readers never see half a record in the middle
+        self.out.write(json.dumps(record, sort_keys=True) + '\n')
+        self.out.flush()
+        self.episodes += 1
+        return record
+
+    def summary(self):
+        """ The rolling and overall means of every metric. """
+        return dict((name, {'rolling': a.mean, 'overall': a.overall_mean}) for name, a in self.aggregates.items())
+
+    def close(self):
+        self.out.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def read_metrics(path, offset=0):
+    """ Reads the complete records of a metrics file, which may still be written.
+    :param path: the metrics file
+    :param offset: byte offset to start reading at (to read only the records written since a previous call)
+    :return: list of records, the offset after the last complete record
+    """
+    records = []
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        for line in f:
+            if not line.endswith('\n'):
+                break
+            offset += len(line)
+            if line.strip():
+                records.append(json.loads(line))
+    return records, offset
+
+
+def series(records, name, rolling=False):
+    """ The episodes and values of a metric in records.
+    :param records: records of a metrics file
+    :param name: name of the metric
+    :param rolling: the rolling means instead of the values
+    :return: list of episodes, list of values
+    """
+    episodes = []
+    values = []
+    for record in records:
+        value = record['rolling'].get(name) if rolling else record.get(name)
+        if value is not None:
+            episodes.append(record['episode'])
+            values.append(value)
+    return episodes, values
@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+# ----------------------------------------------------------------------
+# The MIT License (MIT)
+#
+# Copyright (c) 2015 eidonfiloi
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ----------------------------------------------------------------------
+
+""" This file contains the offline plotting of metrics files written by experiments (see metrics.py).
+
+It can be run while an experiment is still writing, with --follow the plot is refreshed periodically, e.g.:
+
+        python plot_metrics.py metrics/RPE_QLearningAgent_vs_SarsaAgent_ep_300_g_200.jsonl --rolling --follow 10
+"""
+
+import argparse
+import matplotlib.pyplot as plt
+from metrics import read_metrics, series
+
+
+COLORS = ['r', 'b', 'g', 'c', 'm', 'y', 'k']
+
+
+def metric_names(records):
+    """ The names of the numeric metrics (those with rolling means) of records. """
+    names = set()
+    for record in records:
+        names.update(record.get('rolling', {}))
+    return sorted(names)
+
+
+def plot(records, names=None, rolling=False, title=None, ylabel='Reward'):
+    """ Plots metrics of records on the current figure.
+    :param records: records of a metrics file
+    :param names: names of the plotted metrics (default: all)
+    :param rolling: plot the rolling means instead of the values
+    :param title: title of the plot
+    :param ylabel: label of the y axis
+    """
+    for index, name in enumerate(names or metric_names(records)):
+        episodes, values = series(records, name, rolling)
+        plt.plot(episodes, values, label=name, color=COLORS[index % len(COLORS)])
+    plt.xlabel('Episodes')
+    plt.ylabel(ylabel)
+    if title is not None:
+        plt.title(title)
+    plt.legend(loc=4)
+
+
+def plot_file(path, names=None, rolling=False, title=None, ylabel='Reward', output=None, follow=None):
+    """ Plots a metrics file.
+    :param path: the metrics file
+    :param output: save the plot as an image to this path instead of showing it
+    :param follow: if given, re-read the file and refresh the plot every follow seconds until the window is closed
+    """
+    records, offset = read_metrics(path)
+    plot(records, names, rolling, title, ylabel)
+    if output is not None:
+        plt.savefig(output)
+        plt.close()
+    elif follow is None:
+        plt.show()
+    else:
+        plt.ion()
+        plt.show()
+        while plt.get_fignums():
+            new_records, offset = read_metrics(path, offset)
+            if new_records:
+                records.extend(new_records)
+                plt.clf()
+                plot(records, names, rolling, title, ylabel)
+            plt.pause(follow)
+
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description='plot a metrics file of an experiment')
+    parser.add_argument('path', help='JSON lines metrics file')
+    parser.add_argument('--metric', action='append', help='plotted metric (default: all)')
+    parser.add_argument('--rolling', action='store_true', help='plot the rolling means')
+    parser.add_argument('--title', help='title of the plot')
+    parser.add_argument('--ylabel', default='Reward', help='label of the y axis')
+    parser.add_argument('--output', help='save the plot to an image file instead of showing it')
+    parser.add_argument('--follow', type=float, help='refresh the plot every FOLLOW seconds')
+    args = parser.parse_args()
+
+    plot_file(args.path, args.metric, args.rolling, args.title, args.ylabel, args.output, args.follow)
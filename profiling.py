@@ -0,0 +1,142 @@
+#!/usr/bin/env python
+# ----------------------------------------------------------------------
+# The MIT License (MIT)
+#
+# Copyright (c) 2015 eidonfiloi
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ----------------------------------------------------------------------
+
+""" This file contains a profiler for games, plugged into Game.play as hooks.
+
+e.g.:
+        profiler = GameProfiler()
+        game = Game(player_x, player_o, hooks=profiler)
+        game.play()
+        profiler.report()
+
+Decision latencies are collected per agent (by class name) in histograms
+with power of two microsecond buckets: bucket k counts latencies in [2^(k-1), 2^k) microseconds.
+"""
+
+import logging
+from timeit import default_timer
+from game import GameHooks
+from globals import VALUES
+
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def latency_bucket(seconds):
+    return int(seconds * 1e6).bit_length()
+
+
+def bucket_bound(bucket):
+    """ The upper bound of a latency bucket in microseconds."""
+    return 2 ** bucket
+
+
+def percentile(histogram, q):
+    """ Approximate percentile of a latency histogram.
+    :param histogram: dictionary of bucket: count
+    :param q: percentile between 0 and 100
+    :return: upper bound of the bucket containing the percentile in microseconds
+    """
+    total = sum(histogram.values())
+    if total == 0:
+        return None
+    count = 0
+    for bucket in sorted(histogram):
+        count += histogram[bucket]
+        if count * 100.0 >= q * total:
+            return bucket_bound(bucket)
+    return bucket_bound(max(histogram))
+
+
+class GameProfiler(GameHooks):
+    """ Game hooks recording decision latencies, step overheads, game lengths and winners."""
+
+    def __init__(self, timer=default_timer):
+        """
+            :param timer: a function returning the current time in seconds
+        """
+        self.timer = timer
+        self.latencies = {}
+        self.decision_time = {}
+        self.moves = {}
+        self.step_time = 0.0
+        self.game_lengths = {}
+        self.winners = {}
+        self.games = 0
+        self._start = 0.0
+        self._decided = 0.0
+
+    def before_action(self, game, player):
+        self._start = self.timer()
+
+    def after_action(self, game, player, move):
+        self._decided = self.timer()
+        elapsed = self._decided - self._start
+        name = str(player)
+        if name not in self.latencies:
+            self.latencies[name] = {}
+            self.decision_time[name] = 0.0
+            self.moves[name] = 0
+        histogram = self.latencies[name]
+        bucket = latency_bucket(elapsed)
+        histogram[bucket] = histogram.get(bucket, 0) + 1
+        self.decision_time[name] += elapsed
+        self.moves[name] += 1
+
+    def after_state(self, game, winner):
+        self.step_time += self.timer() - self._decided
+
+    def end_game(self, game, winner):
+        self.games += 1
+        self.game_lengths[game.step] = self.game_lengths.get(game.step, 0) + 1
+        self.winners[winner] = self.winners.get(winner, 0) + 1
+
+    def summary(self):
+        """ A dictionary summary of the collected data, latencies in microseconds."""
+        agents = {}
+        for name, histogram in self.latencies.items():
+            agents[name] = {'moves': self.moves[name],
+                            'mean_us': 1e6 * self.decision_time[name] / self.moves[name],
+                            'p50_us': percentile(histogram, 50),
+                            'p99_us': percentile(histogram, 99),
+                            'histogram': dict(histogram)}
+        num_moves = sum(self.moves.values())
+        return {'games': self.games,
+                'moves': num_moves,
+                'mean_game_length': float(num_moves) / self.games if self.games > 0 else None,
+                'game_lengths': dict(self.game_lengths),
+                'winners': dict(self.winners),
+                'step_overhead_us': 1e6 * self.step_time / num_moves if num_moves > 0 else None,
+                'agents': agents}
+
+    def report(self, logger=_LOGGER):
+        summary = self.summary()
+        logger.info('games {0}, moves {1}, game lengths {2}, winners {3}, step overhead {4}us'
+                    .format(summary['games'], summary['moves'], sorted(summary['game_lengths'].items()),
+                            dict((VALUES[w], n) for w, n in summary['winners'].items()),
+                            summary['step_overhead_us']))
+        for name, data in sorted(summary['agents'].items()):
+            logger.info('{0}: moves {1}, mean {2:.1f}us, p50 <{3}us, p99 <{4}us'
+                        .format(name, data['moves'], data['mean_us'], data['p50_us'], data['p99_us']))
@@ -0,0 +1,380 @@
+#!/usr/bin/env python
+# ----------------------------------------------------------------------
+# The MIT License (MIT)
+#
+# Copyright (c) 2015 eidonfiloi
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ----------------------------------------------------------------------
+
+""" This file contains the compact Q-table format and a converter of legacy Q-values to it.
+
+A state is encoded as a base 3 number of its cells (row by row, the first cell is the least significant digit)
+and a state, action pair as the integer key
+
+        key = 9 * state_id + 3 * i + j
+
+A compact Q-table file (.qtable) is
+
+        header: magic 'TTTQ', version (uint8), flags (uint8), number of entries n (uint32)
+        keys:   n uint32
+        values: n float64
+        visits: n uint32 (only with flag FLAG_VISITS)
+
+all little endian, keys in increasing order. Files of state values (flag FLAG_STATE_VALUES) have
+the keys 9 * state_id. The optional visit counts are the numbers of updates of the entries (see BaseQAgent.visit).
+
+SharedQTable keeps Q-values in a shared memory array indexed by these keys, so Q-values can be
+read and updated by several processes (see hogwild.py).
+
+Running this file converts the legacy pickles and csv files in trained_agents
+(or the files given as arguments), validates that every Q-value survives the round trip
+and reports the file size and load time savings, e.g.:
+
+        python qtable.py --output-dir trained_agents
+"""
+
+import os
+import sys
+import csv
+import glob
+import time
+import pickle
+import struct
+import logging
+from array import array
+from multiprocessing.sharedctypes import RawArray
+from globals import *
+
+
+_LOGGER = logging.getLogger(__name__)
+
+COMPACT_EXTENSION = '.qtable'
+MAGIC = 'TTTQ'
+VERSION = 1
+HEADER = struct.Struct('<4sBBI')
+FLAG_STATE_VALUES = 1
+FLAG_VISITS = 2
+
+NUM_STATES = 3 ** 9
+NUM_KEYS = 9 * NUM_STATES
+ACTIONS = [(i, j) for i in range(3) for j in range(3)]
+
+
+def encode_state(state):
+    """ The base 3 id of a state (3x3 lists or tuples of integer cell values). """
+    state_id = 0
+    for cell in reversed(state[0] + state[1] + state[2]):
+        state_id = 3 * state_id + cell
+    return state_id
+
+
+def decode_state(state_id):
+    """ The hashable (tuple of tuples) state of a base 3 state id. """
+    cells = []
+    for _ in range(9):
+        state_id, cell = divmod(state_id, 3)
+        cells.append(cell)
+    return tuple(cells[0:3]), tuple(cells[3:6]), tuple(cells[6:9])
+
+
+def encode_key(state, action):
+    return 9 * encode_state(state) + 3 * action[0] + action[1]
+
+
+def _little_endian(arr):
+    if sys.byteorder == 'big':
+        arr.byteswap()
+    return arr
+
+
+def _write(path, flags, items, visits=None):
+    """ Writes sorted (key, value, dictionary key) items, with the visit counts of the dictionary keys if given. """
+    keys = array('I', [key for key, _, _ in items])
+    values = array('d', [value for _, value, _ in items])
+    if visits is not None:
+        flags |= FLAG_VISITS
+    with open(path, 'wb') as out:
+        out.write(HEADER.pack(MAGIC, VERSION, flags, len(items)))
+        _little_endian(keys).tofile(out)
+        _little_endian(values).tofile(out)
+        if visits is not None:
+            _little_endian(array('I', [visits.get(item, 0) for _, _, item in items])).tofile(out)
+
+
+def save_compact(path, q_values, visits=None):
+    """ Writes Q-values to a compact Q-table file.
+    :param path: output path
+    :param q_values: dictionary of (hashable state, action): value with integer cell values
+    :param visits: optional dictionary of (hashable state, action): visit count, stored with flag FLAG_VISITS
+    """
+    _write(path, 0, sorted((encode_key(state, action), value, (state, action))
+                           for (state, action), value in q_values.iteritems()), visits)
+
+
+def save_compact_state_values(path, state_values, visits=None):
+    """ Writes state values (e.g. the afterstate values of AfterstateAgent) to a compact Q-table file.
+
+    The keys are state ids (9 * state_id, the action part is 0), flagged by FLAG_STATE_VALUES.
+    :param path: output path
+    :param state_values: dictionary of (hashable state, None): value
+    :param visits: optional dictionary of (hashable state, None): visit count, stored with flag FLAG_VISITS
+    """
+    _write(path, FLAG_STATE_VALUES, sorted((9 * encode_state(state), value, (state, None))
+                                           for (state, _), value in state_values.iteritems()), visits)
+
+
+def save_compact_arrays(path, keys, values, visits=None, flags=0):
+    """ Writes integer keys (in increasing order), values and optional visit counts to a compact Q-table file. """
+    _write(path, flags, zip(keys, values, keys), None if visits is None else dict(zip(keys, visits)))
+
+
+def compact_flags(path):
+    """ The flags of a compact Q-table file. """
+    with open(path, 'rb') as f:
+        magic, version, flags, _ = HEADER.unpack(f.read(HEADER.size))
+    if magic != MAGIC or version != VERSION:
+        raise ValueError('{0} is not a compact Q-table file'.format(path))
+    return flags
+
+
+def load_compact_arrays(path, flags=0):
+    """ Reads the keys, values and visit counts of a compact Q-table file.
+    :param flags: the expected flags of the file, FLAG_VISITS is optional
+    :return: array of keys, array of values, array of visit counts (None without FLAG_VISITS)
+    """
+    with open(path, 'rb') as f:
+        magic, version, file_flags, size = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC or version != VERSION:
+            raise ValueError('{0} is not a compact Q-table file'.format(path))
+        if file_flags & ~FLAG_VISITS != flags:
+            raise ValueError('{0} has flags {1}, expected {2}'.format(path, file_flags, flags))
+        keys = array('I')
+        keys.fromfile(f, size)
+        values = array('d')
+        values.fromfile(f, size)
+        visits = None
+        if file_flags & FLAG_VISITS:
+            visits = array('I')
+            visits.fromfile(f, size)
+            _little_endian(visits)
+    return _little_endian(keys), _little_endian(values), visits
+
+
+def _decode_keys(keys, flags):
+    """ The dictionary keys (hashable state, action or None) of the integer keys of a file. """
+    if flags == FLAG_STATE_VALUES:
+        return [(decode_state(key // 9), None) for key in keys]
+    states = {}
+    decoded = []
+    for key in keys:
+        state_id, action = divmod(key, 9)
+        if state_id not in states:
+            states[state_id] = decode_state(state_id)
+        decoded.append((states[state_id], ACTIONS[action]))
+    return decoded
+
+
+def load_compact(path):
+    """ Reads a compact Q-table file into a Q-value dictionary as used by BaseQAgent. """
+    keys, values, _ = load_compact_arrays(path)
+    return dict(zip(_decode_keys(keys, 0), values))
+
+
+def load_compact_state_values(path):
+    """ Reads a compact file of state values into a dictionary of (hashable state, None): value. """
+    keys, values, _ = load_compact_arrays(path, FLAG_STATE_VALUES)
+    return dict(zip(_decode_keys(keys, FLAG_STATE_VALUES), values))
+
+
+def load_compact_visits(path, flags=0):
+    """ Reads the visit counts of a compact file.
+    :param flags: the expected flags of the file (0 or FLAG_STATE_VALUES)
+    :return: dictionary of (hashable state, action or None): visit count, None if the file has no visit counts
+    """
+    keys, _, visits = load_compact_arrays(path, flags)
+    if visits is None:
+        return None
+    return dict(zip(_decode_keys(keys, flags), visits))
+
+
+class SharedQTable(object):
+    """ Q-values in a shared memory array of NUM_KEYS doubles, with the dictionary interface used by BaseQAgent.
+
+    Missing entries are NaN. The array is shared with the processes forked after its creation (e.g. passed
+    as an argument of multiprocessing.Process), which read and write it without locks: an entry is a single
+    aligned double, so a read never sees half a write, concurrent updates of the same entry may lose one of them.
+    Every process caches the array index of the dictionary keys it used.
+    """
+
+    def __init__(self, q_values=None):
+        """
+            :param q_values: optional dictionary of (hashable state, action): value to start from
+        """
+        self.values = RawArray('d', NUM_KEYS)
+        self.values[:] = [float('nan')] * NUM_KEYS
+        self.indices = {}
+        if q_values is not None:
+            for key, value in q_values.iteritems():
+                self[key] = value
+
+    def index(self, key):
+        """ The array index of a key, cached. """
+        index = self.indices.get(key)
+        if index is None:
+            state, action = key
+            index = self.indices[key] = encode_key(state, action)
+        return index
+
+    # the hot methods look up the index cache inline, a method call costs as much as the lookup
+
+    def __getitem__(self, key):
+        index = self.indices.get(key)
+        value = self.values[self.index(key) if index is None else index]
+        if value != value:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, value):
+        index = self.indices.get(key)
+        self.values[self.index(key) if index is None else index] = value
+
+    def __contains__(self, key):
+        index = self.indices.get(key)
+        value = self.values[self.index(key) if index is None else index]
+        return value == value
+
+    def get(self, key, default=None):
+        index = self.indices.get(key)
+        value = self.values[self.index(key) if index is None else index]
+        return default if value != value else value
+
+    def iteritems(self):
+        """ The entries of the table, a scan of the whole array. """
+        states = {}
+        for key, value in enumerate(self.values[:]):
+            if value == value:
+                state_id, action = divmod(key, 9)
+                if state_id not in states:
+                    states[state_id] = decode_state(state_id)
+                yield (states[state_id], ACTIONS[action]), value
+
+    def items(self):
+        return list(self.iteritems())
+
+    def __iter__(self):
+        return (key for key, _ in self.iteritems())
+
+    def keys(self):
+        return list(self)
+
+    def __len__(self):
+        return sum(1 for value in self.values[:] if value == value)
+
+    def to_dict(self):
+        return dict(self.iteritems())
+
+
+def read_legacy_pickle(path):
+    with open(path, 'rb') as f:
+        return convert_legacy_q_values(pickle.load(f))
+
+
+def read_legacy_csv(path):
+    """ Reads Q-values from a csv file with rows of 9 cell values, action index and Q-value (see main.py). """
+    q_values = {}
+    with open(path, 'rb') as f:
+        for row in csv.reader(f):
+            cells = tuple(int(cell) for cell in row[:9])
+            q_values[(cells[0:3], cells[3:6], cells[6:9]), ACTIONS[int(row[9])]] = float(row[10])
+    return q_values
+
+
+def read_legacy(path):
+    if path.endswith('.csv'):
+        return read_legacy_csv(path)
+    return read_legacy_pickle(path)
+
+
+def _timed(func, path):
+    start = time.time()
+    data = func(path)
+    return data, time.time() - start
+
+
+def convert(path, output_path):
+    """ Converts a legacy Q-value file to a compact Q-table file and validates the round trip.
+    :param path: legacy pickle or csv file
+    :param output_path: compact Q-table file
+    :return: dictionary of entries, file sizes and load times of both formats
+    """
+    q_values, legacy_time = _timed(read_legacy, path)
+    save_compact(output_path, q_values)
+    loaded, compact_time = _timed(load_compact, output_path)
+    if len(loaded) != len(q_values):
+        raise ValueError('{0}: {1} entries converted to {2}'.format(path, len(q_values), len(loaded)))
+    for key, value in q_values.iteritems():
+        if loaded.get(key) != value:
+            raise ValueError('{0}: Q-value of {1} changed from {2} to {3}'.format(path, key, value, loaded.get(key)))
+    return {'entries': len(q_values),
+            'legacy_bytes': os.path.getsize(path),
+            'compact_bytes': os.path.getsize(output_path),
+            'legacy_load_sec': legacy_time,
+            'compact_load_sec': compact_time}
+
+
+def convert_all(paths, output_dir=None):
+    """ Converts legacy files one by one, logging the savings of each file and in total.
+    :param paths: legacy pickle or csv files
+    :param output_dir: directory of the compact files (default: next to the legacy file)
+    :return: dictionary of path: conversion report
+    """
+    if output_dir is not None and not os.path.isdir(output_dir):
+        os.makedirs(output_dir)
+    reports = {}
+    for path in paths:
+        name = os.path.splitext(os.path.basename(path))[0] + COMPACT_EXTENSION
+        output_path = os.path.join(output_dir or os.path.dirname(path), name)
+        report = reports[path] = convert(path, output_path)
+        _LOGGER.info('{0}: {1} entries, {2} -> {3} bytes, load {4:.3f}s -> {5:.3f}s'
+                     .format(path, report['entries'], report['legacy_bytes'], report['compact_bytes'],
+                             report['legacy_load_sec'], report['compact_load_sec']))
+    if len(reports) > 0:
+        total = dict((k, sum(r[k] for r in reports.values())) for k in reports.values()[0])
+        _LOGGER.info('total: {0} entries, {1} -> {2} bytes ({3:.1%}), load {4:.3f}s -> {5:.3f}s ({6:.1%})'
+                     .format(total['entries'], total['legacy_bytes'], total['compact_bytes'],
+                             float(total['compact_bytes']) / total['legacy_bytes'],
+                             total['legacy_load_sec'], total['compact_load_sec'],
+                             total['compact_load_sec'] / total['legacy_load_sec']))
+    return reports
+
+
+if __name__ == '__main__':
+
+    import argparse
+
+    logging.basicConfig(level=logging.INFO)
+
+    parser = argparse.ArgumentParser(description='convert legacy Q-values to compact Q-table files')
+    parser.add_argument('paths', nargs='*', help='legacy pickle or csv files (default: everything in trained_agents)')
+    parser.add_argument('--output-dir', help='directory of the compact files (default: next to the legacy files)')
+    args = parser.parse_args()
+
+    convert_all(args.paths or sorted(glob.glob('trained_agents/*.pickle') + glob.glob('trained_agents/*.csv')),
+                args.output_dir)
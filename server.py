@@ -0,0 +1,263 @@
+#!/usr/bin/env python
+# ----------------------------------------------------------------------
+# The MIT License (MIT)
+#
+# Copyright (c) 2015 eidonfiloi
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ----------------------------------------------------------------------
+
+""" This file contains an inference server answering moves of trained agents over a socket.
+
+The server is a single process event loop (asyncore) serving any number of connections
+on a TCP port or a Unix socket. Trained Q-values are loaded once, agents play greedily without learning.
+With --freeze the agents are compiled to frozen policies (see BaseQAgent.freeze) answering in one lookup.
+The protocol is JSON lines, a request
+
+        {"id": 1, "agent": "sarsa", "board": [[0, 1, 0], [0, 2, 0], [0, 0, 0]]}
+
+(cell values 0: empty, 1: X, 2: O, the side to move is derived from the board) is answered by
+
+        {"id": 1, "move": [0, 0]}
+
+or {"id": 1, "error": "..."}, and {"stats": true} is answered with the request count and p50/p99 latencies.
+
+Whole games are played in sessions (see sessions.py), advancing a move whenever a move arrives:
+
+        {"new_session": true, "agent": "sarsa", "side": "O"}    (side is optional, random by default)
+        {"session": 0, "move": [1, 1]}
+
+are answered with the state of the session
+
+        {"session": 0, "board": [[1, 0, 0], [0, 2, 0], [0, 0, 0]], "side": "O", "agent_move": [0, 0],
+         "winner": "NOT_FINISHED"}
+
+A session is ended by {"close": 0}, answered by {"session": 0, "closed": true}, idle sessions are expired
+(see SessionManager).
+
+Requests arriving in the same loop iteration are answered as a batch,
+identical (agent, board) requests of a batch are looked up only once.
+"""
+
+import os
+import sys
+import json
+import socket
+import asyncore
+import asynchat
+import argparse
+from timeit import default_timer
+from agent import *
+from sessions import SessionManager
+from profiling import latency_bucket, percentile
+
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def side_to_move(board):
+    """ The side to move on a board, X starts. """
+    count_x = sum(row.count(VALUES.X) for row in board)
+    count_o = sum(row.count(VALUES.O) for row in board)
+    if count_x == count_o:
+        return VALUES.X
+    elif count_x == count_o + 1:
+        return VALUES.O
+    raise IllegalBoardStateError(board)
+
+
+def parse_board(cells):
+    """ Converts a board of a request (3x3 or 9 cell values) to a list of 3 row lists. """
+    if len(cells) == 3:
+        if any(not isinstance(row, list) or len(row) != 3 for row in cells):
+            raise IllegalBoardStateError(cells)
+        cells = [cell for row in cells for cell in row]
+    if len(cells) != 9 or any(cell not in (VALUES.EMPTY, VALUES.X, VALUES.O) for cell in cells):
+        raise IllegalBoardStateError(cells)
+    board = [list(cells[0:3]), list(cells[3:6]), list(cells[6:9])]
+    if Game.game_state(board) != VALUES.NOT_FINISHED:
+        raise IllegalBoardStateError(board)
+    return board
+
+
+class InferenceChannel(asynchat.async_chat):
+    """ A client connection, it queues the requests of every received line at the server. """
+
+    def __init__(self, sock, server, sock_map):
+        asynchat.async_chat.__init__(self, sock, map=sock_map)
+        self.server = server
+        self.buffer = []
+        self.set_terminator('\n')
+
+    def collect_incoming_data(self, data):
+        self.buffer.append(data)
+
+    def found_terminator(self):
+        line = ''.join(self.buffer)
+        self.buffer = []
+        if line.strip():
+            self.server.pending.append((self, line, default_timer()))
+
+    def respond(self, response):
+        self.push(json.dumps(response) + '\n')
+
+
+class InferenceServer(asyncore.dispatcher):
+    """ Serves greedy moves of trained agents to many concurrent connections. """
+
+    def __init__(self, agents, address=('127.0.0.1', 9999), report_every=10000):
+        """
+            :param agents: dictionary of name: BaseQAgent
+            :param address: (host, port) tuple for TCP or a path for a Unix socket
+            :param report_every: log latencies after every report_every requests
+        """
+        self.sock_map = {}
+        asyncore.dispatcher.__init__(self, map=self.sock_map)
+        self.agents = agents
+        for agent in agents.values():
+            agent.learning = False
+            agent.epsilon = 0.0
+        self.sessions = SessionManager(agents)
+        self.report_every = report_every
+        self.pending = []
+        self.latencies = {}
+        self.requests = 0
+        if isinstance(address, basestring):
+            if os.path.exists(address):
+                os.remove(address)
+            self.create_socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        else:
+            self.create_socket(socket.AF_INET, socket.SOCK_STREAM)
+            self.set_reuse_addr()
+        self.bind(address)
+        self.address = self.socket.getsockname()
+        self.listen(128)
+
+    def handle_accept(self):
+        pair = self.accept()
+        if pair is not None:
+            InferenceChannel(pair[0], self, self.sock_map)
+
+    def answer(self, request, moves):
+        """ The response to a request, moves caches the moves of the current batch. """
+        if request.get('stats'):
+            return self.stats()
+        if request.get('new_session'):
+            side = request.get('side')
+            sides = {None: None, 'X': VALUES.X, 'O': VALUES.O}
+            if side not in sides:
+                raise ValueError('side should be X or O')
+            return self.session_response(self.sessions.create(request.get('agent'), sides[side]))
+        if 'close' in request:
+            self.sessions.close(request['close'])
+            return {'session': request['close'], 'closed': True}
+        if 'session' in request:
+            return self.session_response(self.sessions.move(request['session'], tuple(request['move'])))
+        name = request.get('agent', sorted(self.agents)[0])
+        if name not in self.agents:
+            raise ValueError('unknown agent {0}'.format(name))
+        board = parse_board(request['board'])
+        key = name, tuple(cell for row in board for cell in row)
+        if key not in moves:
+            agent = self.agents[name]
+            agent.set_side(side_to_move(board))
+            moves[key] = agent.take_action(board)
+        return {'move': list(moves[key])}
+
+    @staticmethod
+    def session_response(state):
+        return {'session': state['session'],
+                'board': state['board'],
+                'side': VALUES[state['side']],
+                'agent_move': None if state['agent_move'] is None else list(state['agent_move']),
+                'winner': VALUES[state['winner']]}
+
+    def process_batch(self):
+        """ Answers all requests received since the last batch. """
+        batch, self.pending = self.pending, []
+        moves = {}
+        for channel, line, received in batch:
+            response = {}
+            try:
+                request = json.loads(line)
+                if not isinstance(request, dict):
+                    raise ValueError('a request should be a json object')
+                response = self.answer(request, moves)
+                if 'id' in request:
+                    response['id'] = request['id']
+            except (ValueError, KeyError, TypeError, IllegalBoardStateError, AgentActionError) as e:
+                response = {'error': repr(e)}
+            channel.respond(response)
+            bucket = latency_bucket(default_timer() - received)
+            self.latencies[bucket] = self.latencies.get(bucket, 0) + 1
+            self.requests += 1
+            if self.requests % self.report_every == 0:
+                _LOGGER.info('requests {requests}, p50 <{p50_us}us, p99 <{p99_us}us'.format(**self.stats()))
+
+    def stats(self):
+        return {'requests': self.requests,
+                'p50_us': percentile(self.latencies, 50),
+                'p99_us': percentile(self.latencies, 99)}
+
+    def serve(self, timeout=0.01, count=None):
+        """ Runs the event loop, count loop iterations or forever. """
+        while count is None or count > 0:
+            asyncore.loop(timeout=timeout, map=self.sock_map, count=1)
+            if self.pending:
+                self.process_batch()
+            if count is not None:
+                count -= 1
+
+    def close_all(self):
+        asyncore.close_all(map=self.sock_map)
+
+
+if __name__ == '__main__':
+
+    logging.basicConfig(level=logging.INFO)
+
+    parser = argparse.ArgumentParser(description='serve moves of trained agents')
+    parser.add_argument('--agent', action='append', default=[],
+                        help='name=kind:path of an agent to serve, e.g. '
+                             'sarsa=SarsaAgent:trained_agents/SarsaAgent_in_SarsaAgent_vs_SarsaAgent_ep_500_g_500_itself_pre_trained_3.pickle')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=9999)
+    parser.add_argument('--unix', help='path of a Unix socket to listen on instead of TCP')
+    parser.add_argument('--freeze', action='store_true',
+                        help='serve frozen greedy policies (see BaseQAgent.freeze) instead of the Q-values')
+    args = parser.parse_args()
+
+    specs = args.agent or ['sarsa=SarsaAgent:trained_agents/'
+                           'SarsaAgent_in_SarsaAgent_vs_SarsaAgent_ep_500_g_500_itself_pre_trained_3.pickle']
+    served = {}
+    for spec in specs:
+        agent_name, definition = spec.split('=', 1)
+        kind, path = definition.split(':', 1)
+        served[agent_name] = make_agent(kind, path, learning=False, epsilon=0.0)
+        if args.freeze:
+            served[agent_name] = served[agent_name].freeze()
+
+    server = InferenceServer(served, args.unix or (args.host, args.port))
+    _LOGGER.info('serving {0} on {1}'.format(sorted(served), server.address))
+    try:
+        server.serve()
+    except KeyboardInterrupt:
+        _LOGGER.info('{requests} requests, p50 <{p50_us}us, p99 <{p99_us}us'.format(**server.stats()))
+        server.close_all()
+        sys.exit(0)
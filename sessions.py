@@ -0,0 +1,197 @@
+#!/usr/bin/env python
+# ----------------------------------------------------------------------
+# The MIT License (MIT)
+#
+# Copyright (c) 2015 eidonfiloi
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ----------------------------------------------------------------------
+
+""" This file contains event driven game sessions between remote (or console) players and trained agents.
+
+A session does not block on its human player: it advances one move whenever a move arrives,
+the agent replies immediately. Any number of sessions share the trained agents of a SessionManager,
+which are switched to greedy, non-learning play. Sessions are driven by the inference server (server.py)
+and by the console game in main.py.
+
+Sessions abandoned by their players are expired: a session idle for longer than idle_timeout seconds
+is removed, and when max_sessions are running the least recently used one is evicted for a new session.
+"""
+
+import time
+from copy import deepcopy
+from collections import OrderedDict
+from agent import *
+
+
+class RemotePlayer(Agent):
+    """ A player whose moves arrive from outside (network or console).
+
+    Sessions pass its moves to the game directly, take_action is never called.
+    """
+
+    def take_action(self, state):
+        raise AgentActionError(self, None, 'moves of a remote player are passed to its session')
+
+
+class GameSession(object):
+    """ A single game between a remote player and an agent, advanced move by move. """
+
+    def __init__(self, session_id, agent, human_side):
+        """
+            :param session_id: id of the session
+            :param agent: a (shared) agent playing the other side
+            :param human_side: VALUES.X or VALUES.O
+        """
+        self.session_id = session_id
+        self.agent = agent
+        self.human_side = human_side
+        self.agent_side = VALUES.O if human_side == VALUES.X else VALUES.X
+        self.human = RemotePlayer()
+        if human_side == VALUES.X:
+            self.game = Game(player_x=self.human, player_o=agent)
+        else:
+            self.game = Game(player_x=agent, player_o=self.human)
+        self.winner = VALUES.NOT_FINISHED
+
+    def _agent_move(self):
+        self.agent.set_side(self.agent_side)
+        move = self.agent.take_action(deepcopy(self.game.board))
+        self._update(self.game.make_move(move))
+        return move
+
+    def _update(self, winner):
+        self.winner = winner
+        if winner != VALUES.NOT_FINISHED:
+            self.game.end_game(winner)
+
+    def start(self):
+        """ Starts the game, the agent moves if it plays X.
+        :return: the agent's move or None
+        """
+        return self._agent_move() if self.agent_side == VALUES.X else None
+
+    def move(self, move):
+        """ Makes the remote player's move and the agent's reply.
+        :param move: i, j of an empty cell
+        :return: the agent's move or None if the game ended with the player's move
+        """
+        if self.finished:
+            raise AgentActionError(self.human, move)
+        self._update(self.game.make_move(move))
+        return None if self.finished else self._agent_move()
+
+    @property
+    def finished(self):
+        return self.winner != VALUES.NOT_FINISHED
+
+    def state(self, agent_move=None):
+        return {'session': self.session_id,
+                'board': self.game.board,
+                'side': self.human_side,
+                'agent_move': agent_move,
+                'winner': self.winner}
+
+
+class SessionManager(object):
+    """ Keeps the running sessions of many remote players against shared trained agents. """
+
+    def __init__(self, agents, rng=None, idle_timeout=600.0, max_sessions=10000, timer=time.time):
+        """
+            :param agents: dictionary of name: agent
+            :param rng: random.Random instance or integer seed for choosing the player's side
+            :param idle_timeout: seconds after the last move a session is expired, None to keep idle sessions
+            :param max_sessions: maximum number of sessions, the least recently used one is evicted for a new one
+            :param timer: a function returning the current time in seconds
+        """
+        self.agents = agents
+        for agent in agents.values():
+            if isinstance(agent, BaseQAgent):
+                agent.learning = False
+                agent.epsilon = 0.0
+        self.rng = make_rng(rng)
+        self.idle_timeout = idle_timeout
+        self.max_sessions = max_sessions
+        self.timer = timer
+        # session id: session, least recently used first
+        self.sessions = OrderedDict()
+        self.last_used = {}
+        self.next_id = 0
+
+    def create(self, agent_name=None, human_side=None):
+        """ Starts a new session.
+        :param agent_name: name of the opponent agent (default: the first by name)
+        :param human_side: VALUES.X, VALUES.O or None for a random side
+        :return: the state of the session
+        """
+        if agent_name is None:
+            agent_name = sorted(self.agents)[0]
+        if agent_name not in self.agents:
+            raise ValueError('unknown agent {0}'.format(agent_name))
+        if human_side is None:
+            human_side = VALUES.X if self.rng.random() < 0.5 else VALUES.O
+        elif human_side not in (VALUES.X, VALUES.O):
+            raise ValueError('side should be X or O')
+        self.expire()
+        while len(self.sessions) >= self.max_sessions:
+            self.close(next(iter(self.sessions)))
+        session = GameSession(self.next_id, self.agents[agent_name], human_side)
+        self.sessions[session.session_id] = session
+        self.last_used[session.session_id] = self.timer()
+        self.next_id += 1
+        return self._state(session, session.start())
+
+    def move(self, session_id, move):
+        """ Makes a move in a session and returns its new state, finished sessions are removed.
+        :param session_id: id of the session
+        :param move: i, j
+        :return: the state of the session
+        """
+        self.expire()
+        if session_id not in self.sessions:
+            raise KeyError('unknown session {0}'.format(session_id))
+        session = self.sessions.pop(session_id)
+        self.sessions[session_id] = session
+        self.last_used[session_id] = self.timer()
+        return self._state(session, session.move(move))
+
+    def close(self, session_id):
+        self.sessions.pop(session_id, None)
+        self.last_used.pop(session_id, None)
+
+    def expire(self):
+        """ Removes the sessions idle for longer than idle_timeout.
+        :return: number of removed sessions
+        """
+        if self.idle_timeout is None:
+            return 0
+        deadline = self.timer() - self.idle_timeout
+        expired = 0
+        # the least recently used sessions come first
+        for session_id in list(self.sessions):
+            if self.last_used[session_id] > deadline:
+                break
+            self.close(session_id)
+            expired += 1
+        return expired
+
+    def _state(self, session, agent_move):
+        if session.finished:
+            self.close(session.session_id)
+        return session.state(agent_move)
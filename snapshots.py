@@ -0,0 +1,185 @@
+#!/usr/bin/env python
+# ----------------------------------------------------------------------
+# The MIT License (MIT)
+#
+# Copyright (c) 2015 eidonfiloi
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ----------------------------------------------------------------------
+
+""" This file contains the background evaluation of snapshots of a learning agent.
+
+Evaluating a learner between episodes stalls training and changes its epsilon and learning flag.
+A SnapshotEvaluator instead forks a process per snapshot: the child gets a copy-on-write copy of
+the agent as it was at the snapshot, switches it to greedy play without learning and evaluates it
+against a fixed opponent suite, while the parent continues training right away. Nothing is copied or
+pickled when a snapshot is taken, only the (small) results are sent back as json through a pipe.
+The children are plain forks (not multiprocessing processes), so snapshots can be evaluated
+in the worker processes of a pool too (e.g. specs run by run_specs). e.g.:
+
+        evaluator = SnapshotEvaluator(FIXED_OPPONENTS)
+        for episode in range(episodes):
+            calculate_average_reward(agent, opponent, games)
+            if episode % 10 == 0:
+                evaluator.submit(agent, episode)
+            for result in evaluator.collect():
+                ...
+        results = evaluator.close()
+
+A result is a dictionary of the episode, the win, draw and loss rates against every opponent
+(both sides, half of the games each) and the score, the mean of win - loss over the suite.
+Without num_games the rates are exact (see exact.py), which needs opponents with stationary policies.
+At most max_workers snapshots are evaluated at a time, further snapshots are dropped (counted in dropped)
+unless block is set, so the evaluation never holds training up.
+"""
+
+import os
+import sys
+import json
+import time
+from collections import OrderedDict
+from agent import *
+from exact import exact_winner_frequency_dict
+from experiments import calculate_winner_frequency_dict
+from league import FIXED_OPPONENTS, load_agent
+
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def evaluate_snapshot(agent, suite, num_games=None, seed=None):
+    """ The win, draw and loss rates of a greedy, non-learning agent against an opponent suite.
+
+    The agent is changed, in the background it is the child's copy of the snapshot.
+    :param agent: Agent
+    :param suite: list of PoolEntry
+    :param num_games: games per side against each opponent, None for exact rates
+    :param seed: seed of the opponents
+    :return: dictionary of opponent name: {'win': p, 'draw': p, 'loss': p} and score
+    """
+    agent.learning = False
+    agent.epsilon = 0.0
+    rng = make_rng(seed)
+    result = {}
+    score = 0.0
+    for entry in suite:
+        opponent = load_agent(entry, rng=rng.randint(0, sys.maxint))
+        if num_games is None:
+            frequencies = exact_winner_frequency_dict(agent, opponent)
+        else:
+            frequencies = calculate_winner_frequency_dict(agent, opponent, num_games)
+        win = (frequencies['agent1_x_win'] + frequencies['agent1_o_win']) / 2.0
+        loss = (frequencies['agent2_o_win'] + frequencies['agent2_x_win']) / 2.0
+        result[entry.name] = {'win': win, 'draw': 1.0 - win - loss, 'loss': loss}
+        score += win - loss
+    result['score'] = score / len(suite)
+    return result
+
+
+class SnapshotEvaluator(object):
+    """ Evaluates snapshots of a learning agent in forked background processes (see the module documentation). """
+
+    def __init__(self, suite=None, num_games=None, max_workers=2, block=False, seed=None):
+        """
+            :param suite: list of PoolEntry (default: the league's fixed opponents)
+            :param num_games: games per side against each opponent, None for exact rates
+            :param max_workers: maximum number of snapshots evaluated at a time
+            :param block: if True a snapshot waits for a free worker instead of being dropped
+            :param seed: seed of the opponents
+        """
+        self.suite = FIXED_OPPONENTS if suite is None else suite
+        self.num_games = num_games
+        self.max_workers = max_workers
+        self.block = block
+        self.seed = seed
+        # pid: (read end of the result pipe, episode), in the order of submission
+        self.running = OrderedDict()
+        self.finished = []
+        self.dropped = 0
+
+    def _evaluate_in_child(self, agent, episode, write_fd):
+        """ The body of a forked evaluation process, it writes its result as json to the pipe and exits. """
+        try:
+            start = time.time()
+            try:
+                result = evaluate_snapshot(agent, self.suite, self.num_games, self.seed)
+            except Exception as e:
+                result = {'error': repr(e)}
+            result['episode'] = episode
+            result['eval_sec'] = time.time() - start
+            with os.fdopen(write_fd, 'w') as out:
+                out.write(json.dumps(result))
+        finally:
+            # never return into the parent's code, and no cleanup of its state (e.g. flushing its open files)
+            os._exit(0)
+
+    def _finish(self, pid):
+        read_fd, episode = self.running.pop(pid)
+        with os.fdopen(read_fd) as f:
+            data = f.read()
+        result = json.loads(data) if data else {'episode': episode, 'error': 'no result'}
+        if 'error' in result:
+            _LOGGER.warning('evaluation of the snapshot of episode {0} failed: {1}'.format(episode, result['error']))
+        self.finished.append(result)
+
+    def _reap(self, wait=False):
+        for pid in list(self.running):
+            # results are far smaller than a pipe buffer, a child never blocks writing it
+            done, _ = os.waitpid(pid, 0 if wait else os.WNOHANG)
+            if done != 0:
+                self._finish(pid)
+                if wait:
+                    return
+
+    def submit(self, agent, episode):
+        """ Starts the evaluation of a snapshot of the agent as it is now.
+        :param agent: the learning agent
+        :param episode: the episode of the snapshot
+        :return: True if the snapshot is evaluated, False if it was dropped
+        """
+        self._reap()
+        while len(self.running) >= self.max_workers:
+            if not self.block:
+                self.dropped += 1
+                _LOGGER.warning('snapshot of episode {0} dropped, {1} evaluations running'
+                                .format(episode, len(self.running)))
+                return False
+            self._reap(wait=True)
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(read_fd)
+            self._evaluate_in_child(agent, episode, write_fd)
+        os.close(write_fd)
+        self.running[pid] = read_fd, episode
+        return True
+
+    def collect(self):
+        """ The results of the evaluations finished since the last call, without waiting. """
+        self._reap()
+        collected, self.finished = self.finished, []
+        return collected
+
+    def close(self):
+        """ Waits for the running evaluations.
+        :return: their results and those not collected yet
+        """
+        while len(self.running) > 0:
+            self._reap(wait=True)
+        return self.collect()
@@ -0,0 +1,340 @@
+#!/usr/bin/env python
+# ----------------------------------------------------------------------
+# The MIT License (MIT)
+#
+# Copyright (c) 2015 eidonfiloi
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ----------------------------------------------------------------------
+
+""" This file contains declarative experiment specs and a runner executing batches of them.
+
+A spec is a json file describing an experiment of experiments.py, two agents playing episodes
+of games against each other on both sides (see specs/ for an example):
+
+        {
+          "name": "q_vs_sarsa",
+          "episodes": 300,                  number of episodes
+          "games_per_episode": 200,         games per side in an episode
+          "seed": 1,                        optional, seeds the agents (agent2 with seed + 1)
+          "rewards": {"win": 1.0, "draw": 0.0, "lose": -1.0, "not_finished": 0.0},
+          "early_stopping": {"delta_tolerance": 0.1, "patience": 10},   optional, stop at convergence
+          "instrumentation": {"histogram_every": 10},   optional, Q-table measurements in the metrics
+          "evaluation": {"every": 10},      optional, background evaluation of snapshots of agent1
+          "agent1": {
+            "kind": "QLearningAgent",       a key of AGENT_CLASSES
+            "q_values": "trained_agents/QLearningAgent_in_... .pickle",   optional Q-values to start from
+            "params": {"alpha": 0.1},       optional constructor arguments
+            "epsilon": 0.1                  exploration rate, a number or a schedule
+          },
+          "agent2": {...},
+          "outputs": {
+            "metrics": "metrics/q_vs_sarsa.jsonl",      the metrics stream (see metrics.py)
+            "evaluation": "metrics/q_vs_sarsa_evaluation.jsonl",   the snapshot evaluations (next to the metrics)
+            "plot": "plots/q_vs_sarsa.png",             optional
+            "agent1_q_values": "trained_agents/q.qtable",   optional
+            "agent2_q_values": null
+          }
+        }
+
+Epsilon schedules are {"type": "constant", "value": v}
+or {"type": "inverse_sqrt", "value": v, "start": s, "scale": c}, which is v before episode s
+and v / sqrt(episode // c) from episode s on (0 < c <= s). early_stopping holds the arguments of a ConvergenceMonitor
+(see convergence.py), the experiment stops when the Q-values and the outcome rates of agent1 are stable.
+With instrumentation the Q-tables of the Q-value agents are measured every episode (see instrumentation.py),
+their visit histograms are added to every histogram_every-th record.
+evaluation holds the arguments of a SnapshotEvaluator (see snapshots.py) and every: snapshots of agent1
+taken every that many episodes (and at the end) are evaluated in the background while training continues,
+their win, draw and loss rates per opponent are written to the evaluation stream.
+
+Outputs are written under temporary names and renamed when the experiment finished,
+a spec is skipped if all its outputs exist. While an experiment runs, its metrics are
+streamed to the metrics path with a .part suffix. e.g.:
+
+        python specs.py specs/*.json --processes 4
+"""
+
+import os
+import glob
+import json
+import logging
+import multiprocessing
+from math import sqrt
+
+
+_LOGGER = logging.getLogger(__name__)
+
+PART_SUFFIX = '.part'
+OUTPUTS = ['metrics', 'evaluation', 'plot', 'agent1_q_values', 'agent2_q_values']
+SCHEDULES = ['constant', 'inverse_sqrt']
+DEFAULT_REWARDS = {'win': 1.0, 'draw': 0.0, 'lose': -1.0, 'not_finished': 0.0}
+
+
+def load_spec(path):
+    """ Reads and validates a spec file, filling in the defaults.
+    :param path: json spec file
+    :return: spec dictionary
+    """
+    with open(path) as f:
+        spec = json.load(f)
+    spec.setdefault('name', os.path.splitext(os.path.basename(path))[0])
+    return complete_spec(spec, path)
+
+
+def complete_spec(spec, source='spec'):
+    """ Validates a spec dictionary and fills in the defaults.
+    :param spec: spec dictionary
+    :param source: where the spec comes from, for error messages
+    :return: spec dictionary
+    """
+    for key in ['episodes', 'games_per_episode', 'agent1', 'agent2']:
+        if key not in spec:
+            raise ValueError('{0}: {1} is missing'.format(source, key))
+    spec.setdefault('name', '{0}_vs_{1}_ep_{2}_g_{3}'.format(spec['agent1']['kind'], spec['agent2']['kind'],
+                                                             spec['episodes'], spec['games_per_episode']))
+    spec.setdefault('seed', None)
+    spec.setdefault('early_stopping', None)
+    spec.setdefault('instrumentation', None)
+    if spec['instrumentation'] is not None:
+        spec['instrumentation'].setdefault('histogram_every', 10)
+    spec.setdefault('evaluation', None)
+    if spec['evaluation'] is not None:
+        spec['evaluation'].setdefault('every', 10)
+    rewards = dict(DEFAULT_REWARDS)
+    rewards.update(spec.get('rewards', {}))
+    spec['rewards'] = dict((key, float(value)) for key, value in rewards.items())
+    for key in ['agent1', 'agent2']:
+        spec[key].setdefault('q_values', None)
+        spec[key].setdefault('params', {})
+        spec[key].setdefault('epsilon', 0.1)
+        schedule = spec[key]['epsilon']
+        if isinstance(schedule, (int, float)):
+            continue
+        if not isinstance(schedule, dict) or schedule.get('type') not in SCHEDULES:
+            raise ValueError('{0}: unknown epsilon schedule {1} of {2} in {3}'
+                             .format(source, schedule, key, spec['name']))
+        if schedule['type'] == 'inverse_sqrt' and not 0 < schedule.get('scale', 0) <= schedule.get('start', 0):
+            raise ValueError('{0}: epsilon schedule {1} of {2} in {3} needs 0 < scale <= start'
+                             .format(source, schedule, key, spec['name']))
+    outputs = dict((key, None) for key in OUTPUTS)
+    outputs.update(spec.get('outputs', {}))
+    if outputs['metrics'] is None:
+        outputs['metrics'] = os.path.join('metrics', spec['name'] + '.jsonl')
+    if spec['evaluation'] is not None and outputs['evaluation'] is None:
+        outputs['evaluation'] = os.path.splitext(outputs['metrics'])[0] + '_evaluation.jsonl'
+    spec['outputs'] = outputs
+    return spec
+
+
+def epsilon(schedule, episode):
+    """ The exploration rate of an episode.
+    :param schedule: a number or a schedule dictionary (see the module documentation)
+    :param episode: the episode number
+    :return: epsilon
+    """
+    if isinstance(schedule, (int, float)):
+        return schedule
+    kind = schedule.get('type')
+    if kind == 'constant':
+        return schedule['value']
+    elif kind == 'inverse_sqrt':
+        if episode < schedule['start']:
+            return schedule['value']
+        # from episode max(start, scale) on, the divisor is at least 1
+        return schedule['value'] / sqrt(max(1, episode // schedule['scale']))
+    raise ValueError('unknown epsilon schedule {0}'.format(schedule))
+
+
+def outputs_exist(spec):
+    return all(os.path.exists(path) for path in spec['outputs'].values() if path is not None)
+
+
+def make_spec_agent(agent_spec, rewards, seed):
+    from agent import BaseQAgent, AGENT_CLASSES, make_agent
+    params = dict(agent_spec['params'])
+    if agent_spec['kind'] in AGENT_CLASSES and issubclass(AGENT_CLASSES[agent_spec['kind']], BaseQAgent):
+        for key, value in rewards.items():
+            params.setdefault(key, value)
+    return make_agent(agent_spec['kind'], agent_spec['q_values'], rng=seed, **params)
+
+
+def _replace(path, write):
+    """ Writes an output under a temporary name with write(temporary path), then renames it to path. """
+    directory = os.path.dirname(path)
+    if directory and not os.path.isdir(directory):
+        os.makedirs(directory)
+    # keep the extension, serialize_q_values chooses the format by it
+    part = path + PART_SUFFIX + os.path.splitext(path)[1]
+    write(part)
+    os.rename(part, path)
+
+
+def _write_evaluations(metrics, results):
+    """ Writes snapshot evaluations (see SnapshotEvaluator) as records of the flattened rates. """
+    for result in sorted(results, key=lambda r: r['episode']):
+        flattened = {}
+        for name, value in result.items():
+            if isinstance(value, dict):
+                flattened.update(('{0}_{1}'.format(name, outcome), p) for outcome, p in value.items())
+            elif name not in ('episode', 'error'):
+                flattened[name] = value
+        metrics.write(flattened, episode=result['episode'])
+
+
+def run_spec(spec):
+    """ Runs the experiment of a spec and writes its outputs.
+    :param spec: spec dictionary (see load_spec)
+    :return: the rolling and overall means of the average rewards (see MetricsWriter.summary)
+    """
+    from experiments import calculate_average_reward
+    from metrics import MetricsWriter
+    seed = spec['seed']
+    rewards = spec['rewards']
+    agent1 = make_spec_agent(spec['agent1'], rewards, seed)
+    agent2 = make_spec_agent(spec['agent2'], rewards, None if seed is None else seed + 1)
+    outputs = spec['outputs']
+    metrics_part = outputs['metrics'] + PART_SUFFIX
+    if os.path.exists(metrics_part):
+        os.remove(metrics_part)
+    monitor = None
+    hooks = None
+    if spec['early_stopping'] is not None:
+        from convergence import ConvergenceMonitor, OutcomeCounter
+        monitor = ConvergenceMonitor(**spec['early_stopping'])
+        hooks = OutcomeCounter(agent1)
+    probes = []
+    if spec['instrumentation'] is not None:
+        from agent import BaseQAgent
+        from instrumentation import QTableProbe
+        probes = [QTableProbe(agent, prefix) for agent, prefix in [(agent1, 'agent1_'), (agent2, 'agent2_')]
+                  if isinstance(agent, BaseQAgent)]
+    evaluator = None
+    if spec['evaluation'] is not None:
+        from snapshots import SnapshotEvaluator
+        evaluation = dict(spec['evaluation'])
+        every = evaluation.pop('every')
+        evaluator = SnapshotEvaluator(**evaluation)
+        evaluation_part = outputs['evaluation'] + PART_SUFFIX
+        if os.path.exists(evaluation_part):
+            os.remove(evaluation_part)
+        evaluation_metrics = MetricsWriter(evaluation_part)
+    evaluated = False
+    i = 0
+    try:
+        with MetricsWriter(metrics_part) as metrics:
+            for i in range(spec['episodes']):
+                average_rewards = calculate_average_reward(agent1=agent1,
+                                                           agent2=agent2,
+                                                           num_games=spec['games_per_episode'],
+                                                           epsilon1=epsilon(spec['agent1']['epsilon'], i),
+                                                           epsilon2=epsilon(spec['agent2']['epsilon'], i),
+                                                           win=rewards['win'],
+                                                           draw=rewards['draw'],
+                                                           lose=rewards['lose'],
+                                                           hooks=hooks)
+                if monitor is not None or len(probes) > 0:
+                    # convergence is decided on the trained agent, a learning opponent's changes are only recorded
+                    for key, agent in [('agent1_max_delta', agent1), ('agent2_max_delta', agent2)]:
+                        if hasattr(agent, 'reset_max_delta'):
+                            average_rewards[key] = agent.reset_max_delta()
+                if monitor is not None:
+                    converged = monitor.update(average_rewards.get('agent1_max_delta', 0.0), hooks.reset())
+                extra = None
+                for probe in probes:
+                    average_rewards.update(probe.sample())
+                    if i % spec['instrumentation']['histogram_every'] == 0:
+                        extra = extra or {}
+                        extra[probe.prefix + 'visit_histogram'] = probe.visit_histogram()
+                metrics.write(average_rewards, episode=i, extra=extra)
+                _LOGGER.info('{0}: episode {1}'.format(spec['name'], i))
+                if evaluator is not None:
+                    evaluated = i % every == 0 and evaluator.submit(agent1, i)
+                    _write_evaluations(evaluation_metrics, evaluator.collect())
+                if monitor is not None and converged:
+                    _LOGGER.info('{0}: converged after {1} episodes, outcome rates {2}'
+                                 .format(spec['name'], i + 1, monitor.rates()))
+                    break
+            summary = metrics.summary()
+        if evaluator is not None:
+            if not evaluated:
+                # the final snapshot is evaluated in any case
+                evaluator.block = True
+                evaluator.submit(agent1, i)
+            _write_evaluations(evaluation_metrics, evaluator.close())
+    finally:
+        if evaluator is not None:
+            # reaps the evaluations still running if an episode raised
+            evaluator.close()
+            evaluation_metrics.close()
+    if evaluator is not None:
+        os.rename(evaluation_part, outputs['evaluation'])
+    for key, agent in [('agent1_q_values', agent1), ('agent2_q_values', agent2)]:
+        if outputs[key] is not None:
+            _replace(outputs[key], agent.serialize_q_values)
+    if outputs['plot'] is not None:
+        from plot_metrics import plot_file
+        _replace(outputs['plot'],
+                 lambda path: plot_file(metrics_part, title='{0} vs. {1}'.format(agent1, agent2), output=path))
+    os.rename(metrics_part, outputs['metrics'])
+    return summary
+
+
+def run_spec_file(path):
+    """ Runs a spec file unless its outputs exist.
+
+    This is the unit of work sent to the worker processes.
+    :return: path, summary or None if skipped
+    """
+    spec = load_spec(path)
+    if outputs_exist(spec):
+        _LOGGER.info('{0}: outputs exist, skipped'.format(spec['name']))
+        return path, None
+    return path, run_spec(spec)
+
+
+def run_specs(paths, processes=None):
+    """ Runs spec files concurrently, skipping those with existing outputs.
+    :param paths: json spec files
+    :param processes: number of worker processes (default: number of cpus)
+    :return: dictionary of path: summary (None for skipped specs)
+    """
+    for path in paths:
+        load_spec(path)
+    if processes == 1 or len(paths) <= 1:
+        return dict(run_spec_file(path) for path in paths)
+    workers = multiprocessing.Pool(processes)
+    try:
+        return dict(workers.imap_unordered(run_spec_file, paths))
+    finally:
+        workers.close()
+        workers.join()
+
+
+if __name__ == '__main__':
+
+    import argparse
+
+    logging.basicConfig(level=logging.INFO)
+
+    parser = argparse.ArgumentParser(description='run experiment specs')
+    parser.add_argument('paths', nargs='*', help='json spec files (default: everything in specs)')
+    parser.add_argument('--processes', type=int, help='number of worker processes (default: number of cpus)')
+    args = parser.parse_args()
+
+    run_specs(args.paths or sorted(glob.glob('specs/*.json')), args.processes)
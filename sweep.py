@@ -0,0 +1,271 @@
+#!/usr/bin/env python
+# ----------------------------------------------------------------------
+# The MIT License (MIT)
+#
+# Copyright (c) 2015 eidonfiloi
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ----------------------------------------------------------------------
+
+""" This file contains a hyperparameter sweep engine for Q-value based agents.
+
+A sweep trains one agent per configuration against a training opponent.
+Trials are advanced in rungs of episodes in a process pool, after each rung
+every trial is evaluated (greedily, without learning) against a fixed opponent suite.
+Between rungs trials are stopped either by successive halving (only the best 1/eta
+trials by evaluation score continue with eta times more episodes)
+or by the median stopping rule on their learning curves.
+"""
+
+import sys
+import csv
+import math
+import itertools
+import multiprocessing
+from agent import *
+from league import FIXED_OPPONENTS, load_agent
+from experiments import calculate_average_reward
+
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def grid(space):
+    """ All configurations of a parameter space.
+    :param space: dictionary of parameter name: list of values
+    :return: list of configuration dictionaries
+    """
+    names = sorted(space)
+    return [dict(zip(names, values)) for values in itertools.product(*[space[name] for name in names])]
+
+
+def random_configs(space, num_configs, rng=None):
+    """ Random configurations of a parameter space.
+    :param space: dictionary of parameter name: list of values (chosen uniformly)
+        or (low, high) tuple (sampled uniformly from the interval)
+    :param num_configs: number of configurations
+    :param rng: random.Random instance or integer seed
+    :return: list of configuration dictionaries
+    """
+    rng = make_rng(rng)
+    configs = []
+    for _ in range(num_configs):
+        config = {}
+        for name, values in space.items():
+            if isinstance(values, tuple):
+                config[name] = rng.uniform(values[0], values[1])
+            else:
+                config[name] = rng.choice(values)
+        configs.append(config)
+    return configs
+
+
+def evaluate(agent, suite, num_games, seed=None):
+    """ Evaluates an agent greedily and without learning against an opponent suite.
+    :param agent: BaseQAgent
+    :param suite: list of PoolEntry
+    :param num_games: number of games per side against each opponent
+    :param seed: seed of the opponents
+    :return: average reward over the suite
+    """
+    rng = make_rng(seed)
+    epsilon, learning = agent.epsilon, agent.learning
+    agent.learning = False
+    score = 0.0
+    for entry in suite:
+        opponent = load_agent(entry, rng=rng.randint(0, sys.maxint))
+        rewards = calculate_average_reward(agent, opponent, num_games,
+                                           epsilon1=0.0,
+                                           epsilon2=getattr(opponent, 'epsilon', 0.0))
+        score += (rewards['agent1_x'] + rewards['agent1_o']) / 2.0
+    agent.epsilon, agent.learning = epsilon, learning
+    return score / len(suite)
+
+
+def train_trial(task):
+    """ Trains a trial's agent for some episodes and evaluates it.
+
+    This is the unit of work sent to the worker processes.
+    :param task: (trial id, agent, training opponent entry, suite, num_episodes, games_per_episode, eval_games, seed)
+    :return: trial id, trained agent, learning curve of the episodes, evaluation score
+        (curves and scores use the rewards win=1, draw=0, lose=-1 regardless of the agent's reward scheme)
+    """
+    trial_id, agent, opponent_entry, suite, num_episodes, games_per_episode, eval_games, seed = task
+    opponent = load_agent(opponent_entry, rng=seed)
+    curve = []
+    for _ in range(num_episodes):
+        rewards = calculate_average_reward(agent, opponent, games_per_episode,
+                                           epsilon1=agent.epsilon,
+                                           epsilon2=getattr(opponent, 'epsilon', 0.0))
+        curve.append((rewards['agent1_x'] + rewards['agent1_o']) / 2.0)
+    return trial_id, agent, curve, evaluate(agent, suite, eval_games, seed + 1)
+
+
+class Trial(object):
+    """ A single configuration of a sweep with its agent and results."""
+
+    def __init__(self, trial_id, kind, config, seed=None):
+        self.trial_id = trial_id
+        self.kind = kind
+        self.config = config
+        self.agent = make_agent(kind, rng=seed, **config)
+        self.curve = []
+        self.score = None
+        self.status = 'running'
+
+    @property
+    def episodes(self):
+        return len(self.curve)
+
+    def recent_reward(self, window):
+        recent = self.curve[-window:]
+        return sum(recent) / len(recent) if len(recent) > 0 else float('-inf')
+
+
+class Sweep(object):
+    """ Runs trials of a sweep in a process pool and writes a results table."""
+
+    def __init__(self,
+                 configs,
+                 kind='SarsaAgent',
+                 opponent=FIXED_OPPONENTS[1],
+                 suite=None,
+                 episodes_per_rung=10,
+                 games_per_episode=100,
+                 eval_games=100,
+                 processes=None,
+                 rng=None):
+        """
+            :param configs: list of configuration dictionaries of BaseQAgent keyword arguments
+            :param kind: agent class name
+            :param opponent: PoolEntry of the training opponent
+            :param suite: list of PoolEntry used for evaluation (default: the league's fixed opponents)
+            :param episodes_per_rung: training episodes of the first rung
+            :param games_per_episode: games per side in a training episode
+            :param eval_games: games per side against each opponent of the suite
+            :param processes: number of worker processes (default: number of cpus)
+            :param rng: random.Random instance or integer seed of the trials and opponents
+        """
+        self.rng = make_rng(rng)
+        self.trials = [Trial(i, kind, config, self.rng.randint(0, sys.maxint))
+                       for i, config in enumerate(configs)]
+        self.opponent = opponent
+        self.suite = FIXED_OPPONENTS if suite is None else suite
+        self.episodes_per_rung = episodes_per_rung
+        self.games_per_episode = games_per_episode
+        self.eval_games = eval_games
+        self.processes = processes
+
+    def running(self):
+        return [trial for trial in self.trials if trial.status == 'running']
+
+    def advance(self, trials, num_episodes, workers):
+        """ Trains the trials for num_episodes more episodes in the worker pool."""
+        tasks = [(trial.trial_id, trial.agent, self.opponent, self.suite, num_episodes,
+                  self.games_per_episode, self.eval_games, self.rng.randint(0, sys.maxint - 1))
+                 for trial in trials]
+        for trial_id, agent, curve, score in workers.imap_unordered(train_trial, tasks):
+            trial = self.trials[trial_id]
+            trial.agent = agent
+            trial.curve.extend(curve)
+            trial.score = score
+            _LOGGER.debug('trial {0} {1}: episodes {2} score {3:.3f}'
+                          .format(trial_id, trial.config, trial.episodes, score))
+
+    def run(self, num_rungs, early_stopping=True, min_rungs=2):
+        """ Runs all trials for num_rungs rungs (grid or random search).
+
+        With early stopping, after min_rungs every trial whose recent learning curve
+        is below the median of the running trials is stopped.
+        """
+        workers = multiprocessing.Pool(self.processes)
+        try:
+            for rung in range(num_rungs):
+                trials = self.running()
+                if len(trials) == 0:
+                    break
+                self.advance(trials, self.episodes_per_rung, workers)
+                if early_stopping and rung + 1 >= min_rungs:
+                    recent = sorted(trial.recent_reward(self.episodes_per_rung) for trial in trials)
+                    median = recent[len(recent) // 2]
+                    for trial in trials:
+                        if trial.recent_reward(self.episodes_per_rung) < median:
+                            trial.status = 'stopped'
+        finally:
+            workers.close()
+            workers.join()
+        for trial in self.running():
+            trial.status = 'finished'
+        return self.best()
+
+    def run_successive_halving(self, eta=3):
+        """ Runs successive halving.
+
+        In each rung the running trials are trained for eta times more episodes than in the previous one,
+        then only the best 1/eta of them (by evaluation score) continue.
+        """
+        workers = multiprocessing.Pool(self.processes)
+        try:
+            num_episodes = self.episodes_per_rung
+            trials = self.running()
+            while len(trials) > 1:
+                self.advance(trials, num_episodes, workers)
+                trials.sort(key=lambda t: -t.score)
+                for trial in trials[int(math.ceil(len(trials) / float(eta))):]:
+                    trial.status = 'stopped'
+                trials = self.running()
+                num_episodes *= eta
+            if len(trials) > 0 and trials[0].score is None:
+                self.advance(trials, num_episodes, workers)
+        finally:
+            workers.close()
+            workers.join()
+        for trial in self.running():
+            trial.status = 'finished'
+        return self.best()
+
+    def best(self):
+        scored = [trial for trial in self.trials if trial.score is not None]
+        return max(scored, key=lambda t: (t.episodes, t.score)) if len(scored) > 0 else None
+
+    def write_results(self, path):
+        """ Writes a csv table with a row per trial, ordered by decreasing score."""
+        params = sorted(set(name for trial in self.trials for name in trial.config))
+        with open(path, 'wb') as out:
+            wr = csv.writer(out)
+            wr.writerow(['trial', 'agent'] + params + ['episodes', 'final_reward', 'score', 'status'])
+            for trial in sorted(self.trials, key=lambda t: (-t.episodes, -(t.score or float('-inf')))):
+                wr.writerow([trial.trial_id, trial.kind] +
+                            [trial.config.get(name) for name in params] +
+                            [trial.episodes, trial.recent_reward(1), trial.score, trial.status])
+
+
+if __name__ == '__main__':
+
+    logging.basicConfig(level=logging.INFO)
+
+    space = {'alpha': [0.05, 0.1, 0.2, 0.4],
+             'epsilon': [0.05, 0.1, 0.2],
+             'gamma': [0.8, 0.9, 0.99],
+             'lose': [-1.0, -2.0, -5.0]}
+
+    sweep = Sweep(grid(space), kind='SarsaAgent', episodes_per_rung=5, rng=1)
+    best = sweep.run_successive_halving(eta=3)
+    _LOGGER.info('best configuration {0} with score {1:.3f}'.format(best.config, best.score))
+    sweep.write_results('sweep_results.csv')
@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+# ----------------------------------------------------------------------
+# The MIT License (MIT)
+#
+# Copyright (c) 2015 eidonfiloi
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ----------------------------------------------------------------------
+
+import os
+import shutil
+import tempfile
+import unittest
+from agent import *
+
+E, X, O = VALUES.EMPTY, VALUES.X, VALUES.O
+
+
+class AfterstateAgentTest(unittest.TestCase):
+
+    def setUp(self):
+        self.agent = AfterstateAgent(alpha=0.5, epsilon=0.0, gamma=1.0, rng=1)
+        self.agent.set_side(X)
+        self.s_1 = [[X, O, E], [E, X, E], [E, O, E]]
+
+    def test_afterstate(self):
+        self.assertEqual(((X, O, E), (E, X, E), (E, O, X)), AfterstateAgent.afterstate(self.s_1, (2, 2), X))
+        self.assertEqual([[X, O, E], [E, X, E], [E, O, E]], self.s_1)
+
+    def test_takes_winning_move(self):
+        self.assertEqual((2, 2), self.agent.take_action(self.s_1))
+        self.assertEqual(1.0, self.agent.q_values[((X, O, E), (E, X, E), (E, O, X)), None])
+
+    def test_transpositions_share_values(self):
+        self.agent.q_values[((X, O, E), (E, X, E), (E, O, X)), None] = 0.3
+        self.assertEqual(0.3, self.agent.q_value((self.s_1, (2, 2))))
+        other = [[X, O, E], [E, E, E], [E, O, X]]
+        self.assertEqual(0.3, self.agent.q_value((other, (1, 1))))
+
+    def test_updates(self):
+        self.agent.take_action([[E, E, E], [E, E, E], [E, E, E]])
+        first = self.agent.prev_state
+        self.assertEqual(0.0, self.agent.q_values[first, None])
+        self.agent.q_values[first, None] = 0.2
+        self.agent.prev_q_val = 0.2
+        self.agent.end_game(X)
+        self.assertAlmostEqual(0.6, self.agent.q_values[first, None])
+        self.assertIsNone(self.agent.prev_state)
+
+    def test_plays_and_freezes(self):
+        opponent = WinBlockingRandomAgent(rng=2)
+        for _ in range(20):
+            Game(self.agent, opponent).play()
+            Game(opponent, self.agent).play()
+        self.assertTrue(all(action is None for _, action in self.agent.q_values))
+        frozen = self.agent.freeze()
+        self.assertEqual(len(Game.reachable_states()), len(frozen.policy))
+        self.assertIn(frozen.take_action(self.s_1), [(2, 2)])
+
+    def test_serialize(self):
+        self.agent.q_values[((X, O, E), (E, X, E), (E, O, X)), None] = 0.3
+        directory = tempfile.mkdtemp()
+        try:
+            for name in ['values.pickle', 'values.qtable']:
+                path = os.path.join(directory, name)
+                self.agent.serialize_q_values(path)
+                loaded = make_agent('AfterstateAgent', path)
+                self.assertEqual(self.agent.q_values, loaded.q_values)
+            self.assertRaises(ValueError, SarsaAgent().deserialize_q_values, os.path.join(directory, 'values.qtable'))
+        finally:
+            shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    unittest.main()
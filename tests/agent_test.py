@@ -27,6 +27,8 @@ import unittest
 from agent import *
 from game import *
 
+E, X, O = VALUES.EMPTY, VALUES.X, VALUES.O
+
 
 class AgentTest(unittest.TestCase):
 
@@ -35,56 +37,83 @@ class AgentTest(unittest.TestCase):
         self.agent.set_side(VALUES.X)
 
     def test_check_triple_none(self):
-        arr = ['X', 'O', 'EMPTY']
+        arr = [X, O, E]
         side, index = self.agent._check_triple(arr)
         self.assertEqual((None, -1), (side, index), 'triple is not homogenous')
 
     def test_check_triple_x(self):
-        arr = ['X', 'X', 'EMPTY']
+        arr = [X, X, E]
         side, index = self.agent._check_triple(arr)
-        self.assertEqual(('X', 2), (side, index), 'triple should be homogenous')
+        self.assertEqual((X, 2), (side, index), 'triple should be homogenous')
 
     def test_check_triple_o(self):
-        arr = ['EMPTY', 'O', 'O']
+        arr = [E, O, O]
         side, index = self.agent._check_triple(arr)
-        self.assertEqual(('O', 0), (side, index), 'triple should be homogenous')
+        self.assertEqual((O, 0), (side, index), 'triple should be homogenous')
 
     def test_block_move_win_row(self):
-        state = [['X', 'X', 'EMPTY'], ['EMPTY', 'EMPTY', 'O'], ['EMPTY', 'O', 'O']]
+        state = [[X, X, E], [E, E, O], [E, O, O]]
         move = self.agent._win_block_move(state)
         self.assertEqual((0, 2), move, 'wrong move...missed win in row')
 
     def test_block_move_win_col(self):
-        state = [['X', 'EMPTY', 'EMPTY'], ['EMPTY', 'EMPTY', 'O'], ['X', 'O', 'O']]
+        state = [[X, E, E], [E, E, O], [X, O, O]]
         move = self.agent._win_block_move(state)
         self.assertEqual((1, 0), move, 'wrong move...missed win in column')
 
     def test_block_move_win_d(self):
-        state = [['X', 'EMPTY', 'EMPTY'], ['EMPTY', 'EMPTY', 'O'], ['EMPTY', 'O', 'X']]
+        state = [[X, E, E], [E, E, O], [E, O, X]]
         move = self.agent._win_block_move(state)
         self.assertEqual((1, 1), move, 'wrong move...missed win in diagonal')
 
     def test_block_move_block_row(self):
-        state = [['X', 'EMPTY', 'EMPTY'], ['EMPTY', 'X', 'EMPTY'], ['EMPTY', 'O', 'O']]
+        state = [[X, E, E], [E, X, E], [E, O, O]]
         move = self.agent._win_block_move(state)
         self.assertEqual((2, 0), move, 'wrong win blocking move')
 
     def test_block_move_block_col(self):
-        state = [['X', 'EMPTY', 'EMPTY'], ['EMPTY', 'EMPTY', 'O'], ['EMPTY', 'X', 'O']]
+        state = [[X, E, E], [E, E, O], [E, X, O]]
         move = self.agent._win_block_move(state)
         self.assertEqual((0, 2), move, 'wrong win blocking move')
 
     def test_block_move_block_d(self):
-        state = [['X', 'X', 'O'], ['EMPTY', 'EMPTY', 'O'], ['O', 'EMPTY', 'X']]
+        state = [[X, X, O], [E, E, O], [O, E, X]]
         move = self.agent._win_block_move(state)
         self.assertEqual((1, 1), move, 'wrong win blocking move')
 
     def test_random_agent(self):
-        state = [['X', 'X', 'O'], ['O', 'EMPTY', 'X'], ['EMPTY', 'EMPTY', 'O']]
+        state = [[X, X, O], [O, E, X], [E, E, O]]
         self.agent.visited_state_actions = {(self.agent.represent_state(state), (2, 0)): 0,
                                             (self.agent.represent_state(state), (1, 1)): 0}
         move = self.agent.take_action(state)
         self.assertEqual((2, 1), move, 'already seen action was taken')
 
+    def test_seeded_games_reproducible(self):
+        boards = []
+        for _ in range(2):
+            game = Game(RandomAgent(rng=11), WinBlockingRandomAgent(rng=12))
+            game.play()
+            boards.append(game.board)
+        self.assertListEqual(boards[0], boards[1], 'seeded agents should play the same game')
+
+    def test_convert_legacy_q_values(self):
+        legacy = {((('X', 'EMPTY', 'EMPTY'), ('EMPTY', 'O', 'EMPTY'), ('EMPTY', 'EMPTY', 'EMPTY')), (0, 1)): 0.5}
+        converted = convert_legacy_q_values(legacy)
+        self.assertEqual({(((X, E, E), (E, O, E), (E, E, E)), (0, 1)): 0.5}, converted)
+        self.assertIs(converted, convert_legacy_q_values(converted), 'integer Q-values should not be converted')
+
+    def test_deserialize_legacy_pickle(self):
+        agent = SarsaAgent()
+        agent.deserialize_q_values(
+            'trained_agents/SarsaAgent_in_SarsaAgent_vs_WinBlockingRandomAgent_ep_1500_g_1000_lose_minus_1_winblock.pickle')
+        for (state, action), value in agent.q_values.items():
+            for row in state:
+                for cell in row:
+                    self.assertIn(cell, [E, X, O])
+
+    def test_rng_instance_shared(self):
+        rng = random.Random(5)
+        self.assertIs(rng, RandomAgent(rng=rng).rng)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,57 @@
+#!/usr/bin/env python
+# ----------------------------------------------------------------------
+# The MIT License (MIT)
+#
+# Copyright (c) 2015 eidonfiloi
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ----------------------------------------------------------------------
+
+import unittest
+from bench import *
+
+
+class CompareTest(unittest.TestCase):
+
+    def setUp(self):
+        self.baseline = {'rate': result(100.0, 'games/s', True),
+                         'time': result(10.0, 'us', False)}
+
+    def test_no_regression(self):
+        results = {'rate': result(95.0, 'games/s', True),
+                   'time': result(10.5, 'us', False),
+                   'new': result(1.0, 'us', False)}
+        self.assertEqual([], compare(results, self.baseline, 0.1))
+
+    def test_regressions(self):
+        results = {'rate': result(50.0, 'games/s', True),
+                   'time': result(20.0, 'us', False)}
+        regressions = compare(results, self.baseline, 0.1)
+        self.assertEqual([('rate', 100.0, 50.0, 0.5), ('time', 10.0, 20.0, 1.0)], regressions)
+
+    def test_informational(self):
+        baseline = {'entries': result(100, 'entries', None)}
+        self.assertEqual([], compare({'entries': result(50, 'entries', None)}, baseline, 0.1))
+
+    def test_time_per_call(self):
+        self.assertTrue(time_per_call(lambda: None, min_time=0.001, repeat=1) > 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
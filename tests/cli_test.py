@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+# ----------------------------------------------------------------------
+# The MIT License (MIT)
+#
+# Copyright (c) 2015 eidonfiloi
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ----------------------------------------------------------------------
+
+import os
+import sys
+import json
+import shutil
+import tempfile
+import unittest
+import subprocess
+from StringIO import StringIO
+import cli
+from agent import *
+
+
+class CliTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_parse_agent(self):
+        agent = cli.parse_agent('SarsaAgent', rng=1, epsilon=0.0)
+        self.assertIsInstance(agent, SarsaAgent)
+        self.assertEqual(0.0, agent.epsilon)
+        self.assertIsInstance(cli.parse_agent('RandomAgent', epsilon=0.0), RandomAgent)
+        self.assertRaises(ValueError, cli.parse_agent, 'UnknownAgent')
+
+    def test_lazy_imports(self):
+        code = 'import sys, cli; cli.make_parser(); print sorted(m for m in ("agent", "matplotlib") if m in sys.modules)'
+        output = subprocess.check_output([sys.executable, '-c', code],
+                                         cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        self.assertEqual('[]', output.strip())
+
+    def test_train_and_evaluate(self):
+        path = os.path.join(self.directory, 'sarsa.qtable')
+        metrics_path = os.path.join(self.directory, 'metrics.jsonl')
+        self.assertEqual(0, cli.main(['--log-level', 'WARNING', 'train', '--episodes', '2', '--games', '5',
+                                      '--metrics', metrics_path, '--output', path, '--seed', '1']))
+        self.assertTrue(os.path.exists(path))
+        with open(metrics_path) as f:
+            self.assertEqual(2, len(f.readlines()))
+
+        stdout = sys.stdout
+        sys.stdout = StringIO()
+        try:
+            cli.main(['--log-level', 'WARNING', 'evaluate', '--agent', 'SarsaAgent:' + path,
+                      '--games', '5', '--freeze', '--seed', '1'])
+            result = json.loads(sys.stdout.getvalue())
+        finally:
+            sys.stdout = stdout
+        self.assertEqual(5, result['games'])
+        self.assertAlmostEqual(2.0, sum(result['frequencies'].values()))
+
+
+if __name__ == '__main__':
+    unittest.main()
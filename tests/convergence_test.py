@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+# ----------------------------------------------------------------------
+# The MIT License (MIT)
+#
+# Copyright (c) 2015 eidonfiloi
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ----------------------------------------------------------------------
+
+import os
+import shutil
+import tempfile
+import unittest
+from convergence import *
+from specs import complete_spec, run_spec
+from agent import *
+
+
+class WilsonIntervalTest(unittest.TestCase):
+
+    def test_interval(self):
+        lower, upper = wilson_interval(0, 10)
+        self.assertEqual(0.0, lower)
+        self.assertAlmostEqual(0.2775, upper, places=4)
+        lower, upper = wilson_interval(50, 100)
+        self.assertAlmostEqual(1.0 - upper, lower)
+        self.assertAlmostEqual(0.4038, lower, places=4)
+        self.assertEqual((0.0, 1.0), wilson_interval(0, 0))
+
+
+class ConvergenceMonitorTest(unittest.TestCase):
+
+    def test_outcome_counter(self):
+        agent = DummyAgent()
+        counter = OutcomeCounter(agent)
+        Game(agent, DummyAgent(), hooks=counter).play()
+        Game(DummyAgent(), agent, hooks=counter).play()
+        self.assertEqual({'win': 1, 'draw': 0, 'loss': 1}, counter.reset())
+        self.assertEqual({'win': 0, 'draw': 0, 'loss': 0}, counter.counts)
+
+    def test_converges_when_stable(self):
+        monitor = ConvergenceMonitor(delta_tolerance=0.1, window=3, patience=2, min_episodes=5)
+        counts = {'win': 50, 'draw': 40, 'loss': 10}
+        for _ in range(6):
+            self.assertFalse(monitor.update(0.2, counts))
+        self.assertTrue(monitor.update(0.2, counts))
+        self.assertFalse(monitor.update(0.5, counts))
+        rate, lower, upper = monitor.rates()['win']
+        self.assertEqual(0.5, rate)
+        self.assertTrue(lower < rate < upper)
+
+    def test_decreasing_deltas(self):
+        monitor = ConvergenceMonitor(delta_tolerance=0.1, window=2, patience=1, min_episodes=1)
+        counts = {'win': 50, 'draw': 50, 'loss': 0}
+        for max_delta in [0.8, 0.8, 0.4, 0.4]:
+            self.assertFalse(monitor.update(max_delta, counts))
+
+    def test_changing_rates(self):
+        monitor = ConvergenceMonitor(delta_tolerance=None, window=2, patience=1, min_episodes=1)
+        for _ in range(2):
+            monitor.update(0.0, {'win': 10, 'draw': 90, 'loss': 0})
+        for _ in range(2):
+            self.assertFalse(monitor.update(0.0, {'win': 90, 'draw': 10, 'loss': 0}))
+
+    def test_max_delta(self):
+        agent = SarsaAgent(alpha=0.5, rng=1)
+        Game(agent, DummyAgent()).play()
+        max_delta = agent.reset_max_delta()
+        self.assertAlmostEqual(0.5, max_delta)
+        self.assertEqual(0.0, agent.max_delta)
+
+
+class EarlyStoppingTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_stops_early(self):
+        path = os.path.join(self.directory, 'metrics.jsonl')
+        spec = complete_spec({'episodes': 100, 'games_per_episode': 2,
+                              'agent1': {'kind': 'DummyAgent'}, 'agent2': {'kind': 'DummyAgent'},
+                              'early_stopping': {'delta_tolerance': None, 'window': 2, 'patience': 2,
+                                                 'min_episodes': 3},
+                              'outputs': {'metrics': path}})
+        run_spec(spec)
+        self.assertEqual(5, len(open(path).readlines()))
+
+
+if __name__ == '__main__':
+    unittest.main()
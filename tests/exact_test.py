@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+# ----------------------------------------------------------------------
+# The MIT License (MIT)
+#
+# Copyright (c) 2015 eidonfiloi
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ----------------------------------------------------------------------
+
+import unittest
+from exact import *
+
+E, X, O = VALUES.EMPTY, VALUES.X, VALUES.O
+
+
+class ExactTest(unittest.TestCase):
+
+    def test_random_agents(self):
+        probabilities = outcome_probabilities(RandomAgent(), RandomAgent())
+        self.assertAlmostEqual(737.0 / 1260, probabilities[X])
+        self.assertAlmostEqual(363.0 / 1260, probabilities[O])
+        self.assertAlmostEqual(160.0 / 1260, probabilities[VALUES.DRAW])
+
+    def test_dummy_agents(self):
+        self.assertEqual({X: 1.0, O: 0.0, VALUES.DRAW: 0.0}, outcome_probabilities(DummyAgent(), DummyAgent()))
+
+    def test_start_board(self):
+        board = [[X, X, E], [O, O, E], [E, E, E]]
+        probabilities = outcome_probabilities(WinBlockingRandomAgent(), RandomAgent(), board)
+        self.assertEqual(1.0, probabilities[X])
+
+    def test_frequencies_sum_to_one(self):
+        agent = SarsaAgent(learning=False, epsilon=0.1, rng=1)
+        frequencies = exact_winner_frequency_dict(agent, WinBlockingRandomAgent())
+        self.assertAlmostEqual(1.0, frequencies['agent1_x_win'] + frequencies['agent2_o_win'] +
+                               frequencies['agent1_x_agent2_o_draw'])
+        self.assertAlmostEqual(1.0, frequencies['agent2_x_win'] + frequencies['agent1_o_win'] +
+                               frequencies['agent2_x_agent1_o_draw'])
+        self.assertEqual({}, agent.q_values)
+
+    def test_frozen_agent(self):
+        agent = SarsaAgent(learning=False, epsilon=0.0, rng=1)
+        agent.q_values[((E, E, E), (E, E, E), (E, E, E)), (1, 1)] = 1.0
+        self.assertEqual(outcome_probabilities(agent, RandomAgent()),
+                         outcome_probabilities(agent.freeze(), RandomAgent()))
+
+    def test_action_distributions(self):
+        state = [[X, X, E], [O, O, E], [E, E, E]]
+        win_block = WinBlockingRandomAgent()
+        win_block.set_side(O)
+        self.assertEqual([((1, 2), 1.0)], win_block.action_distribution(state))
+        # (0, 2) blocks the row and the column, (1, 1) the diagonal
+        distribution = win_block.action_distribution([[X, X, E], [O, E, X], [E, O, X]])
+        self.assertEqual(3, len(distribution))
+        self.assertAlmostEqual(2.0 / 3, sum(p for action, p in distribution if action == (0, 2)))
+        self.assertAlmostEqual(1.0 / 3, sum(p for action, p in distribution if action == (1, 1)))
+        state = [[X, X, E], [E, O, E], [E, E, X]]
+        agent = SarsaAgent(epsilon=0.5)
+        agent.q_values[agent.represent_state(state), (1, 0)] = 1.0
+        distribution = agent.action_distribution(state)
+        self.assertAlmostEqual(0.6, sum(p for action, p in distribution if action == (1, 0)))
+        self.assertAlmostEqual(1.0, sum(p for _, p in distribution))
+        self.assertRaises(NotImplementedError, HumanAgent().action_distribution, state)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+# ----------------------------------------------------------------------
+# The MIT License (MIT)
+#
+# Copyright (c) 2015 eidonfiloi
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ----------------------------------------------------------------------
+
+import unittest
+from experiments import *
+
+
+class SPRTTest(unittest.TestCase):
+
+    def test_decisions(self):
+        test = SPRT(0.5, 0.6)
+        self.assertIsNone(test.decision(6, 10))
+        self.assertTrue(test.decision(200, 300))
+        self.assertFalse(test.decision(150, 300))
+
+
+class SequentialTest(unittest.TestCase):
+
+    def test_better(self):
+        result = sequential_better(WinBlockingRandomAgent(rng=1), DummyAgent(), batch_size=10)
+        self.assertTrue(result['decision'])
+        self.assertEqual(result['games'], result['win'] + result['draw'] + result['loss'])
+        self.assertLess(result['games'], 10000)
+
+    def test_not_better(self):
+        result = sequential_better(RandomAgent(rng=1), RandomAgent(rng=2), batch_size=50)
+        self.assertFalse(result['decision'])
+
+    def test_never_loses(self):
+        agent = make_agent('SarsaAgent',
+                           'trained_agents/SarsaAgent_in_SarsaAgent_vs_SarsaAgent_ep_500_g_500_itself_pre_trained_3.pickle',
+                           learning=False, epsilon=0.0, rng=1)
+        result = sequential_never_loses(agent, WinBlockingRandomAgent(rng=2), batch_size=50)
+        self.assertTrue(result['decision'])
+        self.assertEqual(0, result['loss'])
+        self.assertFalse(sequential_never_loses(RandomAgent(rng=1), RandomAgent(rng=2))['decision'])
+
+    def test_undecided(self):
+        result = sequential_better(DummyAgent(), DummyAgent(), batch_size=5, max_games=30)
+        self.assertIsNone(result['decision'])
+        self.assertEqual(30, result['games'])
+
+    def test_rates(self):
+        result = sequential_rates(DummyAgent(), DummyAgent(), width=0.1, batch_size=10)
+        self.assertTrue(result['decision'])
+        self.assertEqual(result['win'], result['loss'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+# ----------------------------------------------------------------------
+# The MIT License (MIT)
+#
+# Copyright (c) 2015 eidonfiloi
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ----------------------------------------------------------------------
+
+import pickle
+import unittest
+from agent import *
+
+E, X, O = VALUES.EMPTY, VALUES.X, VALUES.O
+
+
+class FrozenAgentTest(unittest.TestCase):
+
+    def setUp(self):
+        self.agent = SarsaAgent(epsilon=0.0, learning=False, rng=1)
+        self.s_1 = [[X, O, E], [E, X, E], [E, O, E]]
+        self.s1 = self.agent.represent_state(self.s_1)
+        self.agent.q_values = {(self.s1, (0, 2)): 0.7,
+                               (self.s1, (1, 0)): 0.9,
+                               (self.s1, (2, 0)): 0.9,
+                               (self.s1, (2, 2)): -0.5}
+        self.frozen = self.agent.freeze()
+
+    def test_action_values_do_not_create_q_values(self):
+        values = dict(self.agent.action_values(self.s_1))
+        self.assertEqual(5, len(values))
+        self.assertEqual(0.9, values[2, 0])
+        self.assertEqual(0.0, values[1, 2])
+        self.assertEqual(4, len(self.agent.q_values))
+
+    def test_tie_set(self):
+        self.assertEqual(((1, 0), (2, 0)), self.frozen.policy[self.s1])
+        self.assertIn(self.frozen.take_action(self.s_1), [(1, 0), (2, 0)])
+
+    def test_policy_covers_reachable_states(self):
+        self.assertEqual(len(Game.reachable_states()), len(self.frozen.policy))
+        self.assertEqual(4, len(self.agent.q_values))
+
+    def test_same_actions_as_greedy_agent(self):
+        for state in Game.reachable_states():
+            board = [list(row) for row in state]
+            self.assertIn(self.frozen.take_action(board), self.agent.best_actions(board))
+        self.assertEqual(self.agent.best_actions(self.s_1), ((1, 0), (2, 0)))
+
+    def test_tie_sets_are_shared(self):
+        tie_sets = set(id(actions) for actions in self.frozen.policy.values())
+        self.assertEqual(len(tie_sets), len(set(self.frozen.policy.values())))
+
+    def test_plays_games(self):
+        game = Game(self.frozen, RandomAgent(rng=2))
+        self.assertIn(game.play(), [X, O, VALUES.DRAW])
+
+    def test_pickle(self):
+        frozen = pickle.loads(pickle.dumps(self.frozen))
+        self.assertEqual(self.frozen.policy, frozen.policy)
+        self.assertEqual((2, 2), FrozenAgent({self.s1: ((2, 2),)}).take_action(self.s_1))
+
+
+if __name__ == '__main__':
+    unittest.main()
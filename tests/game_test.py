@@ -24,8 +24,11 @@
 # ----------------------------------------------------------------------
 
 import unittest
+from copy import deepcopy
 from agent import *
 
+E, X, O = VALUES.EMPTY, VALUES.X, VALUES.O
+
 
 class GameTest(unittest.TestCase):
 
@@ -35,7 +38,7 @@ class GameTest(unittest.TestCase):
         self.game = Game(self.player_x, self.player_o, verbose=False)
         
     def test_board(self):
-        start_board = [['EMPTY', 'EMPTY', 'EMPTY'], ['EMPTY', 'EMPTY', 'EMPTY'], ['EMPTY', 'EMPTY', 'EMPTY']]
+        start_board = [[E, E, E], [E, E, E], [E, E, E]]
         self.assertListEqual(start_board, self.game.board, "no board set up")
 
     def test_player_sides(self):
@@ -51,80 +54,110 @@ class GameTest(unittest.TestCase):
     def test_winner_x(self):
         self.assertEqual(VALUES.X, self.game.play())
 
+    def test_reset(self):
+        board = self.game.board
+        self.assertEqual(VALUES.X, self.game.play())
+        self.game.player_x.set_side(VALUES.O)
+        self.game.reset()
+        self.assertIs(board, self.game.board)
+        self.assertEqual([[E, E, E], [E, E, E], [E, E, E]], self.game.board)
+        self.assertEqual(0, self.game.step)
+        self.assertEqual(VALUES.X, self.player_x.side)
+        self.assertEqual(VALUES.X, self.game.play())
+
+    def test_states_are_copies(self):
+        states = []
+
+        class RecordingAgent(DummyAgent):
+            def take_action(self, state):
+                states.append(state)
+                return super(RecordingAgent, self).take_action(state)
+
+        Game(RecordingAgent(), DummyAgent()).play()
+        self.assertEqual([[E, E, E], [E, E, E], [E, E, E]], states[0])
+        self.assertEqual(len(set(id(row) for state in states for row in state)), 3 * len(states))
+
+    def test_reachable_states(self):
+        states = Game.reachable_states()
+        self.assertEqual(4520, len(states))
+        self.assertIn(((E, E, E), (E, E, E), (E, E, E)), states)
+        self.assertNotIn(((X, X, X), (O, O, E), (E, E, E)), states)
+        self.assertNotIn(((O, E, E), (E, E, E), (E, E, E)), states)
+
     def test_game_test_not_finished1(self):
-        state = [['EMPTY', 'EMPTY', 'EMPTY'], ['EMPTY', 'EMPTY', 'EMPTY'], ['EMPTY', 'EMPTY', 'EMPTY']]
+        state = [[E, E, E], [E, E, E], [E, E, E]]
         self.assertEqual(VALUES.NOT_FINISHED, self.game.game_state(state), 'game state incorrect')
 
     def test_game_test_not_finished2(self):
-        state = [['EMPTY', 'X', 'EMPTY'], ['EMPTY', 'O', 'EMPTY'], ['X', 'EMPTY', 'EMPTY']]
+        state = [[E, X, E], [E, O, E], [X, E, E]]
         self.assertEqual(VALUES.NOT_FINISHED, self.game.game_state(state), 'game state incorrect')
 
     def test_game_test_winner_xr1(self):
-        state = [['X', 'X', 'X'], ['X', 'O', 'O'], ['O', 'EMPTY', 'EMPTY']]
+        state = [[X, X, X], [X, O, O], [O, E, E]]
         self.assertEqual(VALUES.X, self.game.game_state(state), 'game state incorrect')
 
     def test_game_test_winner_xr2(self):
-        state = [['X', 'O', 'O'], ['X', 'X', 'X'], ['EMPTY', 'EMPTY', 'O']]
+        state = [[X, O, O], [X, X, X], [E, E, O]]
         self.assertEqual(VALUES.X, self.game.game_state(state), 'game state incorrect')
 
     def test_game_test_winner_xr3(self):
-        state = [['X', 'O', 'O'], ['EMPTY', 'EMPTY', 'O'], ['X', 'X', 'X']]
+        state = [[X, O, O], [E, E, O], [X, X, X]]
         self.assertEqual(VALUES.X, self.game.game_state(state), 'game state incorrect')
 
     def test_game_test_winner_xd1(self):
-        state = [['X', 'O', 'EMPTY'], ['O', 'X', 'X'], ['EMPTY', 'O', 'X']]
+        state = [[X, O, E], [O, X, X], [E, O, X]]
         self.assertEqual(VALUES.X, self.game.game_state(state), 'game state incorrect')
 
     def test_game_test_winner_xd2(self):
-        state = [['O', 'O', 'X'], ['EMPTY', 'X', 'EMPTY'], ['X', 'X', 'O']]
+        state = [[O, O, X], [E, X, E], [X, X, O]]
         self.assertEqual(VALUES.X, self.game.game_state(state), 'game state incorrect')
 
     def test_game_test_winner_xc1(self):
-        state = [['X', 'O', 'O'], ['X', 'X', 'O'], ['X', 'EMPTY', 'EMPTY']]
+        state = [[X, O, O], [X, X, O], [X, E, E]]
         self.assertEqual(VALUES.X, self.game.game_state(state), 'game state incorrect')
 
     def test_game_test_winner_xc2(self):
-        state = [['O', 'X', 'X'], ['O', 'X', 'O'], ['EMPTY', 'X', 'EMPTY']]
+        state = [[O, X, X], [O, X, O], [E, X, E]]
         self.assertEqual(VALUES.X, self.game.game_state(state), 'game state incorrect')
 
     def test_game_test_winner_xc3(self):
-        state = [['O', 'O', 'X'], ['EMPTY', 'EMPTY', 'X'], ['EMPTY', 'EMPTY', 'X']]
+        state = [[O, O, X], [E, E, X], [E, E, X]]
         self.assertEqual(VALUES.X, self.game.game_state(state), 'game state incorrect')
         
     def test_game_test_winner_or1(self):
-        state = [['O', 'O', 'O'], ['X', 'X', 'EMPTY'], ['X', 'EMPTY', 'EMPTY']]
+        state = [[O, O, O], [X, X, E], [X, E, E]]
         self.assertEqual(VALUES.O, self.game.game_state(state), 'game state incorrect')
 
     def test_game_test_winner_or2(self):
-        state = [['X', 'X', 'EMPTY'], ['O', 'O', 'O'], ['X', 'EMPTY', 'EMPTY']]
+        state = [[X, X, E], [O, O, O], [X, E, E]]
         self.assertEqual(VALUES.O, self.game.game_state(state), 'game state incorrect')
 
     def test_game_test_winner_or3(self):
-        state = [['X', 'X', 'EMPTY'], ['X', 'EMPTY', 'EMPTY'], ['O', 'O', 'O']]
+        state = [[X, X, E], [X, E, E], [O, O, O]]
         self.assertEqual(VALUES.O, self.game.game_state(state), 'game state incorrect')
 
     def test_game_test_winner_od1(self):
-        state = [['O', 'X', 'X'], ['X', 'O', 'EMPTY'], ['EMPTY', 'EMPTY', 'O']]
+        state = [[O, X, X], [X, O, E], [E, E, O]]
         self.assertEqual(VALUES.O, self.game.game_state(state), 'game state incorrect')
 
     def test_game_test_winner_od2(self):
-        state = [['X', 'X', 'O'], ['X', 'O', 'EMPTY'], ['O', 'EMPTY', 'EMPTY']]
+        state = [[X, X, O], [X, O, E], [O, E, E]]
         self.assertEqual(VALUES.O, self.game.game_state(state), 'game state incorrect')
 
     def test_game_test_winner_oc1(self):
-        state = [['O', 'X', 'X'], ['O', 'X', 'EMPTY'], ['O', 'EMPTY', 'EMPTY']]
+        state = [[O, X, X], [O, X, E], [O, E, E]]
         self.assertEqual(VALUES.O, self.game.game_state(state), 'game state incorrect')
 
     def test_game_test_winner_oc2(self):
-        state = [['X', 'O', 'EMPTY'], ['X', 'O', 'X'], ['EMPTY', 'O', 'EMPTY']]
+        state = [[X, O, E], [X, O, X], [E, O, E]]
         self.assertEqual(VALUES.O, self.game.game_state(state), 'game state incorrect')
 
     def test_game_test_winner_oc3(self):
-        state = [['X', 'X', 'O'], ['X', 'EMPTY', 'O'], ['EMPTY', 'EMPTY', 'O']]
+        state = [[X, X, O], [X, E, O], [E, E, O]]
         self.assertEqual(VALUES.O, self.game.game_state(state), 'game state incorrect')
 
     def test_game_test_draw(self):
-        state = [['X', 'O', 'X'], ['X', 'O', 'X'], ['O', 'X', 'O']]
+        state = [[X, O, X], [X, O, X], [O, X, O]]
         self.assertEqual(VALUES.DRAW, self.game.game_state(state), 'game state incorrect')
 
     def test_is_allowed_true(self):
@@ -137,7 +170,7 @@ class GameTest(unittest.TestCase):
 
     def test_is_allowed_false_state(self):
         board = deepcopy(self.game.board)
-        self.game.board = [['X', 'X', 'O'], ['X', 'EMPTY', 'O'], ['EMPTY', 'EMPTY', 'O']]
+        self.game.board = [[X, X, O], [X, E, O], [E, E, O]]
         move = (0, 2)
         self.assertFalse(self.game.is_allowed(move), 'move should not be allowed')
         self.game.board = board
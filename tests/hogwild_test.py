@@ -0,0 +1,51 @@
+#!/usr/bin/env python
+# ----------------------------------------------------------------------
+# The MIT License (MIT)
+#
+# Copyright (c) 2015 eidonfiloi
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ----------------------------------------------------------------------
+
+import unittest
+from hogwild import *
+
+
+class HogwildTest(unittest.TestCase):
+
+    def test_train(self):
+        table, report = train('SarsaAgent', games=40, processes=2, seed=1, chunk=10)
+        self.assertEqual(80, report['games'])
+        self.assertEqual(report['games'], report['win'] + report['draw'] + report['loss'])
+        self.assertGreater(len(table), 0)
+
+    def test_continue_training(self):
+        table, _ = train('QLearningAgent', opponent='RandomAgent', games=10, processes=1, seed=1)
+        size = len(table)
+        table, report = train('QLearningAgent', opponent='RandomAgent', games=10, processes=1, seed=2, table=table)
+        self.assertEqual(20, report['games'])
+        self.assertGreaterEqual(len(table), size)
+
+    def test_invalid_kind(self):
+        self.assertRaises(ValueError, train, 'AfterstateAgent', games=1)
+        self.assertRaises(ValueError, train, 'RandomAgent', games=1)
+
+
+if __name__ == '__main__':
+    unittest.main()
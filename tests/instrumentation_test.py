@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+# ----------------------------------------------------------------------
+# The MIT License (MIT)
+#
+# Copyright (c) 2015 eidonfiloi
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ----------------------------------------------------------------------
+
+import unittest
+from agent import *
+from instrumentation import *
+
+E, X, O = VALUES.EMPTY, VALUES.X, VALUES.O
+
+
+class InstrumentationTest(unittest.TestCase):
+
+    def setUp(self):
+        self.s_1 = ((X, O, E), (E, E, E), (E, O, E))
+        self.s_2 = ((X, O, E), (X, E, E), (E, O, O))
+
+    def test_visit_histogram(self):
+        state_visits = state_visit_counts({(self.s_1, (0, 2)): 2, (self.s_1, (1, 1)): 1, (self.s_2, (1, 1)): 1})
+        self.assertEqual({self.s_1: 3, self.s_2: 1}, state_visits)
+        self.assertEqual({1: 1, 2: 1}, visit_histogram(state_visits))
+        self.assertEqual([(self.s_1, 3)], most_visited_states(state_visits, 1))
+
+    def test_sample(self):
+        agent = SarsaAgent(alpha=0.5, rng=1)
+        probe = QTableProbe(agent, prefix='agent1_')
+        self.assertEqual({}, agent.visits)
+        agent.set_side(X)
+        agent.take_action([list(row) for row in self.s_1])
+        agent.end_game(X)
+        metrics = probe.sample()
+        self.assertEqual(6, metrics['agent1_q_table_size'])
+        self.assertEqual(6, metrics['agent1_new_entries'])
+        self.assertEqual(1, metrics['agent1_updates'])
+        self.assertEqual(0.5, metrics['agent1_mean_abs_delta'])
+        self.assertEqual(1, metrics['agent1_states'])
+        self.assertGreater(metrics['agent1_q_table_bytes'], 6 * entry_bytes((self.s_1, (0, 2)), 0.0))
+        self.assertEqual({1: 1}, probe.visit_histogram())
+        metrics = probe.sample()
+        self.assertEqual((0, 0, 0.0), (metrics['agent1_new_entries'], metrics['agent1_updates'],
+                                       metrics['agent1_mean_abs_delta']))
+
+    def test_counts_do_not_change_updates(self):
+        agents = [SarsaAgent(rng=1), SarsaAgent(rng=1)]
+        QTableProbe(agents[1])
+        for agent in agents:
+            opponent = RandomAgent(rng=2)
+            for _ in range(20):
+                Game(agent, opponent).play()
+        self.assertEqual(agents[0].q_values, agents[1].q_values)
+        self.assertEqual(agents[0].updates, sum(agents[1].state_visits.values()))
+
+
+if __name__ == '__main__':
+    unittest.main()
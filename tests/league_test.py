@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+# ----------------------------------------------------------------------
+# The MIT License (MIT)
+#
+# Copyright (c) 2015 eidonfiloi
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ----------------------------------------------------------------------
+
+import unittest
+from league import *
+
+
+class EloRatingsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.ratings = EloRatings(k=32.0, initial=1500.0)
+
+    def test_expected_score_equal(self):
+        self.assertAlmostEqual(0.5, self.ratings.expected_score('a', 'b'))
+
+    def test_expected_score_stronger(self):
+        self.ratings.set_rating('a', 1900.0)
+        self.assertAlmostEqual(10.0 / 11.0, self.ratings.expected_score('a', 'b'))
+
+    def test_update_win(self):
+        self.ratings.update('a', 'b', 1.0)
+        self.assertAlmostEqual(1516.0, self.ratings.rating('a'))
+        self.assertAlmostEqual(1484.0, self.ratings.rating('b'))
+
+    def test_update_is_zero_sum(self):
+        self.ratings.set_rating('a', 1650.0)
+        self.ratings.update('a', 'b', 0.25)
+        self.assertAlmostEqual(3150.0, self.ratings.rating('a') + self.ratings.rating('b'))
+
+    def test_table_order(self):
+        self.ratings.update('a', 'b', 0.0)
+        self.assertEqual(['b', 'a'], [name for name, _, _ in self.ratings.table()])
+
+
+class LeagueTest(unittest.TestCase):
+
+    def test_trained_pool(self):
+        entries = trained_pool()
+        self.assertTrue(len(entries) > 0, 'no trained agents found')
+        for entry in entries:
+            self.assertIn(entry.kind, ['SarsaAgent', 'QLearningAgent'])
+            self.assertTrue(entry.name.startswith(entry.kind))
+
+    def test_play_match_dummies(self):
+        entry_a = PoolEntry('dummy_a', 'DummyAgent', None)
+        entry_b = PoolEntry('dummy_b', 'DummyAgent', None)
+        self.assertEqual(('dummy_a', 'dummy_b', 0.5), play_match((entry_a, entry_b, 3, 0.0, 7)),
+                         'dummy agents should win exactly their games as X')
+
+    def test_play_match_seeded(self):
+        entry_a = PoolEntry('random', 'RandomAgent', None)
+        entry_b = PoolEntry('win_block', 'WinBlockingRandomAgent', None)
+        self.assertEqual(play_match((entry_a, entry_b, 20, 0.0, 3)), play_match((entry_a, entry_b, 20, 0.0, 3)),
+                         'matches with the same seed should have the same result')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+# ----------------------------------------------------------------------
+# The MIT License (MIT)
+#
+# Copyright (c) 2015 eidonfiloi
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ----------------------------------------------------------------------
+
+import os
+import shutil
+import tempfile
+import unittest
+from agent import *
+from merge import *
+
+E, X, O = VALUES.EMPTY, VALUES.X, VALUES.O
+
+
+class MergeTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.state = ((X, E, E), (E, O, E), (E, E, X))
+        self.a = (self.state, (0, 1))
+        self.b = (self.state, (2, 0))
+        self.c = (self.state, (1, 0))
+        self.first = self.path('first' + COMPACT_EXTENSION)
+        save_compact(self.first, {self.a: 1.0, self.b: 0.5, self.c: 0.0}, {self.a: 3, self.b: 1})
+        self.second = self.path('second' + COMPACT_EXTENSION)
+        save_compact(self.second, {self.a: -1.0, self.b: 0.1, self.c: 1.0}, {self.a: 1, self.b: 4})
+        self.pickle = self.path('third.pickle')
+        SarsaAgent(q_values={self.a: 0.0}).serialize_q_values(self.pickle)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def path(self, name):
+        return os.path.join(self.directory, name)
+
+    def test_visit_weighted_average(self):
+        output = self.path('merged' + COMPACT_EXTENSION)
+        self.assertEqual(3, merge([self.first, self.second, self.pickle], output))
+        merged = load_compact(output)
+        self.assertAlmostEqual(2.0 / 5, merged[self.a])
+        self.assertAlmostEqual(0.9 / 5, merged[self.b])
+        # not updated in any table
+        self.assertAlmostEqual(0.5, merged[self.c])
+        self.assertEqual({self.a: 5, self.b: 5, self.c: 0}, load_compact_visits(output))
+
+    def test_associative(self):
+        partial = self.path('partial' + COMPACT_EXTENSION)
+        merge([self.first, self.second], partial)
+        once = self.path('once' + COMPACT_EXTENSION)
+        merge([self.first, self.second, self.pickle], once)
+        twice = self.path('twice' + COMPACT_EXTENSION)
+        merge([partial, self.pickle], twice)
+        self.assertEqual(load_compact_visits(once), load_compact_visits(twice))
+        for key, value in load_compact(once).items():
+            self.assertAlmostEqual(value, load_compact(twice)[key])
+
+    def test_max_confidence(self):
+        output = self.path('merged' + COMPACT_EXTENSION)
+        merge([self.first, self.second], output, mode='max_confidence')
+        self.assertEqual({self.a: 1.0, self.b: 0.1, self.c: 0.0}, load_compact(output))
+        self.assertEqual({self.a: 3, self.b: 4, self.c: 0}, load_compact_visits(output))
+
+    def test_state_values(self):
+        values = self.path('values' + COMPACT_EXTENSION)
+        save_compact_state_values(values, {(self.state, None): 0.5})
+        output = self.path('merged' + COMPACT_EXTENSION)
+        merge([values, values], output)
+        self.assertEqual({(self.state, None): 0.5}, load_compact_state_values(output))
+        self.assertRaises(ValueError, merge, [values, self.first], output)
+        self.assertRaises(ValueError, QTableMerger, 'median')
+
+    def test_state_value_pickle(self):
+        values = self.path('values' + COMPACT_EXTENSION)
+        save_compact_state_values(values, {(self.state, None): 0.5})
+        afterstates = self.path('afterstates.pickle')
+        AfterstateAgent(q_values={(self.state, None): 1.0}).serialize_q_values(afterstates)
+        output = self.path('merged' + COMPACT_EXTENSION)
+        merge([values, afterstates], output)
+        self.assertEqual({(self.state, None): 0.75}, load_compact_state_values(output))
+        self.assertRaises(ValueError, merge, [afterstates, self.pickle], output)
+
+
+if __name__ == '__main__':
+    unittest.main()
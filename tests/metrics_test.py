@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+# ----------------------------------------------------------------------
+# The MIT License (MIT)
+#
+# Copyright (c) 2015 eidonfiloi
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ----------------------------------------------------------------------
+
+import os
+import shutil
+import tempfile
+import unittest
+from metrics import *
+
+
+class RollingAggregateTest(unittest.TestCase):
+
+    def test_means(self):
+        aggregate = RollingAggregate(window=2)
+        self.assertIsNone(aggregate.mean)
+        for value in [1.0, 2.0, 4.0]:
+            aggregate.add(value)
+        self.assertEqual(3.0, aggregate.mean)
+        self.assertAlmostEqual(7.0 / 3, aggregate.overall_mean)
+
+
+class MetricsWriterTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'runs', 'metrics.jsonl')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_write_and_read(self):
+        with MetricsWriter(self.path, window=2, timer=lambda: 0.0) as metrics:
+            for value in [1.0, 2.0, 4.0]:
+                metrics.write({'agent1_x': value, 'agent2_o': -value})
+        records, offset = read_metrics(self.path)
+        self.assertEqual(3, len(records))
+        self.assertEqual(os.path.getsize(self.path), offset)
+        self.assertEqual({'episode': 2, 'time': 0.0, 'agent1_x': 4.0, 'agent2_o': -4.0,
+                          'rolling': {'agent1_x': 3.0, 'agent2_o': -3.0}}, records[2])
+        self.assertEqual(([0, 1, 2], [1.0, 1.5, 3.0]), series(records, 'agent1_x', rolling=True))
+
+    def test_extra(self):
+        with MetricsWriter(self.path) as metrics:
+            record = metrics.write({'agent1_x': 1.0}, extra={'agent1_visit_histogram': {1: 3}})
+        self.assertEqual({'agent1_x': 1.0}, record['rolling'])
+        records, _ = read_metrics(self.path)
+        self.assertEqual({'1': 3}, records[0]['agent1_visit_histogram'])
+
+    def test_read_while_writing(self):
+        metrics = MetricsWriter(self.path)
+        metrics.write({'agent1_x': 1.0})
+        records, offset = read_metrics(self.path)
+        self.assertEqual(1, len(records))
+        with open(self.path, 'a') as out:
+            out.write('{"episode": 1, "agen')
+        self.assertEqual(([], offset), read_metrics(self.path, offset))
+        metrics.close()
+
+    def test_append(self):
+        with MetricsWriter(self.path) as metrics:
+            metrics.write({'agent1_x': 1.0})
+        with MetricsWriter(self.path) as metrics:
+            metrics.write({'agent1_x': 2.0}, episode=1)
+        records, _ = read_metrics(self.path)
+        self.assertEqual([1.0, 2.0], [record['agent1_x'] for record in records])
+
+    def test_truncate(self):
+        with MetricsWriter(self.path) as metrics:
+            metrics.write({'agent1_x': 1.0})
+        with MetricsWriter(self.path, append=False) as metrics:
+            metrics.write({'agent1_x': 2.0})
+        records, _ = read_metrics(self.path)
+        self.assertEqual([(0, 2.0)], [(record['episode'], record['agent1_x']) for record in records])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+# ----------------------------------------------------------------------
+# The MIT License (MIT)
+#
+# Copyright (c) 2015 eidonfiloi
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ----------------------------------------------------------------------
+
+import unittest
+from agent import *
+
+E, X, O = VALUES.EMPTY, VALUES.X, VALUES.O
+
+
+class MonteCarloAgentTest(unittest.TestCase):
+
+    def setUp(self):
+        self.agent = MonteCarloAgent(alpha=0.5, epsilon=0.0, gamma=0.9, rng=1)
+        self.agent.set_side(X)
+        self.s_1 = [[X, O, E], [E, E, E], [E, O, E]]
+        self.s_2 = [[X, O, E], [X, E, E], [E, O, O]]
+
+    def test_no_updates_during_game(self):
+        self.agent.take_action(self.s_1)
+        self.agent.take_action(self.s_2)
+        self.assertEqual(2, self.agent.episode_length)
+        self.assertTrue(all(v == 0.0 for v in self.agent.q_values.values()))
+
+    def test_returns(self):
+        self.agent.q_values = {(self.agent.represent_state(self.s_1), (1, 0)): 1.0,
+                               (self.agent.represent_state(self.s_2), (2, 0)): 1.0}
+        first = self.agent.take_action(self.s_1)
+        second = self.agent.take_action(self.s_2)
+        self.assertEqual(((1, 0), (2, 0)), (first, second))
+        self.agent.end_game(X)
+        # G = 1 for the last move, 0.9 for the first
+        self.assertAlmostEqual(1.0, self.agent.q_values[self.agent.represent_state(self.s_2), (2, 0)])
+        self.assertAlmostEqual(0.95, self.agent.q_values[self.agent.represent_state(self.s_1), (1, 0)])
+        self.assertAlmostEqual(0.05, self.agent.reset_max_delta())
+        self.assertEqual(0, self.agent.episode_length)
+        self.assertEqual([None] * MonteCarloAgent.BUFFER_SIZE, self.agent.episode_states)
+
+    def test_sample_averages(self):
+        agent = MonteCarloAgent(epsilon=0.0, step_size='inverse', rng=1)
+        agent.set_side(X)
+        # the last move of a game, the only possible action is (2, 0)
+        state = [[X, O, X], [O, O, X], [E, X, O]]
+        key = agent.represent_state(state), (2, 0)
+        for winner in [X, O, X, X]:
+            agent.take_action(state)
+            agent.end_game(winner)
+        self.assertAlmostEqual(0.5, agent.q_values[key])
+        self.assertEqual({key: 4}, agent.visit_counts())
+
+    def test_exploration_moves(self):
+        self.agent.epsilon = 1.0
+        self.agent.take_action(self.s_1)
+        self.agent.end_game(O)
+        self.assertEqual([-0.5], self.agent.q_values.values())
+
+    def test_not_learning(self):
+        self.agent.learning = False
+        self.agent.take_action(self.s_1)
+        self.agent.end_game(X)
+        self.assertEqual(0, self.agent.episode_length)
+
+    def test_plays_games(self):
+        opponent = WinBlockingRandomAgent(rng=2)
+        for _ in range(50):
+            Game(self.agent, opponent).play()
+            Game(opponent, self.agent).play()
+        self.assertGreater(len(self.agent.q_values), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+# ----------------------------------------------------------------------
+# The MIT License (MIT)
+#
+# Copyright (c) 2015 eidonfiloi
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ----------------------------------------------------------------------
+
+import unittest
+from agent import *
+from profiling import *
+
+
+class GameProfilerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.profiler = GameProfiler()
+        for _ in range(3):
+            Game(DummyAgent(), DummyAgent(), hooks=self.profiler).play()
+
+    def test_counts(self):
+        summary = self.profiler.summary()
+        self.assertEqual(3, summary['games'])
+        self.assertEqual(21, summary['moves'])
+        self.assertEqual({7: 3}, summary['game_lengths'])
+        self.assertEqual({VALUES.X: 3}, summary['winners'])
+
+    def test_agent_latencies(self):
+        data = self.profiler.summary()['agents']['DummyAgent']
+        self.assertEqual(21, data['moves'])
+        self.assertEqual(21, sum(data['histogram'].values()))
+        self.assertTrue(data['p50_us'] <= data['p99_us'])
+
+    def test_percentile(self):
+        histogram = {1: 50, 3: 49, 10: 1}
+        self.assertEqual(2, percentile(histogram, 50))
+        self.assertEqual(8, percentile(histogram, 99))
+        self.assertEqual(1024, percentile(histogram, 100))
+        self.assertEqual(None, percentile({}, 50))
+
+
+if __name__ == '__main__':
+    unittest.main()
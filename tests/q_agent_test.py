@@ -27,6 +27,8 @@ import unittest
 from agent import *
 from game import *
 
+E, X, O = VALUES.EMPTY, VALUES.X, VALUES.O
+
 
 class QAgentTest(unittest.TestCase):
 
@@ -52,7 +54,7 @@ class QAgentTest(unittest.TestCase):
         # | 0.500  |   O    | 0.500  |
         # ----------------------------
         #
-        self.s_1 = [['X', 'O', 'EMPTY'], ['EMPTY', 'EMPTY', 'EMPTY'], ['EMPTY', 'O', 'EMPTY']]
+        self.s_1 = [[X, O, E], [E, E, E], [E, O, E]]
         self.s1 = self.agent.represent_state(self.s_1)
         self.a11 = (0, 2)
         self.q11 = 0.748
@@ -74,7 +76,7 @@ class QAgentTest(unittest.TestCase):
         # |--------------------------|
         # | -0.25  |   O    |  0.75  |
         # ----------------------------
-        self.s_2 = [['X', 'O', 'O'], ['EMPTY', 'X', 'EMPTY'], ['EMPTY', 'O', 'EMPTY']]
+        self.s_2 = [[X, O, O], [E, X, E], [E, O, E]]
         self.s2 = self.agent.represent_state(self.s_2)
         self.a21 = (1, 0)
         self.q21 = 0.2
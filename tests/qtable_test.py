@@ -0,0 +1,141 @@
+#!/usr/bin/env python
+# ----------------------------------------------------------------------
+# The MIT License (MIT)
+#
+# Copyright (c) 2015 eidonfiloi
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ----------------------------------------------------------------------
+
+import os
+import shutil
+import tempfile
+import unittest
+import multiprocessing
+from agent import *
+from qtable import *
+
+E, X, O = VALUES.EMPTY, VALUES.X, VALUES.O
+
+
+class QTableTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.state = ((X, E, E), (E, O, E), (E, E, X))
+        self.q_values = {(self.state, (0, 1)): 0.25,
+                         (self.state, (2, 0)): -1.0 / 3,
+                         (((E, E, E), (E, E, E), (E, E, E)), (1, 1)): 0.1}
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_encode_state(self):
+        self.assertEqual(0, encode_state([[E, E, E], [E, E, E], [E, E, E]]))
+        self.assertEqual(1 + 2 * 3 ** 4 + 3 ** 8, encode_state(self.state))
+        self.assertEqual(NUM_STATES - 1, encode_state([[O, O, O], [O, O, O], [O, O, O]]))
+
+    def test_decode_state(self):
+        self.assertEqual(self.state, decode_state(encode_state(self.state)))
+
+    def test_encode_key(self):
+        self.assertEqual(9 * encode_state(self.state) + 5, encode_key(self.state, (1, 2)))
+
+    def test_save_load(self):
+        path = os.path.join(self.directory, 'q' + COMPACT_EXTENSION)
+        save_compact(path, self.q_values)
+        self.assertEqual(self.q_values, load_compact(path))
+
+    def test_save_load_visits(self):
+        path = os.path.join(self.directory, 'q' + COMPACT_EXTENSION)
+        visits = {(self.state, (0, 1)): 3, (self.state, (2, 0)): 1}
+        save_compact(path, self.q_values, visits)
+        self.assertEqual(self.q_values, load_compact(path))
+        visits[((E, E, E), (E, E, E), (E, E, E)), (1, 1)] = 0
+        self.assertEqual(visits, load_compact_visits(path))
+        save_compact(path, self.q_values)
+        self.assertIsNone(load_compact_visits(path))
+
+    def test_load_not_compact(self):
+        path = os.path.join(self.directory, 'q' + COMPACT_EXTENSION)
+        with open(path, 'wb') as out:
+            out.write('not a q-table file')
+        self.assertRaises(ValueError, load_compact, path)
+
+    def test_convert_csv(self):
+        path = os.path.join(self.directory, 'q.csv')
+        agent = SarsaAgent(q_values=self.q_values)
+        agent.save_q_values_to(path)
+        self.assertEqual(self.q_values, read_legacy_csv(path))
+        report = convert(path, os.path.join(self.directory, 'q' + COMPACT_EXTENSION))
+        self.assertEqual(3, report['entries'])
+
+    def test_agent_serialization(self):
+        path = os.path.join(self.directory, 'q' + COMPACT_EXTENSION)
+        SarsaAgent(q_values=self.q_values).serialize_q_values(path)
+        agent = QLearningAgent()
+        agent.deserialize_q_values(path)
+        self.assertEqual(self.q_values, agent.q_values)
+
+    def test_agent_serialization_visits(self):
+        path = os.path.join(self.directory, 'q' + COMPACT_EXTENSION)
+        agent = SarsaAgent(q_values=dict(self.q_values), count_visits=True)
+        agent.visit((self.state, (0, 1)))
+        agent.serialize_q_values(path)
+        loaded = SarsaAgent(step_size='inverse')
+        loaded.deserialize_q_values(path)
+        self.assertEqual(self.q_values, loaded.q_values)
+        self.assertEqual(1, loaded.visit_counts()[self.state, (0, 1)])
+
+
+class SharedQTableTest(unittest.TestCase):
+
+    def setUp(self):
+        self.state = ((X, E, E), (E, O, E), (E, E, X))
+        self.q_values = {(self.state, (0, 1)): 0.25, (self.state, (2, 0)): -0.5}
+        self.table = SharedQTable(self.q_values)
+
+    def test_dictionary_interface(self):
+        self.assertEqual(2, len(self.table))
+        self.assertEqual(0.25, self.table[self.state, (0, 1)])
+        self.assertTrue((self.state, (2, 0)) in self.table)
+        self.assertFalse((self.state, (1, 0)) in self.table)
+        self.assertRaises(KeyError, lambda: self.table[self.state, (1, 0)])
+        self.assertEqual(0.0, self.table.get((self.state, (1, 0)), 0.0))
+        self.table[self.state, (0, 1)] += 0.5
+        self.assertEqual(0.75, self.table[self.state, (0, 1)])
+        self.assertEqual(sorted(self.q_values), sorted(self.table))
+
+    def test_shared_with_processes(self):
+        def write(table):
+            table[self.state, (1, 0)] = 1.0
+        process = multiprocessing.Process(target=write, args=(self.table,))
+        process.start()
+        process.join()
+        self.assertEqual(1.0, self.table[self.state, (1, 0)])
+
+    def test_agent(self):
+        agent = SarsaAgent(q_values=self.table, epsilon=0.0)
+        agent.set_side(X)
+        self.assertEqual((0, 1), agent.take_action([list(row) for row in self.state]))
+        self.assertEqual(6, len(self.table))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -27,6 +27,8 @@ import unittest
 from agent import *
 from game import *
 
+E, X, O = VALUES.EMPTY, VALUES.X, VALUES.O
+
 
 class SarsaAgentTest(unittest.TestCase):
 
@@ -52,7 +54,7 @@ class SarsaAgentTest(unittest.TestCase):
         # | 0.500  |   O    | 0.500  |
         # ----------------------------
         #
-        self.s_1 = [['X', 'O', 'EMPTY'], ['EMPTY', 'EMPTY', 'EMPTY'], ['EMPTY', 'O', 'EMPTY']]
+        self.s_1 = [[X, O, E], [E, E, E], [E, O, E]]
         self.s1 = self.agent.represent_state(self.s_1)
         self.a11 = (0, 2)
         self.q11 = 0.748
@@ -74,7 +76,7 @@ class SarsaAgentTest(unittest.TestCase):
         # |--------------------------|
         # | -0.25  |   O    |  0.75  |
         # ----------------------------
-        self.s_2 = [['X', 'O', 'O'], ['EMPTY', 'X', 'EMPTY'], ['EMPTY', 'O', 'EMPTY']]
+        self.s_2 = [[X, O, O], [E, X, E], [E, O, E]]
         self.s2 = self.agent.represent_state(self.s_2)
         self.a21 = (1, 0)
         self.q21 = 0.2
@@ -141,6 +143,31 @@ class SarsaAgentTest(unittest.TestCase):
 
         self.assertEqual(q_val_should_be, q_val_calculated, 'update q-value is incorrect')
 
+    def test_inverse_step_size(self):
+        agent = SarsaAgent(q_values={(self.s1, self.a13): 0.0}, step_size='inverse', learning=True)
+        agent.set_side(VALUES.X)
+        for winner in [VALUES.X, VALUES.DRAW, VALUES.DRAW]:
+            agent.prev_state = self.s_1
+            agent.prev_action = self.a13
+            agent.prev_q_val = agent.q_values[self.s1, self.a13]
+            agent.end_game(winner)
+        # a win and two draws, the sample average of the rewards 1, 0, 0
+        self.assertAlmostEqual(1.0 / 3, agent.q_values[self.s1, self.a13])
+        self.assertEqual({(self.s1, self.a13): 3}, agent.visit_counts())
+
+    def test_polynomial_step_size(self):
+        agent = SarsaAgent(alpha=0.5, step_size='polynomial', step_size_power=1.0)
+        self.assertEqual(0.5, agent.visit((self.s1, self.a13)))
+        self.assertEqual(0.25, agent.visit((self.s1, self.a13)))
+        self.assertEqual(0.5, agent.visit((self.s2, self.a21)))
+
+    def test_count_visits(self):
+        self.assertEqual({}, self.agent.visit_counts())
+        agent = SarsaAgent(count_visits=True)
+        self.assertEqual(0.1, agent.visit((self.s1, self.a13)))
+        self.assertEqual({(self.s1, self.a13): 1}, agent.visit_counts())
+        self.assertRaises(ValueError, SarsaAgent, step_size='harmonic')
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
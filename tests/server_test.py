@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+# ----------------------------------------------------------------------
+# The MIT License (MIT)
+#
+# Copyright (c) 2015 eidonfiloi
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ----------------------------------------------------------------------
+
+import json
+import socket
+import threading
+import unittest
+from server import *
+
+E, X, O = VALUES.EMPTY, VALUES.X, VALUES.O
+
+
+class ServerTest(unittest.TestCase):
+
+    def setUp(self):
+        s1 = ((X, O, E), (E, E, E), (E, O, X))
+        q_values = {(s1, (0, 2)): 0.1, (s1, (1, 0)): 0.2, (s1, (1, 1)): 0.9,
+                    (s1, (1, 2)): 0.0, (s1, (2, 0)): 0.0}
+        self.server = InferenceServer({'q': QLearningAgent(q_values=q_values)}, ('127.0.0.1', 0))
+        self.thread = threading.Thread(target=self.server.serve, kwargs={'timeout': 0.001, 'count': 500})
+        self.thread.start()
+        self.client = socket.create_connection(self.server.address)
+        self.reader = self.client.makefile('r')
+
+    def tearDown(self):
+        self.client.close()
+        self.thread.join()
+        self.server.close_all()
+
+    def request(self, request):
+        self.client.sendall(json.dumps(request) + '\n')
+        return json.loads(self.reader.readline())
+
+    def test_move(self):
+        response = self.request({'id': 7, 'agent': 'q', 'board': [[X, O, E], [E, E, E], [E, O, X]]})
+        self.assertEqual({'id': 7, 'move': [1, 1]}, response)
+
+    def test_flat_board(self):
+        response = self.request({'board': [X, O, E, E, E, E, E, O, X]})
+        self.assertEqual([1, 1], response['move'])
+
+    def test_errors(self):
+        self.assertIn('error', self.request({'agent': 'unknown', 'board': [E] * 9}))
+        self.assertIn('error', self.request({'board': [X, X, X, O, O, E, E, E, E]}))
+        self.assertIn('error', self.request({'board': [X, X, E, E, E, E, E, E, E]}))
+
+    def test_malformed_board(self):
+        for board in [[[E, E, E, E], [E, E], [E, E, E]], [[E, E, E], [E, E, E], E], [E, E, E]]:
+            self.assertIn('error', self.request({'board': board}))
+        self.assertIn('move', self.request({'board': [E] * 9}))
+
+    def test_not_an_object(self):
+        for line in ['[1, 2]', '3', '"move"', 'null']:
+            self.client.sendall(line + '\n')
+            self.assertIn('error', json.loads(self.reader.readline()))
+        self.assertEqual([1, 1], self.request({'board': [X, O, E, E, E, E, E, O, X]})['move'])
+
+    def test_close_session(self):
+        session_id = self.request({'new_session': True, 'side': 'X'})['session']
+        self.assertEqual({'session': session_id, 'closed': True}, self.request({'close': session_id}))
+        self.assertIn('error', self.request({'session': session_id, 'move': [1, 1]}))
+
+    def test_stats(self):
+        self.request({'board': [E] * 9})
+        stats = self.request({'stats': True})
+        self.assertEqual(1, stats['requests'])
+
+    def test_session(self):
+        state = self.request({'new_session': True, 'side': 'X'})
+        self.assertEqual('X', state['side'])
+        self.assertEqual(None, state['agent_move'])
+        state = self.request({'session': state['session'], 'move': [1, 1]})
+        self.assertEqual('NOT_FINISHED', state['winner'])
+        self.assertEqual(X, state['board'][1][1])
+        self.assertIsNotNone(state['agent_move'])
+        self.assertIn('error', self.request({'session': state['session'], 'move': [1, 1]}))
+
+    def test_side_to_move(self):
+        self.assertEqual(X, side_to_move([[E, E, E], [E, E, E], [E, E, E]]))
+        self.assertEqual(O, side_to_move([[E, E, E], [E, X, E], [E, E, E]]))
+
+
+if __name__ == '__main__':
+    unittest.main()
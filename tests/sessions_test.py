@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+# ----------------------------------------------------------------------
+# The MIT License (MIT)
+#
+# Copyright (c) 2015 eidonfiloi
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ----------------------------------------------------------------------
+
+import unittest
+from sessions import *
+
+E, X, O = VALUES.EMPTY, VALUES.X, VALUES.O
+
+
+class SessionManagerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.manager = SessionManager({'dummy': DummyAgent()}, rng=3)
+
+    def test_agent_starts(self):
+        state = self.manager.create(human_side=O)
+        self.assertEqual((0, 0), state['agent_move'])
+        self.assertEqual(X, state['board'][0][0])
+
+    def test_human_wins(self):
+        state = self.manager.create('dummy', X)
+        session_id = state['session']
+        self.assertEqual(None, state['agent_move'])
+        self.assertEqual((0, 0), self.manager.move(session_id, (1, 1))['agent_move'])
+        self.assertEqual((0, 1), self.manager.move(session_id, (0, 2))['agent_move'])
+        state = self.manager.move(session_id, (2, 0))
+        self.assertEqual(X, state['winner'])
+        self.assertEqual(None, state['agent_move'])
+        self.assertNotIn(session_id, self.manager.sessions, 'finished session should be removed')
+
+    def test_not_allowed_move(self):
+        session_id = self.manager.create('dummy', O)['session']
+        self.assertRaises(AgentActionError, self.manager.move, session_id, (0, 0))
+        self.assertRaises(KeyError, self.manager.move, session_id + 1, (0, 0))
+
+    def test_remote_player_in_game(self):
+        game = Game(RemotePlayer(), DummyAgent())
+        self.assertRaises(AgentActionError, game.play)
+
+    def test_concurrent_sessions(self):
+        ids = [self.manager.create('dummy', X)['session'] for _ in range(100)]
+        for session_id in ids:
+            self.manager.move(session_id, (2, 2))
+        self.assertEqual(100, len(self.manager.sessions))
+        for session_id in ids:
+            self.assertEqual([[O, E, E], [E, E, E], [E, E, X]], self.manager.sessions[session_id].game.board)
+
+    def test_idle_sessions_expire(self):
+        now = [0.0]
+        manager = SessionManager({'dummy': DummyAgent()}, idle_timeout=10.0, timer=lambda: now[0])
+        stale = manager.create('dummy', X)['session']
+        now[0] = 5.0
+        active = manager.create('dummy', X)['session']
+        now[0] = 12.0
+        manager.move(active, (2, 2))
+        self.assertRaises(KeyError, manager.move, stale, (2, 2))
+        self.assertEqual([active], list(manager.sessions))
+
+    def test_least_recently_used_evicted(self):
+        manager = SessionManager({'dummy': DummyAgent()}, max_sessions=2)
+        first = manager.create('dummy', X)['session']
+        second = manager.create('dummy', X)['session']
+        manager.move(first, (2, 2))
+        third = manager.create('dummy', X)['session']
+        self.assertEqual([first, third], list(manager.sessions))
+        self.assertNotIn(second, manager.last_used)
+
+    def test_unknown_agent(self):
+        self.assertRaises(ValueError, self.manager.create, 'unknown')
+
+
+if __name__ == '__main__':
+    unittest.main()
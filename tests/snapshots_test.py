@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+# ----------------------------------------------------------------------
+# The MIT License (MIT)
+#
+# Copyright (c) 2015 eidonfiloi
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ----------------------------------------------------------------------
+
+import unittest
+from snapshots import *
+
+
+class SnapshotEvaluatorTest(unittest.TestCase):
+
+    def setUp(self):
+        self.agent = SarsaAgent(epsilon=0.3, rng=1)
+        opponent = RandomAgent(rng=2)
+        for _ in range(20):
+            Game(self.agent, opponent).play()
+
+    def test_evaluate_snapshot(self):
+        result = evaluate_snapshot(self.agent, FIXED_OPPONENTS)
+        self.assertEqual(['RandomAgent', 'WinBlockingRandomAgent', 'score'], sorted(result))
+        rates = result['RandomAgent']
+        self.assertAlmostEqual(1.0, rates['win'] + rates['draw'] + rates['loss'])
+        self.assertEqual((False, 0.0), (self.agent.learning, self.agent.epsilon))
+
+    def test_background(self):
+        evaluator = SnapshotEvaluator(num_games=5, max_workers=1, block=True, seed=1)
+        q_values = dict(self.agent.q_values)
+        for episode in range(3):
+            self.assertTrue(evaluator.submit(self.agent, episode))
+        results = evaluator.collect() + evaluator.close()
+        self.assertEqual([0, 1, 2], sorted(result['episode'] for result in results))
+        self.assertTrue(all(-1.0 <= result['score'] <= 1.0 for result in results))
+        # the parent's agent is untouched
+        self.assertEqual((True, 0.3), (self.agent.learning, self.agent.epsilon))
+        self.assertEqual(q_values, self.agent.q_values)
+
+    def test_dropped(self):
+        evaluator = SnapshotEvaluator(max_workers=0)
+        self.assertFalse(evaluator.submit(self.agent, 0))
+        self.assertEqual(1, evaluator.dropped)
+        self.assertEqual([], evaluator.close())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,156 @@
+#!/usr/bin/env python
+# ----------------------------------------------------------------------
+# The MIT License (MIT)
+#
+# Copyright (c) 2015 eidonfiloi
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ----------------------------------------------------------------------
+
+import os
+import json
+import shutil
+import tempfile
+import unittest
+from math import sqrt
+from specs import *
+from agent import *
+
+
+class SpecsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write_spec(self, name, **spec):
+        spec.setdefault('episodes', 2)
+        spec.setdefault('games_per_episode', 3)
+        spec.setdefault('seed', 1)
+        spec.setdefault('agent1', {'kind': 'SarsaAgent', 'epsilon': 0.2})
+        spec.setdefault('agent2', {'kind': 'RandomAgent'})
+        spec.setdefault('outputs', {'metrics': os.path.join(self.directory, name + '.jsonl'),
+                                    'agent1_q_values': os.path.join(self.directory, name + '.qtable')})
+        path = os.path.join(self.directory, name + '.json')
+        with open(path, 'w') as out:
+            json.dump(spec, out)
+        return path
+
+    def test_example_spec(self):
+        spec = load_spec(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                      'specs', 'q_vs_sarsa_against_pre_trained_3.json'))
+        self.assertEqual(300, spec['episodes'])
+        for i in [0, 349, 350, 599]:
+            self.assertEqual(0.1 if i < 350 else 0.1 / sqrt(i/100), epsilon(spec['agent1']['epsilon'], i))
+
+    def test_defaults(self):
+        spec = load_spec(self.write_spec('defaults', rewards={'lose': -2}, outputs={}))
+        self.assertEqual('defaults', spec['name'])
+        self.assertEqual(-2.0, spec['rewards']['lose'])
+        self.assertEqual(os.path.join('metrics', 'defaults.jsonl'), spec['outputs']['metrics'])
+        agent = make_spec_agent(spec['agent1'], spec['rewards'], 1)
+        self.assertEqual((0.1, -2.0), (agent.epsilon, agent.lose))
+
+    def test_invalid(self):
+        self.assertRaises(ValueError, load_spec, self.write_spec('invalid', agent1={'kind': 'SarsaAgent',
+                                                                                  'epsilon': {'type': 'linear'}}))
+        for schedule in ['0.1', {'type': 'inverse_sqrt', 'value': 0.1, 'start': 50, 'scale': 100},
+                         {'type': 'inverse_sqrt', 'value': 0.1, 'start': 50, 'scale': 0}]:
+            self.assertRaises(ValueError, load_spec, self.write_spec('invalid', agent1={'kind': 'SarsaAgent',
+                                                                                      'epsilon': schedule}))
+
+    def test_inverse_sqrt_before_scale(self):
+        schedule = {'type': 'inverse_sqrt', 'value': 0.1, 'start': 0, 'scale': 100}
+        self.assertEqual([0.1, 0.1, 0.1 / sqrt(2)], [epsilon(schedule, i) for i in [0, 99, 200]])
+
+    def test_run_and_skip(self):
+        path = self.write_spec('run')
+        spec = load_spec(path)
+        _, summary = run_spec_file(path)
+        self.assertEqual(['agent1_o', 'agent1_x', 'agent2_o', 'agent2_x'], sorted(summary))
+        self.assertTrue(outputs_exist(spec))
+        self.assertFalse(os.path.exists(spec['outputs']['metrics'] + PART_SUFFIX))
+        self.assertEqual(2, len(open(spec['outputs']['metrics']).readlines()))
+        self.assertEqual((path, None), run_spec_file(path))
+
+    def test_early_stopping_tracks_agent1(self):
+        path = self.write_spec('early', early_stopping={'min_episodes': 1}, episodes=2,
+                               agent2={'kind': 'QLearningAgent'})
+        spec = load_spec(path)
+        run_spec(spec)
+        records = [json.loads(line) for line in open(spec['outputs']['metrics'])]
+        self.assertTrue(all('agent1_max_delta' in record and 'agent2_max_delta' in record for record in records))
+        self.assertNotIn('max_delta', records[0])
+
+    def test_instrumentation(self):
+        path = self.write_spec('instrumented', instrumentation={'histogram_every': 2}, episodes=3)
+        spec = load_spec(path)
+        run_spec(spec)
+        records = [json.loads(line) for line in open(spec['outputs']['metrics'])]
+        self.assertEqual(3, len(records))
+        self.assertTrue(all(record['agent1_q_table_size'] > 0 for record in records))
+        self.assertNotIn('agent2_q_table_size', records[0])
+        self.assertEqual([True, False, True], ['agent1_visit_histogram' in record for record in records])
+
+    def test_evaluation(self):
+        path = self.write_spec('evaluated', evaluation={'every': 2, 'num_games': 2}, episodes=3)
+        spec = load_spec(path)
+        run_spec(spec)
+        self.assertTrue(outputs_exist(spec))
+        records = [json.loads(line) for line in open(spec['outputs']['evaluation'])]
+        self.assertEqual([0, 2], [record['episode'] for record in records])
+        self.assertIn('WinBlockingRandomAgent_loss', records[0])
+
+    def test_evaluation_without_episodes(self):
+        spec = load_spec(self.write_spec('untrained', evaluation={'every': 2, 'num_games': 2}, episodes=0))
+        run_spec(spec)
+        records = [json.loads(line) for line in open(spec['outputs']['evaluation'])]
+        self.assertEqual([0], [record['episode'] for record in records])
+
+    def test_evaluations_reaped_if_an_episode_raises(self):
+        import experiments
+        calculate_average_reward = experiments.calculate_average_reward
+        calls = []
+
+        def failing(**kwargs):
+            calls.append(kwargs)
+            if len(calls) > 1:
+                raise RuntimeError('episode failed')
+            return calculate_average_reward(**kwargs)
+        experiments.calculate_average_reward = failing
+        try:
+            spec = load_spec(self.write_spec('failing', evaluation={'every': 1, 'num_games': 2}, episodes=3))
+            self.assertRaises(RuntimeError, run_spec, spec)
+        finally:
+            experiments.calculate_average_reward = calculate_average_reward
+        # no evaluation child is left running
+        self.assertRaises(OSError, os.waitpid, -1, os.WNOHANG)
+        self.assertFalse(outputs_exist(spec))
+
+    def test_run_specs(self):
+        paths = [self.write_spec('a'), self.write_spec('b', seed=2)]
+        results = run_specs(paths, processes=2)
+        self.assertEqual(sorted(paths), sorted(results))
+        self.assertTrue(all(summary is not None for summary in results.values()))
+
+
+if __name__ == '__main__':
+    unittest.main()
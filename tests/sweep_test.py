@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+# ----------------------------------------------------------------------
+# The MIT License (MIT)
+#
+# Copyright (c) 2015 eidonfiloi
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ----------------------------------------------------------------------
+
+import unittest
+from sweep import *
+
+
+class SweepTest(unittest.TestCase):
+
+    def test_grid(self):
+        configs = grid({'alpha': [0.1, 0.2], 'gamma': [0.8, 0.9, 1.0]})
+        self.assertEqual(6, len(configs))
+        self.assertIn({'alpha': 0.2, 'gamma': 0.8}, configs)
+
+    def test_random_configs(self):
+        configs = random_configs({'alpha': (0.1, 0.2), 'gamma': [0.8, 0.9]}, 20)
+        self.assertEqual(20, len(configs))
+        for config in configs:
+            self.assertTrue(0.1 <= config['alpha'] <= 0.2)
+            self.assertIn(config['gamma'], [0.8, 0.9])
+
+    def test_successive_halving(self):
+        sweep = Sweep(grid({'alpha': [0.1, 0.2, 0.3]}),
+                      episodes_per_rung=1, games_per_episode=5, eval_games=5, processes=1)
+        best = sweep.run_successive_halving(eta=3)
+        self.assertEqual(['finished'], [t.status for t in sweep.trials if t is best])
+        self.assertEqual(2, len([t for t in sweep.trials if t.status == 'stopped']))
+        self.assertEqual(1, best.episodes)
+
+    def test_median_stopping(self):
+        sweep = Sweep(grid({'alpha': [0.1, 0.2, 0.3, 0.4]}),
+                      episodes_per_rung=1, games_per_episode=5, eval_games=5, processes=1)
+        sweep.run(num_rungs=2, min_rungs=1)
+        for trial in sweep.trials:
+            self.assertIn(trial.status, ['finished', 'stopped'])
+            self.assertTrue(trial.score is not None)
+
+
+if __name__ == '__main__':
+    unittest.main()